@@ -0,0 +1,130 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+
+class BatcherStoppedError(RuntimeError):
+    """Raised to callers whose image was still queued when the batcher stopped."""
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-image requests into one batched model call.
+
+    A batch is dispatched when `max_batch_size` images are waiting or `max_latency`
+    seconds have passed since the first image in it arrived, whichever comes first.
+    Same scheme as TrueVote-Backend/app/utils/batching.py, without the metrics registry.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], Awaitable],
+        max_batch_size: int = 16,
+        max_latency: float = 0.005,
+        max_concurrency: int = 1,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batches = set()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        while True:
+            # Wait for a free slot first so requests arriving meanwhile join the next batch
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = batch[0][2] + self.max_latency
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                self._fail(batch, BatcherStoppedError("batcher stopped"))
+                self._slots.release()
+                raise
+
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            self.batches += 1
+            self.items += len(batch)
+            # Stacking fails on a malformed image; like a model error, it fails the whole batch
+            inputs = np.stack([item for item, _, _ in batch])
+            outputs = list(await self.predict_batch(inputs))
+            if len(outputs) != len(batch):
+                raise ValueError(f"got {len(outputs)} outputs for a batch of {len(batch)}")
+            for (_, future, _), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        except Exception as e:
+            self._fail(batch, e)
+        finally:
+            # Nobody may be left waiting, even if this task is cancelled
+            self._fail(batch, BatcherStoppedError("batcher stopped"))
+            self._slots.release()
+
+    @staticmethod
+    def _fail(batch, error: BaseException):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        # Images queued after the last batch was collected
+        if self._queue is not None:
+            leftover = []
+            while not self._queue.empty():
+                leftover.append(self._queue.get_nowait())
+            self._fail(leftover, BatcherStoppedError("batcher stopped"))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_latency": self.max_latency,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
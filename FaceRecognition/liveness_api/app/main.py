@@ -1,11 +1,80 @@
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from app import utils, model, schemas
+from app.batching import MicroBatcher
+
+# Dispatch a batch once this many images are waiting, or once the oldest has waited this long
+MAX_BATCH_SIZE = int(os.getenv("LIVENESS_MAX_BATCH_SIZE", "16"))
+MAX_LATENCY_MS = float(os.getenv("LIVENESS_MAX_LATENCY_MS", "10"))
+# Frames accepted by one /predict/batch request
+MAX_FRAMES = int(os.getenv("LIVENESS_MAX_FRAMES", "64"))
+MAX_UPLOAD_BYTES = int(os.getenv("LIVENESS_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+
+async def _predict_batch(img_arrays):
+    # Keras releases the GIL during inference; keep it off the event loop
+    return await asyncio.to_thread(model.predict_batch, img_arrays)
+
+
+batcher = MicroBatcher(_predict_batch, max_batch_size=MAX_BATCH_SIZE, max_latency=MAX_LATENCY_MS / 1000)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once in every uvicorn worker: each worker loads its own copy of the model
+    await asyncio.to_thread(model.load)
+    await asyncio.to_thread(model.warmup)
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def _predict_bytes(content: bytes) -> schemas.PredictionResponse:
+    if not content:
+        raise HTTPException(status_code=400, detail="Empty image upload")
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image larger than {MAX_UPLOAD_BYTES} bytes")
+    try:
+        img_array = await asyncio.to_thread(utils.preprocess_image_from_bytes, content)
+    except utils.InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    prediction, label = await batcher.submit(img_array)
+    return schemas.PredictionResponse(prediction=prediction, label=label)
+
+
+@app.post("/predict", response_model=schemas.PredictionResponse)
+async def predict(file: UploadFile = File(...)):
+    """Liveness score for one image sent as multipart/form-data (field `file`)."""
+    return await _predict_bytes(await file.read())
+
+
+@app.post("/predict/raw", response_model=schemas.PredictionResponse)
+async def predict_raw(request: Request):
+    """Liveness score for one image sent as the raw request body (e.g. image/jpeg)."""
+    return await _predict_bytes(await request.body())
+
+
+@app.post("/predict/batch", response_model=List[schemas.PredictionResponse])
+async def predict_batch(files: List[UploadFile] = File(...)):
+    """Liveness scores for several frames (repeated `files` fields), in upload order."""
+    if len(files) > MAX_FRAMES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_FRAMES} frames per request")
+    contents = [await file.read() for file in files]
+    # Frames go through the batcher together, so they share forward passes with other requests
+    return await asyncio.gather(*[_predict_bytes(content) for content in contents])
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "model_loaded": model.model is not None}
 
-app = FastAPI()
 
-@app.get("/predict")
-async def test_predict():
-    img_path = r"C:\Users\MSI20\Downloads\WIN_20250414_12_28_10_Pro.png" # Replace with your path
-    img_array = utils.preprocess_image_from_path(img_path)  # You’ll define this function
-    prediction, label = model.predict(img_array)
-    return {"prediction": float(prediction), "label": label}
+@app.get("/batcher/status")
+async def batcher_status():
+    return batcher.stats()
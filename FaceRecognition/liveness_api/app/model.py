@@ -1,13 +1,32 @@
 import os
-from tensorflow.keras.models import load_model
 
-model_path = os.path.join("models", "face-latest.hdf5")
-model = load_model(model_path)
-# model.summary()
+import numpy as np
+
+model_path = os.getenv("LIVENESS_MODEL_PATH", os.path.join("models", "face-latest.hdf5"))
+model = None
+
+
+def load():
+    """Load the Keras model once per worker process; later calls reuse it."""
+    global model
+    if model is None:
+        from tensorflow.keras.models import load_model
+        model = load_model(model_path)
+    return model
+
+
+def warmup():
+    # The first predict builds the inference graph; do it before serving traffic
+    predict_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
+
 
 def predict(img_array) -> (float, str):
-    pred = model.predict(img_array)[0][0]
+    pred = load().predict(img_array, verbose=0)[0][0]
     label = "Live" if pred > 0.5 else "Spoof"
     return float(pred), label
 
 
+def predict_batch(img_arrays) -> list:
+    """One forward pass over a stacked (N, 224, 224, 3) batch; returns [(prediction, label), ...]."""
+    preds = load().predict(img_arrays, batch_size=len(img_arrays), verbose=0)[:, 0]
+    return [(float(pred), "Live" if pred > 0.5 else "Spoof") for pred in preds]
@@ -0,0 +1,69 @@
+"""
+Load test for the liveness service.
+
+Sends concurrent uploads of a test image to a running server and reports requests/sec
+and latency percentiles.
+
+Start the server, then run from FaceRecognition/liveness_api:
+    python -m uvicorn app.main:app --workers 2
+    python load_test.py --url http://127.0.0.1:8000 --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def run(url, endpoint, content, requests, concurrency, frames):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=url, timeout=60,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                if endpoint == "raw":
+                    response = await client.post("/predict/raw", content=content,
+                                                 headers={"Content-Type": "image/jpeg"})
+                elif endpoint == "batch":
+                    files = [("files", (f"frame{i}.jpg", content, "image/jpeg")) for i in range(frames)]
+                    response = await client.post("/predict/batch", files=files)
+                else:
+                    response = await client.post("/predict", files={"file": ("image.jpg", content, "image/jpeg")})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(requests)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    images = requests * (frames if endpoint == "batch" else 1)
+    print(f"endpoint: {endpoint}  requests: {requests}  concurrency: {concurrency}  errors: {errors}")
+    print(f"requests/sec: {requests / elapsed:.1f}  images/sec: {images / elapsed:.1f}")
+    print(f"p50: {latencies[len(latencies) // 2] * 1000:.1f} ms  "
+          f"p99: {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", default="test_images/fake.jpg")
+    parser.add_argument("--endpoint", choices=["multipart", "raw", "batch"], default="multipart")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=8, help="frames per request for --endpoint batch")
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        content = f.read()
+    asyncio.run(run(args.url, args.endpoint, content, args.requests, args.concurrency, args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from typing import Optional, Union, TYPE_CHECKING
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.models.chain import Campaign, VoteEvent, IndexerCheckpoint
+from app.utils.database import fetch_all
+from app.utils.event_indexer import CHECKPOINT_NAME
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Read side of the chain indexer: everything here is answered from SQL, never from the node.
+
+
+def _campaign(row) -> dict:
+    return {
+        "address": row.address,
+        "creator": row.creator,
+        "block_number": row.block_number,
+        "tx_hash": row.tx_hash,
+        "total_votes": row.total_votes,
+    }
+
+
+async def list_campaigns(
+    db: Union[Session, "AsyncSession"],
+    creator: Optional[str] = None,
+    voter: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> list:
+    votes = (
+        select(VoteEvent.campaign_address, func.count().label("total_votes"))
+        .group_by(VoteEvent.campaign_address)
+        .subquery()
+    )
+    query = (
+        select(Campaign.address, Campaign.creator, Campaign.block_number, Campaign.tx_hash,
+               func.coalesce(votes.c.total_votes, 0).label("total_votes"))
+        .outerjoin(votes, votes.c.campaign_address == Campaign.address)
+    )
+    if creator:
+        query = query.where(Campaign.creator == creator.lower())
+    if voter:
+        voted = select(VoteEvent.campaign_address).where(VoteEvent.voter == voter.lower())
+        query = query.where(Campaign.address.in_(voted))
+    query = query.order_by(Campaign.block_number, Campaign.log_index).limit(limit).offset(offset)
+    return [_campaign(row) for row in await fetch_all(db, query)]
+
+
+async def get_campaign(db: Union[Session, "AsyncSession"], address: str) -> Optional[dict]:
+    rows = await fetch_all(db, select(Campaign.address, Campaign.creator, Campaign.block_number,
+                                      Campaign.tx_hash).where(Campaign.address == address.lower()))
+    if not rows:
+        return None
+    tally = await get_tally(db, address)
+    row = rows[0]
+    return {
+        "address": row.address,
+        "creator": row.creator,
+        "block_number": row.block_number,
+        "tx_hash": row.tx_hash,
+        **tally,
+    }
+
+
+def tally_query(addresses):
+    """Votes per (campaign, candidate) for the given campaign addresses."""
+    return (
+        select(VoteEvent.campaign_address, VoteEvent.candidate_index, func.count().label("votes"))
+        .where(VoteEvent.campaign_address.in_(addresses))
+        .group_by(VoteEvent.campaign_address, VoteEvent.candidate_index)
+        .order_by(VoteEvent.campaign_address, VoteEvent.candidate_index)
+    )
+
+
+def checkpoint_query():
+    return select(IndexerCheckpoint.block_number).where(IndexerCheckpoint.name == CHECKPOINT_NAME)
+
+
+def reorgs_query():
+    return select(IndexerCheckpoint.reorgs).where(IndexerCheckpoint.name == CHECKPOINT_NAME)
+
+
+def group_tallies(rows, addresses, block: Optional[int]) -> dict:
+    """{address: tally} from tally_query rows; campaigns without votes get an empty tally."""
+    tallies = {address: [] for address in addresses}
+    for row in rows:
+        tallies[row.campaign_address].append({"candidate_index": row.candidate_index, "votes": row.votes})
+    return {
+        address: {"tallies": items, "total_votes": sum(t["votes"] for t in items), "indexed_block": block}
+        for address, items in tallies.items()
+    }
+
+
+async def get_tally(db: Union[Session, "AsyncSession"], address: str) -> dict:
+    address = address.lower()
+    rows = await fetch_all(db, tally_query([address]))
+    return group_tallies(rows, [address], await indexed_block(db))[address]
+
+
+async def indexed_block(db: Union[Session, "AsyncSession"]) -> Optional[int]:
+    rows = await fetch_all(db, checkpoint_query())
+    return rows[0].block_number if rows else None
@@ -1,17 +1,30 @@
 from fastapi import HTTPException, UploadFile
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.utils.image_preprocess import preprocess_image_from_path
+import io
+import logging
 import os
-from typing import Optional
-import aiofiles
+from typing import Optional, Union, TYPE_CHECKING
 import uuid
-import boto3
+from functools import lru_cache
 from dotenv import load_dotenv
 from botocore.exceptions import NoCredentialsError, BotoCoreError
-import face_recognition
-from app.utils.image_preprocess import preprocess_image_from_path
-from app.models.model import predict
+from sqlalchemy.exc import IntegrityError
+from app.utils.face_encoding import encoding_to_bytes, encoding_from_bytes
+from app.utils.executors import io_pool, cpu_pool, ExecutorBusyError
+from app.utils.database import find_first, fetch_all, save, execute_commit, rollback
+from app.utils.user_import import conflict_query, registration_conflict
+from app.utils.biometric_tasks import enrollment_encoding, verify_biometric
+from app.utils.liveness import check_liveness
+from app.utils.user_cache import user_cache
+from app.utils.voter_signals import record_signals, match_percentage
+from app.utils.face_index import find_duplicate_face, index_face, record_duplicate, FACE_DUPLICATE_ACTION
+from app.utils.log import get_logger, log_event
+from app.utils.tracing import span, record_all
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 load_dotenv()
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -19,15 +32,21 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION
-)
+logger = get_logger("users")
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    # boto3 takes a noticeable share of startup; build the client on the first S3 call
+    import boto3
+    return boto3.client(
+        's3',
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION
+    )
 
 async def register_user(
-    db: Session,
+    db: Union[Session, "AsyncSession"],
     wallet_address: str,
     first_name: str,
     last_name: str,
@@ -35,66 +54,76 @@ async def register_user(
     biometric_image: UploadFile
 ) -> User:
     try:
-        print(f"Registering user with wallet address: {wallet_address}")
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.wallet_address == wallet_address).first()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="User with this wallet address already exists")
-
-        existing_email = db.query(User).filter(User.email == email).first()
-        if existing_email:
-            raise HTTPException(status_code=400, detail="Email already registered")
-
-        # Save file temporarily
-        temp_filename = f"temp_{uuid.uuid4()}.png"
-        try:
-            async with aiofiles.open(temp_filename, 'wb') as out_file:
-                content = await biometric_image.read()
-                await out_file.write(content)
-
-            # Upload to S3
-            s3_key = f"biometrics/{uuid.uuid4()}.png"
-            with open(temp_filename, "rb") as file_data:
-                print(f"Uploading {temp_filename} to S3 bucket {S3_BUCKET_NAME} with key {s3_key}")
-                s3_client.upload_fileobj(file_data, S3_BUCKET_NAME, s3_key)
-                print(f"Uploaded {temp_filename} to S3 bucket {S3_BUCKET_NAME} with key {s3_key}")
-            # Optional: Generate public URL
-            s3_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
-
-
-            new_user = User(
-                wallet_address=wallet_address,
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                biometric_image_url=s3_url  # If you add this column to your User model
-            )
-
-            db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
-
-            return new_user
-
-        finally:
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
+        # One round trip for both unique columns, before spending time on S3 and face encoding
+        conflict = await find_registration_conflict(db, wallet_address, email)
+        if conflict:
+            raise HTTPException(status_code=400, detail=conflict)
+
+        # Keep the upload in memory: stream the original bytes to S3 and decode them once for encoding
+        content = await biometric_image.read()
+
+        # Encode the enrolled face once so logins never re-process the stored image. Done before
+        # the upload so a rejected duplicate face never reaches S3
+        with span("face_enrollment"):
+            enrolled_encoding = await cpu_pool.run(enrollment_encoding, content)
+        duplicate = await find_duplicate_face(enrolled_encoding)
+        if duplicate and FACE_DUPLICATE_ACTION == "reject":
+            raise HTTPException(status_code=400, detail="This face is already enrolled with another wallet")
+
+        # Upload to S3
+        s3_key = f"biometrics/{uuid.uuid4()}.png"
+        with span("s3_upload"):
+            await io_pool.run(upload_s3_object, content, s3_key)
+        # Optional: Generate public URL
+        s3_url = s3_object_url(s3_key)
+
+        new_user = User(
+            wallet_address=wallet_address,
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            biometric_image_url=s3_url,  # If you add this column to your User model
+            face_encoding=encoding_to_bytes(enrolled_encoding) if enrolled_encoding is not None else None
+        )
 
+        try:
+            await save(db, new_user)
+        except IntegrityError:
+            # A concurrent registration won the race; the unique constraints are the final check
+            await rollback(db)
+            conflict = await find_registration_conflict(db, wallet_address, email)
+            raise HTTPException(status_code=400, detail=conflict or "User already exists")
+
+        await user_cache.invalidate(wallet_address)
+        await index_face(wallet_address, enrolled_encoding)
+        if duplicate:
+            await record_duplicate(db, wallet_address, duplicate)
+        log_event(logger, "user_registered", sample=True, wallet_address=wallet_address, s3_key=s3_key)
+        return new_user
+
+    except (HTTPException, ExecutorBusyError):
+        await rollback(db)
+        raise
     except (BotoCoreError, NoCredentialsError) as aws_error:
-        db.rollback()
+        await rollback(db)
+        log_event(logger, "registration_failed", logging.ERROR, stage="s3", error=str(aws_error))
         raise HTTPException(status_code=500, detail=f"AWS error: {str(aws_error)}")
     except Exception as e:
-        db.rollback()
+        await rollback(db)
+        log_event(logger, "registration_failed", logging.ERROR, exc_info=True, error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 async def biometric_image_verify(
-    db: Session,
+    db: Union[Session, "AsyncSession"],
     wallet_address: str,
     biometric_image: UploadFile
 ) -> dict:
+    user = None
+    # Fraud-model inputs of this attempt, stored whether or not it succeeds
+    signals = {}
     try:
         # Check if user exists
-        user = db.query(User).filter(User.wallet_address == wallet_address).first()
+        user = await get_user_by_wallet(db, wallet_address)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -102,94 +131,96 @@ async def biometric_image_verify(
         if not stored_image_url:
             raise HTTPException(status_code=404, detail="Biometric image not found for the user")
 
-        stored_temp_filename = f"stored_temp_{uuid.uuid4()}.png"
-        uploaded_temp_filename = f"uploaded_temp_{uuid.uuid4()}.png"
+        content = await biometric_image.read()
 
-        try:
-            # Download the stored image from S3
+        enrolled_encoding = encoding_from_bytes(user.face_encoding)
+        if enrolled_encoding is None:
+            # Users enrolled before encodings were stored: encode the S3 image once and keep it
             s3_key = stored_image_url.split(f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/")[-1]
-            s3_client.download_file(S3_BUCKET_NAME, s3_key, stored_temp_filename)
-
-            # Save the uploaded image temporarily
-            async with aiofiles.open(uploaded_temp_filename, 'wb') as out_file:
-                content = await biometric_image.read()
-                await out_file.write(content)
-
-            # Preprocess both images
-            preprocessed_stored = stored_temp_filename  # Ensure this is a file path
-            preprocessed_uploaded = uploaded_temp_filename  # Ensure this is a file path
-
-            # Compare the images
-            comparison_result = compare_faces(preprocessed_stored, preprocessed_uploaded)
-
-            if comparison_result['error']:
-                raise HTTPException(status_code=400, detail=comparison_result['error'])
-
-            check_spoofing_result = await check_spoofing(uploaded_temp_filename)
-
-            if check_spoofing_result['label'] == "Spoof":
-                raise HTTPException(status_code=400, detail="Spoofing detected")
-            
-            return {
-                "wallet_address": wallet_address,
-                "is_match": comparison_result['is_match'],
-                "face_match_score": comparison_result['distance'],
-                "spoofing_score": check_spoofing_result['prediction'],
-            }
-
-        finally:
-            # Clean up the temporary files
-            for file in [stored_temp_filename, uploaded_temp_filename]:
-                if os.path.exists(file):
-                    os.remove(file)
-
-    except HTTPException as http_err:
-        raise http_err  # Propagate HTTPException
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-    
-def compare_faces(img_path1, img_path2, threshold=0.6):
-    try:
-        # Load images and extract face encodings
-        img1 = face_recognition.load_image_file(img_path1)
-        img2 = face_recognition.load_image_file(img_path2)
-
-        enc1 = face_recognition.face_encodings(img1)
-        enc2 = face_recognition.face_encodings(img2)
-
-        # Check if faces are found in both images
-        if not enc1 or not enc2:
-            return {
-                'distance': None,
-                'is_match': False,
-                'error': 'Face not found in one or both images'
-            }
-
-        # Calculate the face distance and compare
-        distance = float(face_recognition.face_distance([enc1[0]], enc2[0])[0])  # Convert to Python float
-        is_match = bool(distance < threshold)  # Convert to Python bool
-        print(f"Distance: {distance}, Is Match: {is_match}")
+            with span("s3_download"):
+                stored_content = await io_pool.run(download_s3_object, s3_key)
+            with span("face_enrollment"):
+                enrolled_encoding = await cpu_pool.run(enrollment_encoding, stored_content)
+            if enrolled_encoding is not None:
+                # `user` may be a detached copy from the cache, so write the column directly
+                await execute_commit(db, update(User)
+                                     .where(User.wallet_address == wallet_address)
+                                     .values(face_encoding=encoding_to_bytes(enrolled_encoding)))
+                await user_cache.invalidate(wallet_address)
+                # Bulk-imported voters skip the registration check; the account exists, so it is flagged
+                duplicate = await find_duplicate_face(enrolled_encoding)
+                if duplicate and duplicate.wallet_address != wallet_address:
+                    await record_duplicate(db, wallet_address, duplicate)
+                await index_face(wallet_address, enrolled_encoding)
+
+        # Compare the fresh upload against the enrolled encoding
+        verification = await cpu_pool.run(verify_biometric, content, enrolled_encoding)
+        record_all(verification['stages'])
+        comparison_result = verification['comparison']
+        signals["face_match_percentage"] = match_percentage(comparison_result['distance'])
+
+        if comparison_result['error']:
+            raise HTTPException(status_code=400, detail=comparison_result['error'])
+
+        # Liveness inference is batched with concurrent verifications
+        check_spoofing_result = await check_liveness(verification['liveness_input'])
+        signals["liveness_score"] = check_spoofing_result['prediction'] * 100
+
+        if check_spoofing_result['label'] == "Spoof":
+            raise HTTPException(status_code=400, detail="Spoofing detected")
+
+        log_event(logger, "biometric_verified", sample=True, wallet_address=wallet_address,
+                  is_match=comparison_result['is_match'], distance=comparison_result['distance'],
+                  spoofing_score=check_spoofing_result['prediction'])
         return {
-            'distance': distance,
-            'is_match': is_match,
-            'error': None
+            "wallet_address": wallet_address,
+            "is_match": comparison_result['is_match'],
+            "face_match_score": comparison_result['distance'],
+            "spoofing_score": check_spoofing_result['prediction'],
         }
 
+    except (HTTPException, ExecutorBusyError) as http_err:
+        raise http_err  # Propagate HTTPException
     except Exception as e:
-        return {
-            'distance': None,
-            'is_match': False,
-            'error': f"Error during face comparison: {str(e)}"
-        }
+        await rollback(db)
+        log_event(logger, "biometric_verification_failed", logging.ERROR, exc_info=True, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+    finally:
+        if user is not None:
+            await record_signals(db, wallet_address, face_attempt=True, **signals)
     
+async def find_registration_conflict(db, wallet_address: str, email: str) -> Optional[str]:
+    with span("db_lookup", query="registration_conflict"):
+        rows = await fetch_all(db, conflict_query([wallet_address], [email]).limit(2))
+    return registration_conflict(rows, wallet_address, email)
+
+
+def s3_object_url(s3_key: str) -> str:
+    return f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
+
+
+def store_biometric_image(content: bytes, wallet_address: str = None) -> str:
+    """Upload an enrollment image under a fresh key and return its URL (used by bulk import)."""
+    s3_key = f"biometrics/{uuid.uuid4()}.png"
+    upload_s3_object(content, s3_key)
+    return s3_object_url(s3_key)
+
+
+def upload_s3_object(content: bytes, s3_key: str):
+    get_s3_client().upload_fileobj(io.BytesIO(content), S3_BUCKET_NAME, s3_key)
+
 
-async def get_user_by_wallet(db: Session, wallet_address: str) -> Optional[User]:
-    return db.query(User).filter(User.wallet_address == wallet_address).first()
+def download_s3_object(s3_key: str) -> bytes:
+    buffer = io.BytesIO()
+    get_s3_client().download_fileobj(S3_BUCKET_NAME, s3_key, buffer)
+    return buffer.getvalue()
 
 
+async def get_user_by_wallet(db: Union[Session, "AsyncSession"], wallet_address: str) -> Optional[User]:
+    """Read-through the user cache; a hit returns a detached User, so do not modify it to write back."""
+    async def load():
+        # Timed only on cache misses; hits are counted by the cache
+        with span("db_lookup", query="user_by_wallet"):
+            return await find_first(db, User, User.wallet_address == wallet_address)
 
-async def check_spoofing(image_path: str) -> dict:
-    img_array = preprocess_image_from_path(image_path)
-    prediction, label = predict(img_array)
-    return {"prediction": float(prediction), "label": label}
+    return await user_cache.get_or_load(wallet_address, load)
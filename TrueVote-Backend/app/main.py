@@ -1,11 +1,66 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import os
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.routes.user_routes import router as user_router
 from app.routes.verify_captcha import router as verify_captcha_router
-from app.routes.detect_fraud import router as detect_fraud_router
-  
+from app.routes.detect_fraud import router as detect_fraud_router, fraud_registry
+from app.routes.campaign_routes import router as campaign_router
+from app.utils.metrics import metrics
+from app.utils.tracing import RequestMetricsMiddleware
+from app.utils.executors import ExecutorBusyError, shutdown_pools, pools_stats, io_pool, cpu_pool
+from app.utils.liveness import liveness_batcher, aclose_liveness_client, LIVENESS_API_URL
+from app.utils.recaptcha import recaptcha_verifier
+from app.utils.tally_stream import tally_hub
+from app.utils.warmup import Warmup, STARTUP_WARMUP
+from app.utils import biometric_tasks
 
-app = FastAPI()
+load_dotenv()
+
+# Seconds between checks for updated model files on disk (0 disables hot reload)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "0"))
+
+
+warmup = Warmup()
+
+
+async def warm_fraud_models():
+    await io_pool.run(fraud_registry().load_all)
+
+
+async def warm_biometrics():
+    # Starts the CPU pool; process workers load the models in their initializer
+    # (app/utils/executors.py), a thread pool shares the ones loaded by this call
+    await cpu_pool.run(biometric_tasks.warmup, not LIVENESS_API_URL)
+
+
+WARMUP_STEPS = {
+    "fraud_models": warm_fraud_models,
+    "biometrics": warm_biometrics,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve immediately; fraud models and biometric libraries load in the background (see /ready)
+    for name in STARTUP_WARMUP:
+        warmup.add(name, WARMUP_STEPS[name])
+    warmup.start()
+    registry = fraud_registry()
+    registry.start_watcher(MODEL_RELOAD_INTERVAL)
+    yield
+    await warmup.stop()
+    await liveness_batcher.stop()
+    await aclose_liveness_client()
+    await recaptcha_verifier.aclose()
+    await tally_hub.stop()
+    registry.stop_watcher()
+    shutdown_pools()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -15,10 +70,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-route latency and status counts; exported with the stage timings on /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 app.include_router(user_router)
 app.include_router(verify_captcha_router)
 app.include_router(detect_fraud_router)
+app.include_router(campaign_router)
+
+@app.get("/health")
+async def health():
+    # Liveness: the process is up and the event loop responds
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # Prometheus scrape target: request, stage, executor, batcher, cache and model registry metrics
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+async def ready():
+    # Readiness: background warmup has finished, so requests will not wait on model loading
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 #check if the database is connected
 @app.get("/check-db")
@@ -30,3 +110,30 @@ async def check_db():
         return {"status": "Database connected successfully"}
     except Exception as e:
         return {"status": "Database connection failed", "error": str(e)}
+
+
+@app.get("/db/status")
+async def db_status():
+    from app.utils.database import database_stats
+    return database_stats()
+
+
+@app.get("/cache/status")
+async def cache_status():
+    from app.utils.user_cache import user_cache
+    from app.utils.campaign_reader import campaign_reader
+    from app.utils.face_index import face_index
+    return {"users": user_cache.stats(), "campaign_state": campaign_reader.stats(), "face_index": face_index.stats()}
+
+
+@app.get("/streams/status")
+async def streams_status():
+    return {"tallies": tally_hub.stats()}
+
+
+@app.get("/executors/status")
+async def executors_status():
+    stats = pools_stats()
+    stats["liveness_batcher"] = liveness_batcher.stats()
+    stats["recaptcha"] = recaptcha_verifier.stats()
+    return stats
@@ -0,0 +1,63 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Index, UniqueConstraint
+from app.models.base import Base
+
+# Tables written by the chain indexer (app/utils/event_indexer.py). Addresses and hashes are
+# stored lowercase 0x-prefixed hex.
+
+
+class Campaign(Base):
+    __tablename__ = "campaigns"
+
+    # Campaign contract address from CampaignCreated
+    address = Column(String(42), primary_key=True)
+    creator = Column(String(42), nullable=False, index=True)
+    factory_address = Column(String(42), nullable=False)
+
+    block_number = Column(BigInteger, nullable=False, index=True)
+    block_hash = Column(String(66), nullable=False)
+    tx_hash = Column(String(66), nullable=False)
+    log_index = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<Campaign(address='{self.address}', creator='{self.creator}')>"
+
+
+class VoteEvent(Base):
+    __tablename__ = "vote_events"
+    __table_args__ = (
+        UniqueConstraint("tx_hash", "log_index", name="uq_vote_events_log"),
+        # Tallies: COUNT(*) GROUP BY candidate_index for one campaign
+        Index("ix_vote_events_campaign_candidate", "campaign_address", "candidate_index"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    campaign_address = Column(String(42), nullable=False)
+    candidate_index = Column(Integer, nullable=False)
+    # Candidate's running total after this vote, as emitted
+    vote_count = Column(BigInteger, nullable=False)
+    # Transaction sender; VoteCast does not carry the voter
+    voter = Column(String(42), nullable=True, index=True)
+
+    block_number = Column(BigInteger, nullable=False, index=True)
+    block_hash = Column(String(66), nullable=False)
+    tx_hash = Column(String(66), nullable=False)
+    log_index = Column(Integer, nullable=False)
+
+
+class IndexedBlock(Base):
+    """Hash of the last block of each ingested range, kept for reorg detection."""
+
+    __tablename__ = "indexed_blocks"
+
+    block_number = Column(BigInteger, primary_key=True)
+    block_hash = Column(String(66), nullable=False)
+
+
+class IndexerCheckpoint(Base):
+    __tablename__ = "indexer_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    # Last block whose events are fully stored
+    block_number = Column(BigInteger, nullable=False)
+    # Reorg rollbacks so far; readers polling vote_events compare it to notice deleted rows
+    reorgs = Column(BigInteger, nullable=False, default=0, server_default="0")
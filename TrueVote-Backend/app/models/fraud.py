@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, UniqueConstraint
+from app.models.base import Base
+
+# Fraud-detection tables: the streaming scorer (app/utils/fraud_stream.py) and duplicate faces
+# found at registration (app/utils/face_index.py). Addresses in voter_signals and flagged_votes
+# are stored lowercase 0x-prefixed hex so they join with vote_events.voter.
+
+
+class VoterSignals(Base):
+    """Verification signals of one wallet, recorded server-side as the voter goes through the checks."""
+
+    __tablename__ = "voter_signals"
+
+    wallet_address = Column(String(42), primary_key=True)
+    first_seen_at = Column(DateTime, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+
+    # Biometric logins attempted, successful or not
+    face_attempts = Column(Integer, nullable=False, default=0)
+    # Failed reCAPTCHA verifications
+    robot_detections = Column(Integer, nullable=False, default=0)
+    # Of the latest biometric login, 0-100
+    face_match_percentage = Column(Float, nullable=True)
+    liveness_score = Column(Float, nullable=True)
+
+
+class FlaggedVote(Base):
+    __tablename__ = "flagged_votes"
+    __table_args__ = (
+        UniqueConstraint("tx_hash", "log_index", name="uq_flagged_votes_log"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    voter = Column(String(42), nullable=True, index=True)
+    campaign_address = Column(String(42), nullable=True, index=True)
+    # vote_events.id when the vote came from the indexer
+    vote_event_id = Column(BigInteger, nullable=True)
+    tx_hash = Column(String(66), nullable=True)
+    log_index = Column(Integer, nullable=True)
+    block_number = Column(BigInteger, nullable=True)
+
+    # "model": the stacked model predicted fraud; "no_signals": the voter never passed the checks
+    reason = Column(String(20), nullable=False)
+    # Features the vote was scored with
+    time_diff_mins = Column(Float, nullable=True)
+    face_attempts = Column(Integer, nullable=True)
+    robot_detected = Column(Integer, nullable=True)
+    face_match_percentage = Column(Float, nullable=True)
+    liveness_score = Column(Float, nullable=True)
+    flagged_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class FraudStreamCheckpoint(Base):
+    __tablename__ = "fraud_stream_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    # Last vote_events.id whose vote is scored
+    last_event_id = Column(BigInteger, nullable=False)
+
+
+class FraudStreamDeadLetter(Base):
+    """A vote the streaming scorer gave up on after a non-transient error in one of its stages."""
+
+    __tablename__ = "fraud_stream_dead_letters"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # "join", "score" or "write"
+    stage = Column(String(10), nullable=False)
+    vote_event_id = Column(BigInteger, nullable=True)
+    voter = Column(String(42), nullable=True)
+    tx_hash = Column(String(66), nullable=True)
+    log_index = Column(Integer, nullable=True)
+    block_number = Column(BigInteger, nullable=True)
+    error = Column(String(500), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class FaceDuplicate(Base):
+    """A registration whose face is within FACE_DUPLICATE_THRESHOLD of an already enrolled wallet."""
+
+    __tablename__ = "face_duplicates"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    wallet_address = Column(String(150), nullable=False, index=True)
+    # Enrolled wallet with the nearest face
+    duplicate_of = Column(String(150), nullable=False, index=True)
+    distance = Column(Float, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
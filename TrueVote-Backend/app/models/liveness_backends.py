@@ -0,0 +1,121 @@
+"""
+Inference backends for the liveness model. Each takes a float32 (N, 224, 224, 3) batch
+scaled to [0, 1] and returns the N "live" probabilities.
+
+- keras:  the original models/face-latest.hdf5 (TensorFlow)
+- tflite: a converted .tflite file, full precision or float16/int8 quantized
+          (tflite_runtime or ai_edge_litert if installed, otherwise tf.lite)
+- onnx:   a converted .onnx file run with ONNX Runtime
+
+Converted models are produced by app/utils/scripts/convert_liveness_model.py.
+"""
+import threading
+
+import numpy as np
+
+
+def quantize(values: np.ndarray, scale: float, zero_point: int, dtype) -> np.ndarray:
+    """Float -> integer tensor using a TFLite (scale, zero_point) pair, saturating at the dtype range."""
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(values / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def dequantize(values: np.ndarray, scale: float, zero_point: int) -> np.ndarray:
+    return (values.astype(np.float32) - zero_point) * np.float32(scale)
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path: str):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(path)
+
+    def predict_scores(self, img_arrays: np.ndarray) -> np.ndarray:
+        return self.model.predict(img_arrays, batch_size=len(img_arrays), verbose=0)[:, 0]
+
+
+def _tflite_interpreter():
+    # Prefer the standalone runtimes, which do not pull in all of TensorFlow
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class TFLiteBackend:
+    name = "tflite"
+
+    def __init__(self, path: str, num_threads: int = 1):
+        Interpreter = _tflite_interpreter()
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = int(self.input['shape'][0])
+        # An interpreter holds mutable tensors; with a thread pool, calls must not interleave
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size: int):
+        if batch_size != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input['index'], [batch_size, *self.input['shape'][1:]])
+            self.interpreter.allocate_tensors()
+            self.input = self.interpreter.get_input_details()[0]
+            self.output = self.interpreter.get_output_details()[0]
+            self.batch_size = batch_size
+
+    def predict_scores(self, img_arrays: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._resize(len(img_arrays))
+            inputs = img_arrays
+            scale, zero_point = self.input['quantization']
+            if np.issubdtype(self.input['dtype'], np.integer) and scale:
+                inputs = quantize(img_arrays, scale, zero_point, self.input['dtype'])
+            self.interpreter.set_tensor(self.input['index'], inputs.astype(self.input['dtype'], copy=False))
+            self.interpreter.invoke()
+            outputs = self.interpreter.get_tensor(self.output['index'])
+
+            scale, zero_point = self.output['quantization']
+            if np.issubdtype(outputs.dtype, np.integer) and scale:
+                outputs = dequantize(outputs, scale, zero_point)
+        return outputs[:, 0].astype(np.float32)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path: str, num_threads: int = 1):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_scores(self, img_arrays: np.ndarray) -> np.ndarray:
+        outputs = self.session.run(None, {self.input_name: img_arrays.astype(np.float32, copy=False)})[0]
+        return outputs[:, 0].astype(np.float32)
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def load_backend(name: str, path: str, num_threads: int = 1):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown liveness backend {name!r}; expected one of {sorted(BACKENDS)}")
+    if name == "keras":
+        # TensorFlow manages its own thread pools
+        return KerasBackend(path)
+    return BACKENDS[name](path, num_threads=num_threads)
@@ -1,10 +1,45 @@
 import os
-from tensorflow.keras.models import load_model
 
-model_path = os.path.join("models", "face-latest.hdf5")
-model = load_model(model_path)
+import numpy as np
+from dotenv import load_dotenv
+
+from app.models.liveness_backends import load_backend
+
+load_dotenv()
+
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "models"))
+
+# "keras" (face-latest.hdf5), "tflite" or "onnx" (converted by app/utils/scripts/convert_liveness_model.py)
+LIVENESS_BACKEND = os.getenv("LIVENESS_BACKEND", "keras").lower()
+LIVENESS_MODEL_PATHS = {
+    "keras": os.getenv("LIVENESS_KERAS_PATH", os.path.join(MODELS_DIR, "face-latest.hdf5")),
+    "tflite": os.getenv("LIVENESS_TFLITE_PATH", os.path.join(MODELS_DIR, "face-latest.tflite")),
+    "onnx": os.getenv("LIVENESS_ONNX_PATH", os.path.join(MODELS_DIR, "face-latest.onnx")),
+}
+# Intra-op threads for the TFLite/ONNX backends; keep at 1 when every CPU pool worker runs its own copy
+LIVENESS_NUM_THREADS = int(os.getenv("LIVENESS_NUM_THREADS", "1"))
+
+model_path = LIVENESS_MODEL_PATHS.get(LIVENESS_BACKEND)
+backend = None
+
+
+def load():
+    """Load the configured liveness backend on first use; its runtime is only imported here."""
+    global backend
+    if backend is None:
+        backend = load_backend(LIVENESS_BACKEND, model_path, LIVENESS_NUM_THREADS)
+    return backend
+
+def warmup():
+    # The first predict builds the inference graph / allocates tensors; do it before serving traffic
+    predict_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
 
 def predict(img_array) -> (float, str):
-    pred = model.predict(img_array)[0][0]
+    pred = load().predict_scores(img_array)[0]
     label = "Live" if pred > 0.5 else "Spoof"
     return float(pred), label
+
+def predict_batch(img_arrays) -> list:
+    """One forward pass over a stacked (N, 224, 224, 3) batch; returns [(prediction, label), ...]."""
+    preds = load().predict_scores(img_arrays)
+    return [(float(pred), "Live" if pred > 0.5 else "Spoof") for pred in preds]
@@ -15,6 +15,9 @@ class User(Base):
     # Biometric data stored as binary
     biometric_image_url = Column(String(100), nullable=True)
 
+    # 128-d face encoding of the enrollment image as float32 bytes (see app/utils/face_encoding.py)
+    face_encoding = Column(LargeBinary(512), nullable=True)
+
 
     def __repr__(self):
         return f"<User(wallet_address='{self.wallet_address}', email='{self.email}')>" 
\ No newline at end of file
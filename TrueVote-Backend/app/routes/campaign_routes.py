@@ -0,0 +1,104 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import requests
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from pydantic import BaseModel
+from app.controllers.campaign_controller import list_campaigns, get_campaign, get_tally
+from app.utils.database import get_user_db
+from app.utils.executors import io_pool
+from app.utils.campaign_reader import campaign_reader
+from app.utils.chain_rpc import JsonRpcError
+from app.utils.tally_stream import tally_hub
+
+router = APIRouter(prefix="/api/campaigns", tags=["campaigns"])
+
+# Campaigns per /state request (each is 11-13 eth_calls)
+MAX_STATE_ADDRESSES = 200
+
+
+class CampaignSummary(BaseModel):
+    address: str
+    creator: str
+    block_number: int
+    tx_hash: str
+    total_votes: int
+
+
+class CandidateTally(BaseModel):
+    candidate_index: int
+    votes: int
+
+
+class TallyResponse(BaseModel):
+    tallies: List[CandidateTally]
+    total_votes: int
+    # Last block included in the tallies
+    indexed_block: Optional[int]
+
+
+class CampaignResponse(TallyResponse):
+    address: str
+    creator: str
+    block_number: int
+    tx_hash: str
+
+
+@router.get("", response_model=List[CampaignSummary])
+async def campaigns(
+    creator: Optional[str] = None,
+    voter: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_user_db)
+):
+    """
+    Indexed campaigns, optionally only those created by `creator` or voted in by `voter`
+    """
+    return await list_campaigns(db, creator=creator, voter=voter, limit=limit, offset=offset)
+
+
+@router.get("/state")
+async def campaigns_state(
+    address: List[str] = Query(...),
+    voter: Optional[str] = None,
+):
+    """
+    Live contract state of each campaign (name, candidates with votes, voting window and, with
+    `voter`, isVoted / isEligibleVoter), read from the node in one batched request per block
+    """
+    if len(address) > MAX_STATE_ADDRESSES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATE_ADDRESSES} addresses per request")
+    try:
+        return await io_pool.run(campaign_reader.read, address, voter)
+    except (requests.RequestException, JsonRpcError) as e:
+        raise HTTPException(status_code=502, detail=f"Chain node error: {e}")
+
+
+@router.get("/{address}", response_model=CampaignResponse)
+async def campaign(address: str, db: Session = Depends(get_user_db)):
+    result = await get_campaign(db, address)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return result
+
+
+@router.get("/{address}/tally", response_model=TallyResponse)
+async def campaign_tally(address: str, db: Session = Depends(get_user_db)):
+    """
+    Votes per candidate index from indexed VoteCast events
+    """
+    return await get_tally(db, address)
+
+
+@router.get("/{address}/stream")
+async def campaign_stream(address: str):
+    """
+    Server-Sent Events: `tally` events with the campaign's current tally, then one per change
+    """
+    return StreamingResponse(
+        tally_hub.stream(address),
+        media_type="text/event-stream",
+        # Disable proxy buffering so updates reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,40 @@
 from fastapi import APIRouter
 from fastapi import HTTPException
+from typing import List
+import logging
 from app.schemas.fraud_detection import ElectionFraudDetectionResponse, ElectionFraudDetectionRequest
 import pandas as pd
-from app.utils.model import stacked_model_predict
+import os
+from dotenv import load_dotenv
+from app.utils.model import stacked_model_predict, address_hash_cache_stats
+from app.utils.model_registry import registry
+from app.utils.fraud_inference import compact_registry
+from app.utils.log import get_logger, log_event
+from app.utils.tracing import span
+
+load_dotenv()
+
+# Upper bound on the number of votes accepted by a single /validate_votes/ call
+VALIDATE_VOTES_MAX_BATCH = int(os.getenv("VALIDATE_VOTES_MAX_BATCH", "10000"))
+
+# "sklearn" unpickles the original models; "compact" evaluates models/fraud_model.npz with NumPy only
+FRAUD_MODEL_BACKEND = os.getenv("FRAUD_MODEL_BACKEND", "sklearn").lower()
 
 router = APIRouter()
+logger = get_logger("fraud")
+
+def fraud_registry():
+    return compact_registry if FRAUD_MODEL_BACKEND == "compact" else registry
+
+def fraud_predict(data: pd.DataFrame) -> dict:
+    with span("fraud_predict", backend=FRAUD_MODEL_BACKEND):
+        if FRAUD_MODEL_BACKEND == "compact":
+            return compact_registry.get('fraud_model').predict_frame(data)
+        return stacked_model_predict(data)
+
+def requests_to_frame(requests: List[ElectionFraudDetectionRequest]) -> pd.DataFrame:
+    # Field aliases match the column names the models were trained on
+    return pd.DataFrame([request.model_dump(by_alias=True) for request in requests])
 
 @router.post("/validate_vote/", response_model=ElectionFraudDetectionResponse)
 def validate_vote(data: ElectionFraudDetectionRequest):
@@ -18,10 +48,10 @@ def validate_vote(data: ElectionFraudDetectionRequest):
             "Liveness Score of The Face": [data.Liveness_Score_of_The_Face]
         })
 
-        print("Data received for prediction:", data, type(data))
-
-        fraud_pred = stacked_model_predict(data)
+        fraud_pred = fraud_predict(data)
         if fraud_pred:
+            log_event(logger, "vote_scored", sample=True, address=data.Address[0],
+                      is_fraud=int(fraud_pred['is_fraud'][0]))
             return ElectionFraudDetectionResponse(
                 Address=fraud_pred['Address'][0],
                 is_fraud=fraud_pred['is_fraud'][0]
@@ -30,5 +60,44 @@ def validate_vote(data: ElectionFraudDetectionRequest):
             raise HTTPException(status_code=400, detail="Prediction failed.")
         
     except Exception as e:
-        print("Error during prediction:", str(e))
+        log_event(logger, "prediction_failed", logging.ERROR, exc_info=True, error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/validate_votes/", response_model=List[ElectionFraudDetectionResponse])
+def validate_votes(data: List[ElectionFraudDetectionRequest]):
+    """
+    Score many votes with a single pass through the stacked model
+    """
+    if not data:
+        return []
+    if len(data) > VALIDATE_VOTES_MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(data)} votes (max {VALIDATE_VOTES_MAX_BATCH})"
+        )
+
+    try:
+        fraud_pred = fraud_predict(requests_to_frame(data))
+    except Exception as e:
+        log_event(logger, "batch_prediction_failed", logging.ERROR, exc_info=True, votes=len(data), error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not fraud_pred:
+        raise HTTPException(status_code=400, detail="Prediction failed.")
+
+    return [
+        ElectionFraudDetectionResponse(Address=address, is_fraud=bool(is_fraud))
+        for address, is_fraud in zip(fraud_pred['Address'], fraud_pred['is_fraud'])
+    ]
+
+
+@router.get("/models/status")
+def models_status():
+    """
+    Loaded fraud-detection artifacts with load-time and cache-hit metrics
+    """
+    stats = fraud_registry().stats()
+    stats["backend"] = FRAUD_MODEL_BACKEND
+    stats["address_hash_cache"] = address_hash_cache_stats()
+    return stats
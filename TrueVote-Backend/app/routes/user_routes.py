@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
 from sqlalchemy.orm import Session
 from app.controllers.user_controller import register_user,biometric_image_verify, get_user_by_wallet
-from app.utils.database import get_db
+from app.utils.database import get_user_db
 from typing import Optional
 from pydantic import BaseModel, EmailStr
 from pydantic import BaseModel
@@ -26,12 +26,11 @@ async def register(
     last_name: str = Form(...),
     email: EmailStr = Form(...),
     biometric_image: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_db)
 ):
     """
     Register a new user with their details and biometric data
     """
-    print(f"Registering user with wallet address: {wallet_address}")
     user = await register_user(
         db=db,
         wallet_address=wallet_address,
@@ -52,7 +51,7 @@ class LoginRequest(BaseModel):
 async def login(
     login_request: LoginRequest,
     response: Response,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_db)
 ):
     """
     Login a user with their wallet address
@@ -71,10 +70,8 @@ async def login(
 async def biometric_auth(
     wallet_address: str = Form(...),
     biometric_image: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_db)
 ):
-    print(f"Biometric authentication for wallet address: {wallet_address}")
-    print(f"Biometric image: {biometric_image.filename}")
     result = await biometric_image_verify(
         db=db,
         wallet_address=wallet_address,
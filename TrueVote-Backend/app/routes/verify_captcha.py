@@ -1,26 +1,24 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Cookie, Request
 from fastapi import HTTPException
 from app.schemas.recaptcha_response import CaptchaRequest
-import pandas as pd
-import os
-from dotenv import load_dotenv
-import requests
-
-load_dotenv()
-
-# Use reCAPTCHA secret key in .env file
-SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
+from app.utils.recaptcha import recaptcha_verifier, RecaptchaUnavailableError
 
 router = APIRouter()
 
 @router.post("/verify-captcha")
-async def verify_captcha(data: CaptchaRequest):
-    response = requests.post(
-        "https://www.google.com/recaptcha/api/siteverify",
-        data={
-            "secret": SECRET_KEY,
-            "response": data.token
-        }
-    )
-    result = response.json()
-    return result
\ No newline at end of file
+async def verify_captcha(
+    data: CaptchaRequest,
+    request: Request,
+    wallet_address: Optional[str] = Cookie(None),
+):
+    # Pooled async client: keep-alive connections, retries and token dedup (app/utils/recaptcha.py)
+    try:
+        # A resubmitted token only reuses the verdict given to the same client and session
+        requester = f"{request.client.host if request.client else ''}|{wallet_address or ''}"
+        result = await recaptcha_verifier.verify(data.token, requester)
+    except RecaptchaUnavailableError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    # No robot signal is recorded: the wallet_address cookie is unsigned and set by an
+    # unauthenticated login, so it cannot attribute a failed CAPTCHA to a voter
+    return result
@@ -1,4 +1,4 @@
 from pydantic import BaseModel
 
 class CaptchaRequest(BaseModel):
-    token: str
\ No newline at end of file
+    token: str
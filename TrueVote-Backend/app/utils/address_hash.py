@@ -0,0 +1,70 @@
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+from dotenv import load_dotenv
+from Crypto.Hash import keccak
+
+from app.utils.log import get_logger, log_event
+
+load_dotenv()
+
+# Per-call logging in the scoring path is expensive; only enable it when debugging
+FRAUD_DEBUG = os.getenv("FRAUD_DEBUG", "false").lower() in ("1", "true", "yes")
+
+logger = get_logger("fraud")
+# Writes the per-call debug events below without lowering LOG_LEVEL for every other logger
+if FRAUD_DEBUG:
+    logger.setLevel(logging.DEBUG)
+
+# Number of normalized wallet-address hashes kept in memory
+ADDRESS_HASH_CACHE_SIZE = int(os.getenv("ADDRESS_HASH_CACHE_SIZE", "100000"))
+
+
+@lru_cache(maxsize=ADDRESS_HASH_CACHE_SIZE)
+def _normalized_address(address):
+    keccak_hash = keccak.new(digest_bits=256)
+
+    try:
+        keccak_hash.update(address.encode())
+    except Exception as e:
+        log_event(logger, "address_hash_failed", logging.DEBUG, error=str(e))
+        raise
+
+    decimal_address = int(keccak_hash.hexdigest(), 16)
+    return decimal_address / (2**256 - 1)
+
+
+def hash_address(address):
+    log_event(logger, "hash_address", logging.DEBUG, address=address)
+
+    if not isinstance(address, str):
+        log_event(logger, "invalid_address_type", logging.DEBUG, type=type(address).__name__)
+        raise ValueError("Address must be a non-null string.")
+
+    return _normalized_address(address)
+
+
+def configure_address_hash_cache(maxsize):
+    """Resize the address hash cache; existing entries and stats are dropped."""
+    global _normalized_address
+    _normalized_address = lru_cache(maxsize=maxsize)(_normalized_address.__wrapped__)
+
+
+def address_hash_cache_stats():
+    info = _normalized_address.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        # Every miss inserts an entry, so anything not still cached was evicted
+        "evictions": info.misses - info.currsize,
+        "hit_rate": info.hits / (info.hits + info.misses) if info.hits + info.misses else 0.0,
+    }
+
+
+def hash_addresses(addresses):
+    addresses = list(addresses)
+    return np.fromiter((hash_address(address) for address in addresses), dtype=np.float64, count=len(addresses))
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.utils.metrics import metrics
+
+
+class BatcherStoppedError(RuntimeError):
+    """Raised to callers whose item was still queued when the batcher stopped."""
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into one batched call.
+
+    A batch is dispatched when `max_batch_size` items are waiting or `max_latency`
+    seconds have passed since the first item in it arrived, whichever comes first.
+    Each caller awaits `submit()` and receives the output row for its own input.
+    `predict_batch` is an async callable taking a stacked array and returning one
+    output per row (run it on a worker pool so inference does not block the loop).
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], Awaitable],
+        max_batch_size: int = 16,
+        max_latency: float = 0.005,
+        max_concurrency: int = 1,
+        name: str = "batcher",
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batches = set()
+
+        labels = {"batcher": name}
+        self._batch_size = metrics.histogram("batcher_batch_size", "Items per dispatched batch", labels,
+                                             buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+        self._queue_wait = metrics.histogram("batcher_queue_wait_seconds", "Time an item waited to be batched", labels)
+        self._batch_seconds = metrics.histogram("batcher_batch_seconds", "Time spent running one batch", labels)
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        while True:
+            # Wait for a free slot first so requests arriving meanwhile join the next batch
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = batch[0][2] + self.max_latency
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                self._fail(batch, BatcherStoppedError(f"{self.name} stopped"))
+                self._slots.release()
+                raise
+
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        try:
+            for _, _, enqueued in batch:
+                self._queue_wait.observe(now - enqueued)
+            self._batch_size.observe(len(batch))
+
+            # Stacking fails on a malformed item; like a model error, it fails the whole batch
+            inputs = np.stack([item for item, _, _ in batch])
+            outputs = list(await self.predict_batch(inputs))
+            if len(outputs) != len(batch):
+                raise ValueError(f"{self.name} got {len(outputs)} outputs for a batch of {len(batch)}")
+            for (_, future, _), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        except Exception as e:
+            self._fail(batch, e)
+        finally:
+            # Nobody may be left waiting, even if this task is cancelled
+            self._fail(batch, BatcherStoppedError(f"{self.name} stopped"))
+            self._batch_seconds.observe(time.perf_counter() - now)
+            self._slots.release()
+
+    @staticmethod
+    def _fail(batch, error: BaseException):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        # Items queued after the last batch was collected
+        if self._queue is not None:
+            leftover = []
+            while not self._queue.empty():
+                leftover.append(self._queue.get_nowait())
+            self._fail(leftover, BatcherStoppedError(f"{self.name} stopped"))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_latency": self.max_latency,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self._batch_size.snapshot(),
+            "queue_wait_seconds": self._queue_wait.snapshot(),
+            "batch_seconds": self._batch_seconds.snapshot(),
+        }
@@ -0,0 +1,73 @@
+"""
+CPU-bound biometric work, packaged so each request makes a single call into the CPU pool.
+
+With a process pool only the raw upload bytes go to the worker and only small results come
+back; the full-size decoded image never crosses the process boundary. The 224x224 liveness
+input is returned so it can be batched with other requests (app/utils/liveness.py).
+
+Faces are detected once per image on a downscaled copy (FACE_DETECTION_* in
+app/utils/face_matching.py); the box is reused for the encoding and for the liveness crop.
+
+Stage timings are collected in the worker and returned under 'stages' for the caller to record
+(app/utils/tracing.py), since a worker process has its own metrics registry.
+"""
+from typing import Optional
+
+import numpy as np
+
+from app.utils.image_preprocess import decode_image, preprocess_face, LIVENESS_CROP
+from app.utils.face_matching import (
+    face_encoding_from_image, compare_face_to_encoding, detect_faces, load_face_recognition,
+)
+from app.utils.tracing import capture, span
+
+
+def enrollment_encoding(content: bytes) -> Optional[np.ndarray]:
+    return face_encoding_from_image(decode_image(content))
+
+
+def verify_biometric(content: bytes, enrolled_encoding: Optional[np.ndarray], threshold: float = 0.6) -> dict:
+    with capture() as stages:
+        result = _verify_biometric(content, enrolled_encoding, threshold)
+    result['stages'] = stages
+    return result
+
+
+def _verify_biometric(content: bytes, enrolled_encoding: Optional[np.ndarray], threshold: float) -> dict:
+    # Decode once; the face matcher and the liveness model share the array
+    with span("image_decode"):
+        image = decode_image(content)
+
+    with span("face_detection"):
+        locations = detect_faces(image)
+
+    with span("face_encoding"):
+        comparison = compare_face_to_encoding(enrolled_encoding, image, threshold, locations)
+    if comparison['error']:
+        return {'comparison': comparison, 'liveness_input': None, 'face_location': None}
+
+    # With LIVENESS_CROP=face the liveness model sees the face found for matching, not the whole upload
+    crop = locations[0] if LIVENESS_CROP == "face" else None
+    with span("liveness_preprocess"):
+        liveness_input = preprocess_face(image, crop)
+    return {'comparison': comparison, 'liveness_input': liveness_input, 'face_location': locations[0]}
+
+
+def init_worker():
+    """CPU process pool initializer: each worker loads the models before taking its first task."""
+    from app.utils.liveness import LIVENESS_API_URL
+    try:
+        warmup(not LIVENESS_API_URL)
+    except Exception:
+        # Raising here would break the whole pool; the models load on first use instead and the
+        # startup warmup step reports the error on /ready
+        pass
+
+
+def warmup(load_liveness_model: bool = True):
+    # Runs in a CPU pool worker at startup so the first request does not pay for the imports
+    load_face_recognition()
+    if load_liveness_model:
+        from app.models import model
+        model.load()
+        model.warmup()
@@ -0,0 +1,170 @@
+"""
+Reads the full state of many Campaign contracts with a constant number of node round trips.
+
+All view calls for all requested campaigns (name, description, candidates with their votes,
+voting window, owner, type, and for a given voter isVoted / isEligibleVoter) are sent as one
+JSON-RPC batch of eth_calls pinned to a single block, so every campaign on a dashboard is read
+at the same block. Candidates come from `getAllVotesOfCandidates()`, which returns every
+(name, voteCount) pair in one call instead of getCandidatesCount + getCandidate(i) per index.
+
+Results are cached per block number: until a new block is mined, repeated reads are answered
+from memory. The head block number itself is reused for CAMPAIGN_READER_BLOCK_TTL seconds, so
+a warm dashboard load costs no round trip at all, a new block costs two (head + one batch, or
+more batches only beyond CAMPAIGN_READER_MAX_BATCH calls).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.utils.chain_rpc import JsonRpcClient, JsonRpcError, encode_call, decode_abi, to_hex
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+# Seconds a fetched head block number is reused (about a block time or less)
+CAMPAIGN_READER_BLOCK_TTL = float(os.getenv("CAMPAIGN_READER_BLOCK_TTL", "1"))
+# Most eth_calls per HTTP request; providers reject very large batches
+CAMPAIGN_READER_MAX_BATCH = int(os.getenv("CAMPAIGN_READER_MAX_BATCH", "500"))
+# Blocks whose results stay cached
+CAMPAIGN_READER_CACHED_BLOCKS = int(os.getenv("CAMPAIGN_READER_CACHED_BLOCKS", "4"))
+
+# field -> (function signature, return types)
+CAMPAIGN_CALLS = {
+    "name": ("getCampaignName()", "string"),
+    "description": ("getCampaignDescription()", "string"),
+    "date": ("getCampaignDate()", "string"),
+    "campaign_number": ("getCampaignNumber()", "uint256"),
+    "owner": ("getCampaignOwner()", "address"),
+    "is_public": ("getType()", "bool"),
+    "voting_open": ("getVotingStatus()", "bool"),
+    "start_time": ("getStartTime()", "uint256"),
+    "end_time": ("getEndTime()", "uint256"),
+    "remaining_time": ("getRemainingTime()", "uint256"),
+    "candidates": ("getAllVotesOfCandidates()", "(string,uint256)[]"),
+}
+VOTER_CALLS = {
+    "has_voted": ("isVoted(address)", "bool"),
+    "is_eligible": ("isEligibleVoter(address)", "bool"),
+}
+
+
+def campaign_calls(address: str, voter: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """(field, calldata, return types) for every view call needed for one campaign."""
+    calls = [(field, encode_call(signature), types) for field, (signature, types) in CAMPAIGN_CALLS.items()]
+    if voter:
+        calls += [(field, encode_call(signature, voter), types) for field, (signature, types) in VOTER_CALLS.items()]
+    return calls
+
+
+def build_state(address: str, results: Dict[str, object]) -> dict:
+    state = {"address": address, "errors": {}}
+    for field, value in results.items():
+        if isinstance(value, JsonRpcError):
+            # A reverted call (e.g. not a Campaign contract) fails only its field
+            state["errors"][field] = value.message
+            state[field] = None
+        elif field == "candidates":
+            state[field] = [{"index": i, "name": name, "votes": votes} for i, (name, votes) in enumerate(value)]
+        else:
+            state[field] = value
+    candidates = state.get("candidates")
+    state["total_votes"] = sum(c["votes"] for c in candidates) if candidates is not None else None
+    return state
+
+
+class CampaignReader:
+    def __init__(
+        self,
+        rpc: JsonRpcClient,
+        block_ttl: float = CAMPAIGN_READER_BLOCK_TTL,
+        max_batch: int = CAMPAIGN_READER_MAX_BATCH,
+        cached_blocks: int = CAMPAIGN_READER_CACHED_BLOCKS,
+        clock=time.monotonic,
+        name: str = "campaigns",
+    ):
+        self.rpc = rpc
+        self.block_ttl = block_ttl
+        self.max_batch = max_batch
+        self.cached_blocks = cached_blocks
+        self._clock = clock
+        self._head: Optional[Tuple[int, float]] = None
+        # block number -> {(address, voter): state}
+        self._cache: "OrderedDict[int, Dict[tuple, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        labels = {"reader": name}
+        self._hits = metrics.counter("campaign_reader_cache_hits_total", "Campaign states served from the block cache", labels)
+        self._misses = metrics.counter("campaign_reader_cache_misses_total", "Campaign states read from the node", labels)
+
+    def head_block(self) -> int:
+        now = self._clock()
+        if self._head is not None and now - self._head[1] < self.block_ttl:
+            return self._head[0]
+        block = self.rpc.block_number()
+        self._head = (block, now)
+        return block
+
+    def read(self, addresses: Iterable[str], voter: Optional[str] = None, block: Optional[int] = None) -> List[dict]:
+        """State of each campaign at `block` (default: head), in the order given."""
+        addresses = [a.lower() for a in addresses]
+        voter = voter.lower() if voter else None
+        block = self.head_block() if block is None else block
+
+        with self._lock:
+            cached = dict(self._cache.get(block, {}))
+        missing = [a for a in dict.fromkeys(addresses) if (a, voter) not in cached]
+        self._hits.inc(len(addresses) - len(missing))
+        self._misses.inc(len(missing))
+
+        if missing:
+            fetched = self._fetch(missing, voter, block)
+            with self._lock:
+                entries = self._cache.setdefault(block, {})
+                entries.update({(a, voter): state for a, state in fetched.items()})
+                self._cache.move_to_end(block)
+                while len(self._cache) > self.cached_blocks:
+                    self._cache.popitem(last=False)
+            cached.update({(a, voter): state for a, state in fetched.items()})
+
+        return [dict(cached[(a, voter)], block_number=block) for a in addresses]
+
+    def _fetch(self, addresses: List[str], voter: Optional[str], block: int) -> Dict[str, dict]:
+        plan = [(address, field, calldata, types)
+                for address in addresses
+                for field, calldata, types in campaign_calls(address, voter)]
+        block_tag = to_hex(block)
+        replies = []
+        for start in range(0, len(plan), self.max_batch):
+            chunk = plan[start:start + self.max_batch]
+            replies += self.rpc.batch(
+                [("eth_call", [{"to": address, "data": calldata}, block_tag]) for address, _, calldata, _ in chunk],
+                return_errors=True,
+            )
+
+        results: Dict[str, Dict[str, object]] = {address: {} for address in addresses}
+        for (address, field, _, types), reply in zip(plan, replies):
+            if isinstance(reply, JsonRpcError):
+                results[address][field] = reply
+            elif reply in (None, "0x"):
+                # eth_call to an address without code returns empty data
+                results[address][field] = JsonRpcError(0, "empty result (no contract at this address?)")
+            else:
+                value = decode_abi(types, reply)
+                results[address][field] = value[0] if len(value) == 1 else value
+        return {address: build_state(address, fields) for address, fields in results.items()}
+
+    def stats(self) -> dict:
+        return {
+            "head_block": self._head[0] if self._head else None,
+            "cached_blocks": list(self._cache),
+            "cache_hits": self._hits.value,
+            "cache_misses": self._misses.value,
+            "rpc": self.rpc.stats(),
+        }
+
+
+campaign_reader = CampaignReader(JsonRpcClient(name="campaign_reader"))
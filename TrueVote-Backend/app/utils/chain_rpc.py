@@ -0,0 +1,232 @@
+"""
+Minimal Ethereum JSON-RPC client and ABI helpers for the TrueVote contracts.
+
+Only what the indexer and campaign readers need: single and batched calls over one keep-alive
+HTTP session, hex quantity conversion, call encoding with static arguments, and decoding of the
+ABI types the TrueVote contracts return (uint256, bool, address, string, tuples and arrays).
+"""
+import itertools
+import os
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+import requests
+from Crypto.Hash import keccak
+from dotenv import load_dotenv
+
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+# Local Hardhat node by default (`npx hardhat node`)
+CHAIN_RPC_URL = os.getenv("CHAIN_RPC_URL", "http://127.0.0.1:8545")
+CHAIN_RPC_TIMEOUT = float(os.getenv("CHAIN_RPC_TIMEOUT", "10"))
+
+
+class JsonRpcError(RuntimeError):
+    """Error object returned by the node for a call."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"JSON-RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def keccak_hex(text: str) -> str:
+    digest = keccak.new(digest_bits=256)
+    digest.update(text.encode())
+    return "0x" + digest.hexdigest()
+
+
+def event_topic(signature: str) -> str:
+    """topic0 of an event, e.g. event_topic("VoteCast(uint256,uint256)")."""
+    return keccak_hex(signature)
+
+
+def to_int(quantity: str) -> int:
+    return int(quantity, 16)
+
+
+def to_hex(number: int) -> str:
+    return hex(number)
+
+
+def decode_words(data: str) -> List[str]:
+    """Split ABI-encoded data into 32-byte words (hex, without 0x)."""
+    payload = data[2:] if data.startswith("0x") else data
+    return [payload[i:i + 64] for i in range(0, len(payload), 64)]
+
+
+def decode_uint(word: str) -> int:
+    return int(word, 16)
+
+
+def decode_address(word: str) -> str:
+    return "0x" + word[-40:]
+
+
+def decode_bool(word: str) -> bool:
+    return int(word, 16) != 0
+
+
+def function_selector(signature: str) -> str:
+    """First 4 bytes of keccak256 of e.g. "getCandidate(uint256)", as 0x-prefixed hex."""
+    return keccak_hex(signature)[:10]
+
+
+def encode_call(signature: str, *args) -> str:
+    """Calldata for a function with static arguments (uint256, bool, address)."""
+    words = []
+    for arg in args:
+        if isinstance(arg, str):
+            words.append(arg.lower().replace("0x", "").rjust(64, "0"))
+        else:
+            words.append(format(int(arg), "064x"))
+    return function_selector(signature) + "".join(words)
+
+
+def split_types(types: str) -> List[str]:
+    """"string,(string,uint256)[]" -> ["string", "(string,uint256)[]"] (top-level commas only)."""
+    parts, depth, current = [], 0, ""
+    for char in types:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _is_dynamic(abi_type: str) -> bool:
+    if abi_type in ("string", "bytes") or abi_type.endswith("[]"):
+        return True
+    if abi_type.startswith("("):
+        return any(_is_dynamic(t) for t in split_types(abi_type[1:-1]))
+    return False
+
+
+def _word(raw: bytes, position: int) -> int:
+    return int.from_bytes(raw[position:position + 32], "big")
+
+
+def _decode(abi_type: str, raw: bytes, head: int, base: int):
+    # `head` is where this value's slot is; offsets of dynamic values are relative to `base`
+    if _is_dynamic(abi_type):
+        start = base + _word(raw, head)
+    else:
+        start = head
+    if abi_type.endswith("[]"):
+        item_type = abi_type[:-2]
+        count = _word(raw, start)
+        items = start + 32
+        return [_decode(item_type, raw, items + 32 * i, items) for i in range(count)]
+    if abi_type.startswith("("):
+        return tuple(
+            _decode(t, raw, start + 32 * i, start) for i, t in enumerate(split_types(abi_type[1:-1]))
+        )
+    if abi_type in ("string", "bytes"):
+        length = _word(raw, start)
+        value = raw[start + 32:start + 32 + length]
+        return value.decode("utf-8", errors="replace") if abi_type == "string" else value
+    if abi_type == "bool":
+        return _word(raw, start) != 0
+    if abi_type == "address":
+        return "0x" + raw[start + 12:start + 32].hex()
+    if abi_type.startswith(("uint", "int")):
+        value = _word(raw, start)
+        if abi_type.startswith("int") and value >= 2 ** 255:
+            value -= 2 ** 256
+        return value
+    raise ValueError(f"Unsupported ABI type {abi_type!r}")
+
+
+def decode_abi(types: str, data: str) -> list:
+    """Decode return data, e.g. decode_abi("string,uint256", "0x...") -> ["Alice", 3]."""
+    raw = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+    return [_decode(t, raw, 32 * i, 0) for i, t in enumerate(split_types(types))]
+
+
+class JsonRpcClient:
+    """
+    Thread-safe JSON-RPC over HTTP. `batch()` sends several calls in one POST and returns
+    their results in call order; any failed call raises JsonRpcError.
+    """
+
+    def __init__(self, url: str = CHAIN_RPC_URL, timeout: float = CHAIN_RPC_TIMEOUT,
+                 session: Optional[requests.Session] = None, name: str = "chain"):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        labels = {"client": name}
+        self._round_trips = metrics.counter("rpc_round_trips_total", "HTTP requests sent to the node", labels)
+        self._calls = metrics.counter("rpc_calls_total", "JSON-RPC calls sent to the node", labels)
+        self._seconds = metrics.histogram("rpc_request_seconds", "Time per HTTP request to the node", labels)
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def _post(self, payload):
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        finally:
+            self._round_trips.inc()
+            self._seconds.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _result(reply: dict):
+        if "error" in reply:
+            error = reply["error"]
+            raise JsonRpcError(error.get("code", 0), error.get("message", ""), error.get("data"))
+        return reply.get("result")
+
+    def call(self, method: str, params: Sequence = ()):
+        self._calls.inc()
+        return self._result(self._post({"jsonrpc": "2.0", "id": self._next_id(), "method": method, "params": list(params)}))
+
+    def batch(self, calls: Sequence[Tuple[str, Sequence]], return_errors: bool = False) -> list:
+        """With `return_errors`, failed calls yield their JsonRpcError instead of raising."""
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": self._next_id(), "method": method, "params": list(params)}
+            for method, params in calls
+        ]
+        self._calls.inc(len(payload))
+        replies = self._post(payload)
+        if isinstance(replies, dict):
+            # Nodes answer a rejected batch with a single error object
+            self._result(replies)
+        by_id = {reply.get("id"): reply for reply in replies}
+        results = []
+        for request in payload:
+            try:
+                results.append(self._result(by_id[request["id"]]))
+            except JsonRpcError as e:
+                if not return_errors:
+                    raise
+                results.append(e)
+        return results
+
+    def block_number(self) -> int:
+        return to_int(self.call("eth_blockNumber"))
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "round_trips": self._round_trips.value,
+            "calls": self._calls.value,
+            "request_seconds": self._seconds.snapshot(),
+        }
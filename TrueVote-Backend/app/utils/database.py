@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
+import sys
+
+from app.utils.executors import io_pool, ExecutorBusyError
+from app.utils.metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,17 +18,208 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL overrides the DB_* settings (e.g. sqlite:///./truevote.db for local runs and tests)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Connection pool: DB_POOL_SIZE persistent connections plus up to DB_MAX_OVERFLOW extra under load
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds to wait for a free connection before failing the request
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this (MySQL closes idle connections after wait_timeout)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection with a lightweight ping on checkout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# Log every SQL statement (slow; for debugging only)
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+
+# "1" routes user lookups and registration through an async engine (asyncmy / aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+ASYNC_DRIVERS = {
+    "mysql": "mysql+asyncmy",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def engine_options(url: str) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() != "sqlite":
+        # SQLite uses a single-file/in-memory pool that does not take sizing options
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def async_url(url: str) -> str:
+    """Same database with the async driver, e.g. mysql+mysqlconnector:// -> mysql+asyncmy://."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def instrument_pool(engine: Engine, name: str):
+    """Track connection checkouts and pool churn under the db_pool_* metrics."""
+    labels = {"engine": name}
+    checked_out = metrics.gauge("db_pool_checked_out", "Connections currently checked out", labels)
+    checkouts = metrics.counter("db_pool_checkouts_total", "Connections handed to sessions", labels)
+    connects = metrics.counter("db_pool_connects_total", "New DBAPI connections opened", labels)
+    invalidated = metrics.counter("db_pool_invalidated_total", "Connections discarded as broken or stale", labels)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connects.inc()
 
-engine = create_engine(DATABASE_URL, echo=True)
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        invalidated.inc()
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_pool(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """Async engine for the same database, created on first use so the driver is only needed when enabled."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        url = async_url(DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        instrument_pool(_async_engine.sync_engine, "async")
+        # Objects stay usable after commit without another round trip
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def get_user_db():
+    """Session for the user endpoints: async when DB_ASYNC=1, otherwise the pooled sync session."""
+    if DB_ASYNC:
+        async for db in get_async_db():
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    # QueuePool exposes its sizing; SQLite's pools do not
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            status[name] = getattr(pool, name)()
+    return status
+
+
+def database_stats() -> dict:
+    stats = {"sync": pool_status(engine)}
+    if _async_engine is not None:
+        stats["async"] = pool_status(_async_engine.sync_engine)
+    stats["metrics"] = metrics.snapshot(prefix="db_pool_")
+    return stats
+
+
+# Helpers that accept either session type, so controllers share one code path. Sync sessions
+# block, so their work runs on the I/O pool; async sessions are awaited on the event loop.
+
+def is_async(db) -> bool:
+    # Nothing can be an AsyncSession unless the asyncio extension (which needs greenlet) was imported
+    asyncio_ext = sys.modules.get("sqlalchemy.ext.asyncio")
+    return asyncio_ext is not None and isinstance(db, asyncio_ext.AsyncSession)
+
+
+async def find_first(db, model, *criteria):
+    if is_async(db):
+        result = await db.execute(select(model).where(*criteria).limit(1))
+        return result.scalars().first()
+    return await io_pool.run(lambda: db.query(model).filter(*criteria).first())
+
+
+async def fetch_all(db, statement):
+    if is_async(db):
+        return (await db.execute(statement)).all()
+    return await io_pool.run(lambda: db.execute(statement).all())
+
+
+async def save(db, obj):
+    if is_async(db):
+        db.add(obj)
+        await db.commit()
+        await db.refresh(obj)
+        return
+
+    def save_sync():
+        db.add(obj)
+        db.commit()
+        db.refresh(obj)
+
+    await io_pool.run(save_sync)
+
+
+async def execute_commit(db, statement):
+    """Run a write statement (UPDATE/DELETE) and commit it."""
+    if is_async(db):
+        await db.execute(statement)
+        await db.commit()
+        return
+
+    def execute_sync():
+        db.execute(statement)
+        db.commit()
+
+    await io_pool.run(execute_sync)
+
+
+async def commit(db):
+    if is_async(db):
+        await db.commit()
+    else:
+        await io_pool.run(db.commit)
+
+
+async def rollback(db):
+    if is_async(db):
+        await db.rollback()
+        return
+    try:
+        await io_pool.run(db.rollback)
+    except ExecutorBusyError:
+        # Called on error paths: do not replace the original error; closing the session rolls back
+        pass
@@ -0,0 +1,274 @@
+"""
+Follows the chain over JSON-RPC and stores `CampaignCreated` (CampaignFactory) and `VoteCast`
+(Campaign) events in SQL, so campaign lists and tallies are served from the database.
+
+Each poll is one round trip for the head and the hash of the newest stored block. New blocks
+are ingested in ranges of up to INDEXER_BATCH_SIZE: one batched request fetches the logs and the
+range's last block header, another resolves the voters (VoteCast does not carry the voter, so
+it is taken from the transaction sender). Events, block hashes and the checkpoint of a range are
+written in one transaction, so a restart resumes exactly after the last stored range.
+
+Reorgs: the hashes of recently ingested blocks are kept in `indexed_blocks`. When the newest no
+longer matches the node, the indexer finds the highest stored block that still does, deletes
+everything above it and re-ingests from there. Stay INDEXER_CONFIRMATIONS blocks behind the head
+to make that rare on public networks.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.chain import Campaign, VoteEvent, IndexedBlock, IndexerCheckpoint
+from app.models.fraud import FlaggedVote
+from app.utils.chain_rpc import (
+    JsonRpcClient, JsonRpcError, event_topic, to_int, to_hex, decode_words, decode_uint, decode_address,
+)
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+logger = get_logger("indexer")
+
+# Address of the deployed CampaignFactory
+INDEXER_FACTORY_ADDRESS = (os.getenv("INDEXER_FACTORY_ADDRESS") or "").lower()
+# First block to scan (the factory's deployment block)
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+INDEXER_BATCH_SIZE = int(os.getenv("INDEXER_BATCH_SIZE", "2000"))
+# Blocks to stay behind the head
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "0"))
+# Stored block hashes used to find the common ancestor after a reorg
+INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", "128"))
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "2"))
+INDEXER_RESOLVE_VOTERS = os.getenv("INDEXER_RESOLVE_VOTERS", "1") == "1"
+
+CHECKPOINT_NAME = "truevote"
+
+VOTE_CAST_TOPIC = event_topic("VoteCast(uint256,uint256)")
+CAMPAIGN_CREATED_TOPIC = event_topic("CampaignCreated(address,address)")
+
+
+def get_checkpoint(db: Session, name: str = CHECKPOINT_NAME) -> Optional[int]:
+    row = db.get(IndexerCheckpoint, name)
+    return row.block_number if row is not None else None
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        rpc: JsonRpcClient,
+        session_factory: Callable[[], Session],
+        factory_address: str = INDEXER_FACTORY_ADDRESS,
+        start_block: int = INDEXER_START_BLOCK,
+        batch_size: int = INDEXER_BATCH_SIZE,
+        confirmations: int = INDEXER_CONFIRMATIONS,
+        reorg_depth: int = INDEXER_REORG_DEPTH,
+        resolve_voters: bool = INDEXER_RESOLVE_VOTERS,
+        name: str = CHECKPOINT_NAME,
+    ):
+        if not factory_address:
+            raise ValueError("INDEXER_FACTORY_ADDRESS is not set")
+        self.rpc = rpc
+        self.session_factory = session_factory
+        self.factory_address = factory_address.lower()
+        self.start_block = start_block
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.resolve_voters = resolve_voters
+        self.name = name
+        self._campaigns: Optional[Set[str]] = None
+
+        labels = {"indexer": name}
+        self._blocks = metrics.counter("indexer_blocks_total", "Blocks scanned", labels)
+        self._campaign_events = metrics.counter("indexer_campaigns_total", "CampaignCreated events stored", labels)
+        self._vote_events = metrics.counter("indexer_votes_total", "VoteCast events stored", labels)
+        self._reorgs = metrics.counter("indexer_reorgs_total", "Reorgs rolled back", labels)
+        self._errors = metrics.counter("indexer_errors_total", "Failed sync attempts", labels)
+        self._lag = metrics.gauge("indexer_head_lag_blocks", "Blocks between the indexed checkpoint and the target head", labels)
+        self._checkpoint = metrics.gauge("indexer_checkpoint_block", "Last fully indexed block", labels)
+        self._batch_seconds = metrics.histogram("indexer_batch_seconds", "Time to fetch and store one block range", labels)
+
+    def checkpoint(self, db: Session) -> int:
+        block = get_checkpoint(db, self.name)
+        return block if block is not None else self.start_block - 1
+
+    def _known_campaigns(self, db: Session) -> Set[str]:
+        if self._campaigns is None:
+            self._campaigns = set(db.scalars(select(Campaign.address)).all())
+        return self._campaigns
+
+    def sync_once(self) -> int:
+        """Ingest everything up to the target head; returns the number of blocks scanned."""
+        with self.session_factory() as db:
+            newest = db.scalars(select(IndexedBlock).order_by(IndexedBlock.block_number.desc()).limit(1)).first()
+            calls = [("eth_blockNumber", [])]
+            if newest is not None:
+                calls.append(("eth_getBlockByNumber", [to_hex(newest.block_number), False]))
+            replies = self.rpc.batch(calls)
+            head = to_int(replies[0]) - self.confirmations
+
+            if newest is not None and (replies[1] is None or replies[1]["hash"] != newest.block_hash):
+                self._rollback_reorg(db)
+
+            checkpoint = self.checkpoint(db)
+            scanned = 0
+            while checkpoint < head:
+                end = self._ingest(db, checkpoint + 1, min(checkpoint + self.batch_size, head))
+                scanned += end - checkpoint
+                checkpoint = end
+                self._lag.set(head - checkpoint)
+            self._lag.set(max(head - checkpoint, 0))
+            self._checkpoint.set(checkpoint)
+            return scanned
+
+    def _fetch_range(self, start: int, end: int):
+        """Logs and the header of `end`, shrinking the range when the node refuses it as too large."""
+        while True:
+            log_filter = {
+                "fromBlock": to_hex(start),
+                "toBlock": to_hex(end),
+                "topics": [[CAMPAIGN_CREATED_TOPIC, VOTE_CAST_TOPIC]],
+            }
+            try:
+                logs, block = self.rpc.batch([
+                    ("eth_getLogs", [log_filter]),
+                    ("eth_getBlockByNumber", [to_hex(end), False]),
+                ])
+                return logs, block, end
+            except JsonRpcError:
+                # Providers cap the block span or result count of eth_getLogs
+                if end == start:
+                    raise
+                end = start + (end - start) // 2
+
+    def _ingest(self, db: Session, start: int, end: int) -> int:
+        started = time.perf_counter()
+        logs, block, end = self._fetch_range(start, end)
+        if block is None:
+            raise JsonRpcError(0, f"block {end} not found")
+
+        known = self._known_campaigns(db)
+        campaigns, votes, blocks = [], [], {end: block["hash"]}
+        for log in sorted(logs, key=lambda l: (to_int(l["blockNumber"]), to_int(l["logIndex"]))):
+            if log.get("removed"):
+                continue
+            address = log["address"].lower()
+            topic = log["topics"][0]
+            position = {
+                "block_number": to_int(log["blockNumber"]),
+                "block_hash": log["blockHash"],
+                "tx_hash": log["transactionHash"],
+                "log_index": to_int(log["logIndex"]),
+            }
+            words = decode_words(log["data"])
+            if topic == CAMPAIGN_CREATED_TOPIC and address == self.factory_address:
+                campaign = decode_address(words[0])
+                known.add(campaign)
+                campaigns.append({
+                    "address": campaign,
+                    "creator": decode_address(words[1]),
+                    "factory_address": address,
+                    **position,
+                })
+            elif topic == VOTE_CAST_TOPIC and address in known:
+                # Campaigns created earlier in the same range are already in `known`
+                votes.append({
+                    "campaign_address": address,
+                    "candidate_index": decode_uint(words[0]),
+                    "vote_count": decode_uint(words[1]),
+                    "voter": None,
+                    **position,
+                })
+            else:
+                continue
+            blocks[position["block_number"]] = position["block_hash"]
+
+        if votes and self.resolve_voters:
+            tx_hashes = list(dict.fromkeys(vote["tx_hash"] for vote in votes))
+            transactions = self.rpc.batch([("eth_getTransactionByHash", [tx_hash]) for tx_hash in tx_hashes])
+            senders = {tx_hash: tx["from"].lower() for tx_hash, tx in zip(tx_hashes, transactions) if tx}
+            for vote in votes:
+                vote["voter"] = senders.get(vote["tx_hash"])
+
+        try:
+            if campaigns:
+                db.execute(insert(Campaign), campaigns)
+            if votes:
+                db.execute(insert(VoteEvent), votes)
+            db.execute(delete(IndexedBlock).where(IndexedBlock.block_number.in_(list(blocks))))
+            db.execute(insert(IndexedBlock), [{"block_number": n, "block_hash": h} for n, h in blocks.items()])
+            self._prune_blocks(db)
+            db.merge(IndexerCheckpoint(name=self.name, block_number=end))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Campaigns added to `known` above were not stored
+            self._campaigns = None
+            raise
+
+        self._blocks.inc(end - start + 1)
+        self._campaign_events.inc(len(campaigns))
+        self._vote_events.inc(len(votes))
+        self._batch_seconds.observe(time.perf_counter() - started)
+        return end
+
+    def _prune_blocks(self, db: Session):
+        oldest_kept = db.scalars(
+            select(IndexedBlock.block_number).order_by(IndexedBlock.block_number.desc())
+            .offset(self.reorg_depth - 1).limit(1)
+        ).first()
+        if oldest_kept is not None:
+            db.execute(delete(IndexedBlock).where(IndexedBlock.block_number < oldest_kept))
+
+    def _rollback_reorg(self, db: Session):
+        stored = db.scalars(select(IndexedBlock).order_by(IndexedBlock.block_number.desc())).all()
+        headers = self.rpc.batch([("eth_getBlockByNumber", [to_hex(b.block_number), False]) for b in stored])
+        ancestor = self.start_block - 1
+        for row, header in zip(stored, headers):
+            if header is not None and header["hash"] == row.block_hash:
+                ancestor = row.block_number
+                break
+
+        log_event(logger, "chain_reorg", logging.WARNING, rollback_to_block=ancestor)
+        db.execute(delete(VoteEvent).where(VoteEvent.block_number > ancestor))
+        # Flags of orphaned votes; re-included votes are scored again under their new ids
+        db.execute(delete(FlaggedVote).where(FlaggedVote.block_number > ancestor))
+        db.execute(delete(Campaign).where(Campaign.block_number > ancestor))
+        db.execute(delete(IndexedBlock).where(IndexedBlock.block_number > ancestor))
+        checkpoint = db.get(IndexerCheckpoint, self.name) or IndexerCheckpoint(name=self.name, reorgs=0)
+        checkpoint.block_number = ancestor
+        # Committed with the deletes, so a reader that sees the rows gone also sees the new count
+        checkpoint.reorgs += 1
+        db.add(checkpoint)
+        db.commit()
+        self._campaigns = None
+        self._reorgs.inc()
+
+    def run_forever(self, poll_interval: float = INDEXER_POLL_INTERVAL, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                # Node or database unavailable: keep the checkpoint and retry on the next poll
+                self._errors.inc()
+                log_event(logger, "indexer_sync_failed", logging.WARNING, error=str(e))
+            stop.wait(poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "checkpoint": self._checkpoint.value,
+            "head_lag_blocks": self._lag.value,
+            "blocks": self._blocks.value,
+            "campaigns": self._campaign_events.value,
+            "votes": self._vote_events.value,
+            "reorgs": self._reorgs.value,
+            "errors": self._errors.value,
+            "batch_seconds": self._batch_seconds.snapshot(),
+        }
@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import metrics
+from app.utils.warmup import STARTUP_WARMUP
+
+load_dotenv()
+
+# Blocking I/O: SQLAlchemy sessions, S3 transfers, outbound HTTP
+IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", "32"))
+IO_POOL_MAX_PENDING = int(os.getenv("IO_POOL_MAX_PENDING", "512"))
+
+# CPU-bound work: face encoding and liveness inference
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 1)))
+CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", "64"))
+# "process" isolates the GIL-heavy work; "thread" avoids loading models in every worker process
+CPU_POOL_KIND = os.getenv("CPU_POOL_KIND", "process").lower()
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a pool already has its maximum number of pending tasks."""
+
+
+def _timed_call(fn, args, kwargs):
+    # Runs in the worker (possibly another process); wall-clock time is comparable across processes
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+class BoundedPool:
+    """
+    Lazily created executor with a cap on queued + running tasks, used by async
+    route handlers to keep blocking calls off the event loop.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+        labels = {"pool": name}
+        self._queue_depth = metrics.gauge("executor_queue_depth", "Tasks waiting for a free worker", labels)
+        self._in_flight = metrics.gauge("executor_pending_tasks", "Tasks queued or running", labels)
+        self._wait = metrics.histogram("executor_wait_seconds", "Time a task waited for a worker", labels)
+        self._run = metrics.histogram("executor_run_seconds", "Time a task spent running", labels)
+        self._rejected = metrics.counter("executor_rejected_total", "Tasks rejected because the pool was full", labels)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory()
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self._pending >= self.max_pending:
+            self._rejected.inc()
+            raise ExecutorBusyError(f"{self.name} pool is at capacity ({self.max_pending} pending tasks)")
+
+        loop = asyncio.get_running_loop()
+        self._set_pending(self._pending + 1)
+        submitted = time.time()
+        try:
+            started, finished, result = await loop.run_in_executor(
+                self.executor, functools.partial(_timed_call, fn, args, kwargs)
+            )
+        finally:
+            self._set_pending(self._pending - 1)
+
+        self._wait.observe(max(started - submitted, 0.0))
+        self._run.observe(finished - started)
+        return result
+
+    def _set_pending(self, pending: int):
+        self._pending = pending
+        self._in_flight.set(pending)
+        # Executors run tasks FIFO on a fixed number of workers; the rest are queued
+        self._queue_depth.set(max(pending - self.workers, 0))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "queue_depth": self._queue_depth.value,
+            "wait_seconds": self._wait.snapshot(),
+            "run_seconds": self._run.snapshot(),
+            "rejected": self._rejected.value,
+        }
+
+
+def _init_cpu_worker():
+    # Imported in the worker: the biometric libraries are only needed in the CPU pool processes
+    from app.utils.biometric_tasks import init_worker
+    init_worker()
+
+
+def _cpu_executor() -> Executor:
+    if CPU_POOL_KIND == "thread":
+        return ThreadPoolExecutor(max_workers=CPU_POOL_SIZE, thread_name_prefix="cpu")
+    # Every worker process loads the biometric models as it starts, unless that warmup is disabled
+    initializer = _init_cpu_worker if "biometrics" in STARTUP_WARMUP else None
+    return ProcessPoolExecutor(max_workers=CPU_POOL_SIZE, initializer=initializer)
+
+
+io_pool = BoundedPool(
+    "io",
+    lambda: ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io"),
+    IO_POOL_SIZE,
+    IO_POOL_MAX_PENDING,
+)
+cpu_pool = BoundedPool("cpu", _cpu_executor, CPU_POOL_SIZE, CPU_POOL_MAX_PENDING)
+
+
+def shutdown_pools():
+    io_pool.shutdown()
+    cpu_pool.shutdown()
+
+
+def pools_stats() -> dict:
+    return {"io": io_pool.stats(), "cpu": cpu_pool.stats()}
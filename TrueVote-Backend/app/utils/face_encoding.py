@@ -0,0 +1,23 @@
+from typing import Optional
+
+import numpy as np
+
+# face_recognition produces 128-d float64 encodings; float32 is plenty for distance checks
+FACE_ENCODING_SIZE = 128
+FACE_ENCODING_DTYPE = np.float32
+
+
+def encoding_to_bytes(encoding) -> bytes:
+    encoding = np.asarray(encoding, dtype=FACE_ENCODING_DTYPE)
+    if encoding.shape != (FACE_ENCODING_SIZE,):
+        raise ValueError(f"Face encoding must have shape ({FACE_ENCODING_SIZE},), got {encoding.shape}")
+    return encoding.tobytes()
+
+
+def encoding_from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    if not data:
+        return None
+    encoding = np.frombuffer(data, dtype=FACE_ENCODING_DTYPE)
+    if encoding.shape != (FACE_ENCODING_SIZE,):
+        raise ValueError(f"Stored face encoding has {encoding.size} values, expected {FACE_ENCODING_SIZE}")
+    return encoding.astype(np.float64)
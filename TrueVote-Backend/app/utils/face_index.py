@@ -0,0 +1,451 @@
+"""
+Nearest-neighbor index over enrolled 128-d face encodings, used to flag one person enrolling
+several wallets.
+
+Vectors live in a memory-mapped float32 file (`vectors.f32`) next to the wallet of each row
+(`ids.txt`) and a small `meta.json` holding the committed row count. Inserts append under a file
+lock and commit by rewriting meta.json, so every API worker can share one directory: a worker
+notices a new count on its next search and maps the new rows in, without reloading the rest.
+
+Two search modes:
+  exact  blocked brute force, one BLAS matrix product per FACE_INDEX_BLOCK_ROWS rows, so memory
+         stays bounded and a query against 1M faces is a single pass over the mapped file
+  ivf    inverted file: k-means centroids (NumPy) partition the vectors into lists and a query
+         scans only its FACE_INDEX_NPROBE nearest lists. Training is never done by an insert:
+         scripts/build_face_index.py trains once the index reaches FACE_INDEX_IVF_MIN faces
+         (FACE_INDEX_MODE=auto) or when asked to retrain. Rows inserted later join the list of
+         their nearest centroid.
+
+Distances are Euclidean, like face_recognition.face_distance.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.models.fraud import FaceDuplicate
+from app.utils.database import save
+from app.utils.executors import io_pool
+from app.utils.face_encoding import FACE_ENCODING_SIZE
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+from app.utils.model_registry import BASE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: inserts are only serialized within one process
+    fcntl = None
+
+load_dotenv()
+
+logger = get_logger("face_index")
+
+# Directory of the index files; created on the first insert
+FACE_INDEX_DIR = os.getenv("FACE_INDEX_DIR", os.path.join(BASE_DIR, "face_index"))
+# "auto" switches to IVF at FACE_INDEX_IVF_MIN faces; "exact" always scans everything
+FACE_INDEX_MODE = os.getenv("FACE_INDEX_MODE", "auto").lower()
+FACE_INDEX_IVF_MIN = int(os.getenv("FACE_INDEX_IVF_MIN", "200000"))
+# IVF lists scanned per query: higher is slower with better recall
+FACE_INDEX_NPROBE = int(os.getenv("FACE_INDEX_NPROBE", "64"))
+# Rows per matrix product in exact search
+FACE_INDEX_BLOCK_ROWS = int(os.getenv("FACE_INDEX_BLOCK_ROWS", "65536"))
+# Distance under which a new enrollment counts as the same face (face_recognition matches at 0.6)
+FACE_DUPLICATE_THRESHOLD = float(os.getenv("FACE_DUPLICATE_THRESHOLD", "0.5"))
+# "flag" records duplicates in face_duplicates, "reject" refuses the registration, "off" skips the check
+FACE_DUPLICATE_ACTION = os.getenv("FACE_DUPLICATE_ACTION", "flag").lower()
+
+DTYPE = np.float32
+MIN_CAPACITY = 1024
+
+
+class FaceMatch(NamedTuple):
+    wallet_address: str
+    distance: float
+    row: int
+
+
+def _merge_top_k(best_d2, best_rows, d2, rows, k):
+    """Keep the k smallest of the running best and a new block, per query."""
+    if d2.shape[1] > k:
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        d2 = np.take_along_axis(d2, part, axis=1)
+        rows = rows[part] if rows.ndim == 1 else np.take_along_axis(rows, part, axis=1)
+    elif rows.ndim == 1:
+        rows = np.broadcast_to(rows, d2.shape)
+    d2 = np.concatenate([best_d2, d2], axis=1)
+    rows = np.concatenate([best_rows, rows], axis=1)
+    part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(d2, part, axis=1), np.take_along_axis(rows, part, axis=1)
+
+
+def exact_search(vectors, norms, queries, k: int = 1, block_rows: int = FACE_INDEX_BLOCK_ROWS,
+                 rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k nearest rows of `vectors` (or of `vectors[rows]`) for each query, as (squared distances,
+    row numbers) sorted nearest first. ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2, one GEMM per block.
+    """
+    queries = np.asarray(queries, dtype=DTYPE)
+    total = len(rows) if rows is not None else len(vectors)
+    best_d2 = np.full((len(queries), k), np.inf, dtype=DTYPE)
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+    for start in range(0, total, block_rows):
+        if rows is None:
+            block_rows_ids = np.arange(start, min(start + block_rows, total))
+            block = vectors[start:start + block_rows]
+            block_norms = norms[start:start + block_rows]
+        else:
+            block_rows_ids = rows[start:start + block_rows]
+            block = vectors[block_rows_ids]
+            block_norms = norms[block_rows_ids]
+        d2 = query_norms - 2 * (queries @ block.T) + block_norms[None, :]
+        best_d2, best_rows = _merge_top_k(best_d2, best_rows, d2, block_rows_ids, k)
+    order = np.argsort(best_d2, axis=1)
+    best_d2 = np.maximum(np.take_along_axis(best_d2, order, axis=1), 0)
+    return best_d2, np.take_along_axis(best_rows, order, axis=1)
+
+
+def nearest_centroids(vectors, centroids, count: int = 1, block_rows: int = FACE_INDEX_BLOCK_ROWS) -> np.ndarray:
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty((len(vectors), count), dtype=np.int32)
+    for start in range(0, len(vectors), block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=DTYPE)
+        # ||x||^2 is the same for every centroid, so it does not change the ranking
+        d2 = centroid_norms[None, :] - 2 * (block @ centroids.T)
+        if count == 1:
+            labels[start:start + len(block), 0] = d2.argmin(axis=1)
+        else:
+            part = np.argpartition(d2, count - 1, axis=1)[:, :count]
+            labels[start:start + len(block)] = part
+    return labels
+
+
+def kmeans(sample: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(sample, dtype=DTYPE)
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(sample, centroids)[:, 0]
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=clusters)
+        present = counts > 0
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+        centroids[present] = sums / counts[present, None]
+        # Empty clusters restart from random points
+        empty = np.flatnonzero(~present)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+    return centroids
+
+
+class FaceIndex:
+    def __init__(
+        self,
+        directory: str = FACE_INDEX_DIR,
+        mode: str = FACE_INDEX_MODE,
+        ivf_min: int = FACE_INDEX_IVF_MIN,
+        nprobe: int = FACE_INDEX_NPROBE,
+        block_rows: int = FACE_INDEX_BLOCK_ROWS,
+        name: str = "faces",
+    ):
+        self.directory = directory
+        self.mode = mode
+        self.ivf_min = ivf_min
+        self.nprobe = nprobe
+        self.block_rows = block_rows
+        self._lock = threading.RLock()
+
+        self._meta_stamp = None
+        self._count = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._norms = np.empty(0, dtype=DTYPE)
+        self._ids: List[str] = []
+        self._ids_offset = 0
+        self._ivf_version = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.memmap] = None
+        self._lists: List[np.ndarray] = []
+
+        labels = {"index": name}
+        self._size = metrics.gauge("face_index_size", "Faces in the index", labels)
+        self._inserts = metrics.counter("face_index_inserts_total", "Faces added to the index", labels)
+        self._search_seconds = {
+            mode: metrics.histogram("face_index_search_seconds", "Time per index search", {**labels, "mode": mode})
+            for mode in ("exact", "ivf")
+        }
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            stat = os.stat(self._path("meta.json"))
+        except FileNotFoundError:
+            return None
+        # meta.json is replaced on every commit, so the inode changes even within one mtime tick
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._meta_stamp:
+            return None
+        with open(self._path("meta.json")) as f:
+            meta = json.load(f)
+        meta["stamp"] = stamp
+        return meta
+
+    def _write_meta(self):
+        meta = {"dim": FACE_ENCODING_SIZE, "count": self._count, "capacity": self._capacity,
+                "ivf_version": self._ivf_version}
+        temporary = self._path("meta.json.tmp")
+        with open(temporary, "w") as f:
+            json.dump(meta, f)
+        # Atomic: readers see either the old or the new count, never a partial write
+        os.replace(temporary, self._path("meta.json"))
+        stat = os.stat(self._path("meta.json"))
+        self._meta_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _map(self, name: str, dtype, shape) -> np.memmap:
+        return np.memmap(self._path(name), dtype=dtype, mode="r+", shape=shape)
+
+    def refresh(self):
+        """Map rows committed by other workers since the last call (cheap when nothing changed)."""
+        with self._lock:
+            meta = self._read_meta()
+            if meta is None:
+                return
+            self._meta_stamp = meta["stamp"]
+            if meta["capacity"] != self._capacity:
+                self._capacity = meta["capacity"]
+                self._vectors = self._map("vectors.f32", DTYPE, (self._capacity, FACE_ENCODING_SIZE))
+            count = meta["count"]
+            if count > self._count:
+                new = np.asarray(self._vectors[self._count:count])
+                self._norms = np.concatenate([self._norms, np.einsum("ij,ij->i", new, new)])
+                with open(self._path("ids.txt"), "rb") as f:
+                    f.seek(self._ids_offset)
+                    for _ in range(count - self._count):
+                        line = f.readline()
+                        self._ids_offset += len(line)
+                        self._ids.append(line.decode().rstrip("\n"))
+            previous = self._count
+            self._count = count
+            self._size.set(count)
+            if meta["ivf_version"] != self._ivf_version:
+                self._load_ivf(meta["ivf_version"])
+            elif self._centroids is not None and count > previous:
+                self._extend_lists(previous, count)
+
+    def _load_ivf(self, version: int):
+        self._ivf_version = version
+        self._centroids = np.load(self._path("centroids.npy")) if version else None
+        self._lists = []
+        if self._centroids is None:
+            self._assign = None
+            return
+        self._assign = self._map("assign.i32", np.int32, (self._capacity,))
+        labels = np.asarray(self._assign[:self._count])
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    def _extend_lists(self, start: int, end: int):
+        if self._assign is None or len(self._assign) < self._capacity:
+            self._assign = self._map("assign.i32", np.int32, (self._capacity,))
+        labels = np.asarray(self._assign[start:end])
+        for label in np.unique(labels):
+            rows = start + np.flatnonzero(labels == label)
+            self._lists[label] = np.concatenate([self._lists[label], rows])
+
+    def _grow(self, needed: int):
+        capacity = max(needed, 2 * self._capacity, MIN_CAPACITY)
+        for name, width in (("vectors.f32", FACE_ENCODING_SIZE * 4), ("assign.i32", 4)):
+            if name == "assign.i32" and self._centroids is None:
+                continue
+            with open(self._path(name), "ab") as f:
+                f.truncate(capacity * width)
+        self._capacity = capacity
+        self._vectors = self._map("vectors.f32", DTYPE, (capacity, FACE_ENCODING_SIZE))
+        if self._centroids is not None:
+            self._assign = self._map("assign.i32", np.int32, (capacity,))
+
+    def add(self, wallet_addresses: Sequence[str], encodings) -> int:
+        """Append faces; returns the row of the first. Safe across processes sharing the directory."""
+        encodings = np.asarray(encodings, dtype=DTYPE).reshape(-1, FACE_ENCODING_SIZE)
+        wallets = [w.strip() for w in wallet_addresses]
+        if len(wallets) != len(encodings):
+            raise ValueError(f"{len(wallets)} wallet addresses for {len(encodings)} encodings")
+        with self._lock, self._file_lock():
+            self.refresh()
+            start, end = self._count, self._count + len(encodings)
+            if end > self._capacity:
+                self._grow(end)
+            self._vectors[start:end] = encodings
+            self._vectors.flush()
+            with open(self._path("ids.txt"), "ab") as f:
+                # Drop lines a crashed writer appended without committing them
+                f.truncate(self._ids_offset)
+                data = "".join(f"{w}\n" for w in wallets).encode()
+                f.write(data)
+            self._ids_offset += len(data)
+            self._ids.extend(wallets)
+            self._norms = np.concatenate([self._norms, np.einsum("ij,ij->i", encodings, encodings)])
+            if self._centroids is not None:
+                self._assign[start:end] = nearest_centroids(encodings, self._centroids)[:, 0]
+                self._assign.flush()
+                self._extend_lists(start, end)
+            self._count = end
+            self._write_meta()
+            self._size.set(end)
+            self._inserts.inc(len(encodings))
+            return start
+
+    def needs_training(self) -> bool:
+        """Whether auto mode has reached FACE_INDEX_IVF_MIN faces without IVF lists."""
+        self.refresh()
+        return self.mode == "auto" and self._centroids is None and self._count >= self.ivf_min
+
+    def train(self, lists: Optional[int] = None, sample_size: Optional[int] = None, iterations: int = 10):
+        """
+        (Re)build the IVF lists from the current faces. k-means runs without the file lock, so
+        inserts continue meanwhile; rows they commit are assigned when the new lists are committed.
+        """
+        self.refresh()
+        with self._lock:
+            count, vectors = self._count, self._vectors
+        if count == 0:
+            return
+        lists = lists or int(np.clip(4 * np.sqrt(count), 16, 4096))
+        lists = min(lists, count)
+        sample_size = min(count, sample_size or 64 * lists)
+        rng = np.random.default_rng(0)
+        # Sorted rows read the mapped file sequentially
+        sample = vectors[np.sort(rng.choice(count, sample_size, replace=False))]
+        centroids = kmeans(sample, lists, iterations)
+        labels = nearest_centroids(vectors[:count], centroids, block_rows=self.block_rows)[:, 0]
+
+        with self._lock, self._file_lock():
+            self.refresh()
+            if self._count > count:
+                late = self._vectors[count:self._count]
+                labels = np.concatenate([labels, nearest_centroids(late, centroids, block_rows=self.block_rows)[:, 0]])
+            # New files replace the old ones, so workers still searching the old lists keep their mapping
+            assign = np.memmap(self._path("assign.i32.tmp"), dtype=np.int32, mode="w+", shape=(self._capacity,))
+            assign[:self._count] = labels
+            assign.flush()
+            del assign
+            with open(self._path("centroids.npy.tmp"), "wb") as f:
+                np.save(f, centroids)
+            os.replace(self._path("assign.i32.tmp"), self._path("assign.i32"))
+            os.replace(self._path("centroids.npy.tmp"), self._path("centroids.npy"))
+            self._load_ivf(self._ivf_version + 1)
+            self._write_meta()
+
+    def search(self, queries, k: int = 1, nprobe: Optional[int] = None,
+               exact: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (distances, rows) of the k nearest faces of each query, nearest first; rows are -1 where
+        the index holds fewer than k faces. IVF is used once trained, unless `exact`.
+        """
+        queries = np.asarray(queries, dtype=DTYPE).reshape(-1, FACE_ENCODING_SIZE)
+        self.refresh()
+        with self._lock:
+            count, vectors, norms = self._count, self._vectors, self._norms
+            # A copy: inserts replace list arrays with longer ones that may reach past `count`
+            centroids, lists = self._centroids, list(self._lists)
+        if count == 0:
+            return np.full((len(queries), k), np.inf), np.full((len(queries), k), -1, dtype=np.int64)
+
+        use_ivf = centroids is not None and self.mode != "exact" and not exact
+        mode = "ivf" if use_ivf else "exact"
+        start = time.perf_counter()
+        if not use_ivf:
+            d2, rows = exact_search(vectors[:count], norms, queries, k, self.block_rows)
+        else:
+            probes = nearest_centroids(queries, centroids, min(nprobe or self.nprobe, len(centroids)))
+            d2 = np.empty((len(queries), k), dtype=DTYPE)
+            rows = np.empty((len(queries), k), dtype=np.int64)
+            for i, query in enumerate(queries):
+                candidates = np.concatenate([lists[p] for p in probes[i]])
+                query_d2, query_rows = exact_search(vectors, norms, query[None, :], k, self.block_rows, candidates)
+                d2[i], rows[i] = query_d2[0], query_rows[0]
+        self._search_seconds[mode].observe(time.perf_counter() - start)
+        return np.sqrt(d2), rows
+
+    def nearest(self, encoding, threshold: float = FACE_DUPLICATE_THRESHOLD) -> Optional[FaceMatch]:
+        distances, rows = self.search(encoding, k=1)
+        distance, row = float(distances[0, 0]), int(rows[0, 0])
+        if row < 0 or distance >= threshold:
+            return None
+        return FaceMatch(self._ids[row], distance, row)
+
+    def wallet_addresses(self) -> set:
+        self.refresh()
+        with self._lock:
+            return set(self._ids)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._count
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "faces": self._count,
+            "mode": "ivf" if self._centroids is not None and self.mode != "exact" else "exact",
+            "lists": len(self._lists),
+            "nprobe": self.nprobe,
+            "search_seconds": {mode: h.snapshot() for mode, h in self._search_seconds.items()},
+        }
+
+
+face_index = FaceIndex()
+
+
+async def find_duplicate_face(encoding) -> Optional[FaceMatch]:
+    """Nearest enrolled face within FACE_DUPLICATE_THRESHOLD; None when off or on index errors."""
+    if FACE_DUPLICATE_ACTION == "off" or encoding is None:
+        return None
+    try:
+        return await io_pool.run(face_index.nearest, encoding)
+    except Exception as e:
+        # The index is derived data: a broken index must not block registrations
+        log_event(logger, "face_index_search_failed", logging.WARNING, error=str(e))
+        return None
+
+
+async def index_face(wallet_address: str, encoding):
+    if FACE_DUPLICATE_ACTION == "off" or encoding is None:
+        return
+    try:
+        await io_pool.run(face_index.add, [wallet_address], encoding)
+    except Exception as e:
+        log_event(logger, "face_index_insert_failed", logging.WARNING, wallet_address=wallet_address, error=str(e))
+
+
+async def record_duplicate(db, wallet_address: str, match: FaceMatch):
+    log_event(logger, "duplicate_face", logging.WARNING, wallet_address=wallet_address,
+              duplicate_of=match.wallet_address, distance=round(match.distance, 3))
+    try:
+        await save(db, FaceDuplicate(wallet_address=wallet_address, duplicate_of=match.wallet_address,
+                                     distance=match.distance))
+    except Exception as e:
+        # The user is already registered; losing the flag is better than failing the request
+        log_event(logger, "duplicate_face_record_failed", logging.WARNING, wallet_address=wallet_address, error=str(e))
@@ -0,0 +1,160 @@
+"""
+Face detection and matching with face_recognition (dlib), loaded on first use.
+
+Detection is opt-in downscaled: with FACE_DETECTION_MAX_SIDE set it runs on a copy of the image
+shrunk to that side, the boxes are scaled back and the encoding still uses the full-resolution
+image. That is several times faster on phone photos, but small faces in large photos can be missed
+and encodings can drift slightly; compare decisions on real uploads with
+app/utils/scripts/benchmark_face_detection.py before enabling it.
+"""
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from PIL import Image
+
+from app.utils.log import get_logger, log_event
+
+load_dotenv()
+
+# Opt-in: longest image side face detection runs at; boxes are scaled back and encodings use the
+# full image. 0 (default) detects on the full-resolution upload, as face_recognition does.
+# Downscaling is much faster on phone photos but changes which faces are found
+FACE_DETECTION_MAX_SIDE = int(os.getenv("FACE_DETECTION_MAX_SIDE", "0"))
+# "hog" (CPU) or "cnn" (much slower without a CUDA build of dlib, finds more angled faces)
+FACE_DETECTION_MODEL = os.getenv("FACE_DETECTION_MODEL", "hog").lower()
+# Times the detection image is upsampled to find small faces; each one quadruples the work
+FACE_DETECTION_UPSAMPLE = int(os.getenv("FACE_DETECTION_UPSAMPLE", "1"))
+
+# (top, right, bottom, left) in pixels, as returned by face_recognition.face_locations
+FaceLocation = Tuple[int, int, int, int]
+
+logger = get_logger("face_matching")
+
+
+def load_face_recognition():
+    # dlib and its models take about a second and ~100 MB to load; only pay for it when a face is processed
+    import face_recognition
+    return face_recognition
+
+
+def load_image(img):
+    """Accept either a decoded RGB array or an image file path."""
+    if isinstance(img, np.ndarray):
+        return img
+    return load_face_recognition().load_image_file(img)
+
+
+def detect_faces(img: np.ndarray, max_side: int = None, model: str = None,
+                 upsample: int = None) -> List[FaceLocation]:
+    """Face boxes in `img` coordinates, detected on a copy downscaled to `max_side`."""
+    max_side = FACE_DETECTION_MAX_SIDE if max_side is None else max_side
+    model = model or FACE_DETECTION_MODEL
+    upsample = FACE_DETECTION_UPSAMPLE if upsample is None else upsample
+
+    height, width = img.shape[:2]
+    scale = max_side / max(height, width) if max_side else 1.0
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        small = np.asarray(Image.fromarray(img).resize(size, Image.BILINEAR))
+    else:
+        scale, small = 1.0, img
+    locations = load_face_recognition().face_locations(small, number_of_times_to_upsample=upsample, model=model)
+    return [(max(0, int(top / scale)), min(width, int(round(right / scale))),
+             min(height, int(round(bottom / scale))), max(0, int(left / scale)))
+            for top, right, bottom, left in locations]
+
+
+def known_face_encodings(images: Sequence[np.ndarray],
+                         locations: Sequence[Optional[FaceLocation]]) -> List[Optional[np.ndarray]]:
+    """Encoding of one known face per image (None where no face was found)."""
+    face_recognition = load_face_recognition()
+    return [face_recognition.face_encodings(img, known_face_locations=[location])[0] if location is not None else None
+            for img, location in zip(images, locations)]
+
+
+def first_face(img: np.ndarray) -> Optional[FaceLocation]:
+    locations = detect_faces(img)
+    return locations[0] if locations else None
+
+
+def compare_faces(img_path1, img_path2, threshold=0.6):
+    try:
+        # Load images and extract face encodings
+        images = [load_image(img_path1), load_image(img_path2)]
+        locations = [first_face(img) for img in images]
+        enc1, enc2 = known_face_encodings(images, locations)
+
+        # Check if faces are found in both images
+        if enc1 is None or enc2 is None:
+            return {
+                'distance': None,
+                'is_match': False,
+                'error': 'Face not found in one or both images'
+            }
+
+        # Calculate the face distance and compare
+        distance = float(load_face_recognition().face_distance([enc1], enc2)[0])  # Convert to Python float
+        is_match = bool(distance < threshold)  # Convert to Python bool
+        log_event(logger, "face_compared", logging.DEBUG, sample=True, distance=distance, is_match=is_match)
+        return {
+            'distance': distance,
+            'is_match': is_match,
+            'error': None
+        }
+
+    except Exception as e:
+        return {
+            'distance': None,
+            'is_match': False,
+            'error': f"Error during face comparison: {str(e)}"
+        }
+
+
+def face_encoding_from_image(img, known_face_locations: Optional[List[FaceLocation]] = None):
+    """
+    Return the encoding of the first face found in the image (array or path), or None. Pass the
+    locations when the faces are already detected, like face_recognition.face_encodings.
+    """
+    img = load_image(img)
+    locations = detect_faces(img) if known_face_locations is None else known_face_locations
+    if not locations:
+        return None
+    return load_face_recognition().face_encodings(img, known_face_locations=locations[:1])[0]
+
+
+def compare_face_to_encoding(known_encoding, img, threshold=0.6,
+                             known_face_locations: Optional[List[FaceLocation]] = None):
+    try:
+        if known_encoding is None:
+            return {
+                'distance': None,
+                'is_match': False,
+                'error': 'Face not found in one or both images'
+            }
+
+        encoding = face_encoding_from_image(img, known_face_locations)
+        if encoding is None:
+            return {
+                'distance': None,
+                'is_match': False,
+                'error': 'Face not found in one or both images'
+            }
+
+        distance = float(load_face_recognition().face_distance([known_encoding], encoding)[0])
+        is_match = bool(distance < threshold)
+        log_event(logger, "face_compared", logging.DEBUG, sample=True, distance=distance, is_match=is_match)
+        return {
+            'distance': distance,
+            'is_match': is_match,
+            'error': None
+        }
+
+    except Exception as e:
+        return {
+            'distance': None,
+            'is_match': False,
+            'error': f"Error during face comparison: {str(e)}"
+        }
@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+
+from app.utils.address_hash import hash_addresses
+from app.utils.model_registry import BASE_DIR, ModelRegistry
+from app.utils.tracing import span
+
+# Produced by app/utils/scripts/export_fraud_model.py
+COMPACT_MODEL_PATH = os.getenv("COMPACT_FRAUD_MODEL_PATH", os.path.join(BASE_DIR, 'models', 'fraud_model.npz'))
+
+
+def apply_trees(X, roots, left, right, feature, threshold, strict):
+    """
+    Walk every row of X down every tree at once and return the leaf node indices,
+    shape (n_samples, n_trees). Trees are stored as flat arrays; `left == -1` marks a leaf.
+    XGBoost goes left on `x < threshold` (strict), scikit-learn on `x <= threshold`.
+    """
+    nodes = np.tile(roots, (X.shape[0], 1))
+    rows = np.arange(X.shape[0])[:, None]
+    while True:
+        children = left[nodes]
+        internal = children != -1
+        if not internal.any():
+            return nodes
+        values = X[rows, feature[nodes]]
+        go_left = values < threshold[nodes] if strict else values <= threshold[nodes]
+        nodes = np.where(internal, np.where(go_left, children, right[nodes]), nodes)
+
+
+class CompactFraudModel:
+    """
+    Pure-NumPy evaluator for the stacked fraud model exported to a .npz archive.
+
+    Reproduces stacked_model_predict (robust scaling, isolation forest, logistic
+    regression, standard scaling and the XGBoost meta model) without importing
+    scikit-learn, xgboost or pandas, or unpickling anything.
+    """
+
+    def __init__(self, arrays):
+        self.feature_columns = [str(c) for c in arrays['feature_columns']]
+        self.robust_center = arrays['robust_center']
+        self.robust_scale = arrays['robust_scale']
+
+        self.lr_coef = arrays['lr_coef']
+        self.lr_intercept = arrays['lr_intercept']
+
+        self.iso_roots = arrays['iso_roots']
+        self.iso_left = arrays['iso_left']
+        self.iso_right = arrays['iso_right']
+        self.iso_feature = arrays['iso_feature']
+        self.iso_threshold = arrays['iso_threshold']
+        self.iso_leaf_depth = arrays['iso_leaf_depth']
+        self.iso_denominator = float(arrays['iso_denominator'])
+        self.iso_offset = float(arrays['iso_offset'])
+
+        self.meta_mean = arrays['meta_mean']
+        self.meta_scale = arrays['meta_scale']
+
+        self.xgb_roots = arrays['xgb_roots']
+        self.xgb_left = arrays['xgb_left']
+        self.xgb_right = arrays['xgb_right']
+        self.xgb_feature = arrays['xgb_feature']
+        self.xgb_threshold = arrays['xgb_threshold']
+        self.xgb_value = arrays['xgb_value']
+        self.xgb_base_margin = np.float32(arrays['xgb_base_margin'])
+        self.classes = arrays['classes']
+
+    @classmethod
+    def load(cls, path: str = COMPACT_MODEL_PATH) -> "CompactFraudModel":
+        with np.load(path, allow_pickle=False) as archive:
+            return cls({name: archive[name] for name in archive.files})
+
+    def preprocess(self, addresses, features) -> np.ndarray:
+        values = np.empty((len(addresses), len(self.feature_columns)), dtype=np.float64)
+        values[:, 0] = hash_addresses(addresses)
+        values[:, 1:] = features
+        values -= self.robust_center
+        values /= self.robust_scale
+        return values
+
+    def fraud_probability(self, values) -> np.ndarray:
+        decision = values[:, 1:] @ self.lr_coef.T + self.lr_intercept
+        # exp overflows to inf for very confident rows, which correctly yields 0.0
+        with np.errstate(over='ignore'):
+            return 1.0 / (1.0 + np.exp(-decision[:, 0]))
+
+    def is_anomaly(self, values) -> np.ndarray:
+        # Isolation trees are evaluated on float32 inputs, like scikit-learn does
+        leaves = apply_trees(values.astype(np.float32), self.iso_roots, self.iso_left, self.iso_right,
+                             self.iso_feature, self.iso_threshold, strict=False)
+        depths = np.zeros(values.shape[0])
+        for tree in range(leaves.shape[1]):
+            depths += self.iso_leaf_depth[leaves[:, tree]]
+        scores = -(2 ** -(depths / self.iso_denominator))
+        return scores - self.iso_offset < 0
+
+    def meta_predict(self, meta_features) -> np.ndarray:
+        scaled = ((meta_features - self.meta_mean) / self.meta_scale).astype(np.float32)
+        leaves = apply_trees(scaled, self.xgb_roots, self.xgb_left, self.xgb_right,
+                             self.xgb_feature, self.xgb_threshold, strict=True)
+        # XGBoost accumulates tree outputs in float32, one tree at a time
+        margin = np.full(scaled.shape[0], self.xgb_base_margin, dtype=np.float32)
+        for tree in range(leaves.shape[1]):
+            margin += self.xgb_value[leaves[:, tree]]
+        with np.errstate(over='ignore'):
+            probability = np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))
+        return self.classes[(probability > 0.5).astype(np.intp)]
+
+    def predict(self, addresses, features) -> dict:
+        """
+        addresses: sequence of wallet addresses
+        features:  (n_samples, 5) array of the non-address columns in feature_columns order
+        """
+        addresses = list(addresses)
+        if not addresses:
+            raise ValueError("No data provided for prediction.")
+
+        with span("fraud_preprocess", backend="compact"):
+            values = self.preprocess(addresses, np.asarray(features, dtype=np.float64))
+        with span("fraud_model", backend="compact", model="logistic_regression"):
+            fraud_probability = self.fraud_probability(values)
+        with span("fraud_model", backend="compact", model="iso_forest"):
+            is_anomaly = self.is_anomaly(values).astype(np.float64)
+        with span("fraud_model", backend="compact", model="meta_model"):
+            is_fraud = self.meta_predict(np.column_stack([fraud_probability, is_anomaly]))
+        return {'Address': addresses, 'is_fraud': is_fraud}
+
+    def predict_frame(self, data) -> dict:
+        """Drop-in replacement for stacked_model_predict on a DataFrame of raw features."""
+        if data is None or len(data) == 0:
+            raise ValueError("No data provided for prediction.")
+        return self.predict(data['Address'], data[self.feature_columns[1:]])
+
+
+compact_registry = ModelRegistry({'fraud_model': COMPACT_MODEL_PATH}, loader=CompactFraudModel.load)
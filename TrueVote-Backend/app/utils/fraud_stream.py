@@ -0,0 +1,471 @@
+"""
+Streaming fraud scoring of vote events.
+
+Votes flow through four stages connected by bounded queues:
+
+  feed   new rows of `vote_events` (written by the chain indexer), or events handed to
+         submit() / offer() by an in-process producer
+  join   one query per micro-batch for the voters' stored verification signals (voter_signals)
+  score  the micro-batch as one frame through the fraud model (stacked_model_predict, or the
+         compact evaluator with FRAUD_MODEL_BACKEND=compact) on the CPU pool
+  write  flagged votes into `flagged_votes` and the feed checkpoint, in one transaction
+
+A micro-batch closes at FRAUD_STREAM_BATCH_SIZE events or FRAUD_STREAM_BATCH_WAIT seconds after
+its first event. Every queue is bounded, so a slow stage stalls the ones before it down to the
+feed, which stops reading vote_events (and submit() waits) until there is room: memory stays
+bounded however far the scorer falls behind. A stage that fails with a transient error (database
+unreachable, pool full) retries its batch with backoff, keeping order, so the checkpoint only moves
+past votes whose results are stored. Any other error would fail again on every retry: the batch is
+written to `fraud_stream_dead_letters` instead and the checkpoint moves past it. If that write
+fails too, the write stage halts (`halted` in stats()) with the checkpoint still before the batch.
+
+Flagged votes are upserted on (tx_hash, log_index), so a vote the indexer re-inserts under a new
+id after a reorg replaces its earlier row instead of failing the unique constraint.
+
+Votes from voters with no stored signals are flagged as "no_signals" without scoring
+(FRAUD_STREAM_FLAG_UNKNOWN=0 skips them instead).
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.chain import VoteEvent
+from app.models.fraud import FlaggedVote, FraudStreamCheckpoint, FraudStreamDeadLetter
+from app.utils.database import SessionLocal
+from app.utils.executors import BoundedPool, ExecutorBusyError, io_pool, cpu_pool
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+from app.utils.model import FEATURE_COLUMNS
+from app.utils.voter_signals import load_signal_features
+
+load_dotenv()
+
+logger = get_logger("fraud_stream")
+
+# Events per micro-batch scored in one model call
+FRAUD_STREAM_BATCH_SIZE = int(os.getenv("FRAUD_STREAM_BATCH_SIZE", "256"))
+# Seconds a micro-batch waits to fill up after its first event
+FRAUD_STREAM_BATCH_WAIT = float(os.getenv("FRAUD_STREAM_BATCH_WAIT", "0.05"))
+# Events buffered between the feed and the join stage
+FRAUD_STREAM_QUEUE_SIZE = int(os.getenv("FRAUD_STREAM_QUEUE_SIZE", "10000"))
+# Seconds between checks for new vote_events once the feed has caught up
+FRAUD_STREAM_POLL_INTERVAL = float(os.getenv("FRAUD_STREAM_POLL_INTERVAL", "1"))
+# Seconds before a stage retries its batch after a transient error, doubling on each attempt...
+FRAUD_STREAM_RETRY_DELAY = float(os.getenv("FRAUD_STREAM_RETRY_DELAY", "1"))
+# ...up to this many seconds
+FRAUD_STREAM_MAX_RETRY_DELAY = float(os.getenv("FRAUD_STREAM_MAX_RETRY_DELAY", "30"))
+# "1" flags votes of voters without stored signals, "0" skips them
+FRAUD_STREAM_FLAG_UNKNOWN = os.getenv("FRAUD_STREAM_FLAG_UNKNOWN", "1") == "1"
+
+CHECKPOINT_NAME = "vote_events"
+STAGES = ("feed", "join", "score", "write")
+# Micro-batches buffered between the join, score and write stages
+STAGE_QUEUE_BATCHES = 2
+
+EVENT_FIELDS = ("vote_event_id", "voter", "campaign_address", "tx_hash", "log_index", "block_number")
+FEATURE_FIELDS = ("time_diff_mins", "face_attempts", "robot_detected", "face_match_percentage", "liveness_score")
+DEAD_LETTER_FIELDS = ("vote_event_id", "voter", "tx_hash", "log_index", "block_number")
+
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth retrying the same batch for; anything else would fail again."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OperationalError, InterfaceError, ExecutorBusyError, ConnectionError, TimeoutError))
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def upsert_flagged(db: Session, rows: List[dict]):
+    """Insert flagged votes, replacing an earlier row of the same (tx_hash, log_index)."""
+    columns = [column for column in rows[0] if column not in ("tx_hash", "log_index")]
+    if db.get_bind().dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(FlaggedVote)
+        statement = statement.on_duplicate_key_update({column: statement.inserted[column] for column in columns})
+    else:
+        # SQLite and PostgreSQL share the ON CONFLICT syntax
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(FlaggedVote)
+        statement = statement.on_conflict_do_update(
+            index_elements=["tx_hash", "log_index"],
+            set_={column: statement.excluded[column] for column in columns},
+        )
+    db.execute(statement, rows)
+
+
+def score_frame(frame: pd.DataFrame) -> List[bool]:
+    # Imported here so the fraud models load in the worker that scores (see CPU_POOL_KIND)
+    from app.routes.detect_fraud import fraud_predict
+    return [bool(flag) for flag in fraud_predict(frame)["is_fraud"]]
+
+
+class VoteEventFeed:
+    """Reads vote_events after the stored checkpoint (sync; run it on the I/O pool)."""
+
+    def __init__(self, session_factory: Callable[[], Session], name: str = CHECKPOINT_NAME):
+        self.session_factory = session_factory
+        self.name = name
+
+    def checkpoint(self) -> int:
+        with self.session_factory() as db:
+            row = db.get(FraudStreamCheckpoint, self.name)
+            return row.last_event_id if row else 0
+
+    def fetch(self, after_id: int, limit: int) -> List[dict]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(VoteEvent.id, VoteEvent.voter, VoteEvent.campaign_address, VoteEvent.tx_hash,
+                       VoteEvent.log_index, VoteEvent.block_number)
+                .where(VoteEvent.id > after_id).order_by(VoteEvent.id).limit(limit)
+            ).all()
+        return [dict(zip(EVENT_FIELDS, row)) for row in rows]
+
+
+class FlaggedVoteStore:
+    """Signals lookup and result writes against the application database (sync)."""
+
+    def __init__(self, session_factory: Callable[[], Session], checkpoint_name: str = CHECKPOINT_NAME):
+        self.session_factory = session_factory
+        self.checkpoint_name = checkpoint_name
+
+    def signals(self, voters) -> Dict[str, tuple]:
+        with self.session_factory() as db:
+            return load_signal_features(db, voters)
+
+    def write(self, flagged: List[dict], last_event_id: Optional[int]):
+        with self.session_factory() as db:
+            if flagged:
+                upsert_flagged(db, flagged)
+                # Events a reorg rolled back while the batch was being scored
+                event_ids = [row["vote_event_id"] for row in flagged if row["vote_event_id"] is not None]
+                if event_ids:
+                    db.execute(delete(FlaggedVote).where(
+                        FlaggedVote.vote_event_id.in_(event_ids),
+                        ~select(VoteEvent.id).where(VoteEvent.id == FlaggedVote.vote_event_id).exists(),
+                    ))
+            self._set_checkpoint(db, last_event_id)
+            db.commit()
+
+    def dead_letter(self, rows: List[dict], last_event_id: Optional[int]):
+        with self.session_factory() as db:
+            if rows:
+                db.execute(insert(FraudStreamDeadLetter), rows)
+            self._set_checkpoint(db, last_event_id)
+            db.commit()
+
+    def _set_checkpoint(self, db: Session, last_event_id: Optional[int]):
+        if last_event_id is None:
+            return
+        checkpoint = db.get(FraudStreamCheckpoint, self.checkpoint_name)
+        if checkpoint is None:
+            db.add(FraudStreamCheckpoint(name=self.checkpoint_name, last_event_id=last_event_id))
+        else:
+            checkpoint.last_event_id = last_event_id
+
+
+class FraudStream:
+    def __init__(
+        self,
+        store,
+        feed: Optional[VoteEventFeed] = None,
+        score: Callable[[pd.DataFrame], List[bool]] = score_frame,
+        score_pool: BoundedPool = cpu_pool,
+        batch_size: int = FRAUD_STREAM_BATCH_SIZE,
+        batch_wait: float = FRAUD_STREAM_BATCH_WAIT,
+        queue_size: int = FRAUD_STREAM_QUEUE_SIZE,
+        poll_interval: float = FRAUD_STREAM_POLL_INTERVAL,
+        retry_delay: float = FRAUD_STREAM_RETRY_DELAY,
+        max_retry_delay: float = FRAUD_STREAM_MAX_RETRY_DELAY,
+        flag_unknown: bool = FRAUD_STREAM_FLAG_UNKNOWN,
+        name: str = "votes",
+    ):
+        self.store = store
+        self.feed = feed
+        self.score = score
+        self.score_pool = score_pool
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.flag_unknown = flag_unknown
+        self._events: Optional[asyncio.Queue] = None
+        self._joined: Optional[asyncio.Queue] = None
+        self._scored: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self._halted: Optional[str] = None
+
+        labels = {"stream": name}
+        self._stage_events = {
+            stage: metrics.counter("fraud_stream_events_total", "Events that completed a pipeline stage", {**labels, "stage": stage})
+            for stage in STAGES
+        }
+        self._stage_seconds = {
+            stage: metrics.histogram("fraud_stream_stage_seconds", "Time per micro-batch in a pipeline stage", {**labels, "stage": stage})
+            for stage in STAGES
+        }
+        self._stage_errors = {
+            stage: metrics.counter("fraud_stream_errors_total", "Failed stage runs", {**labels, "stage": stage})
+            for stage in STAGES
+        }
+        self._dead_letters = metrics.counter("fraud_stream_dead_letters_total", "Events written to the dead-letter table", labels)
+        self._halted_gauge = metrics.gauge("fraud_stream_halted", "1 once a batch could be neither written nor dead-lettered", labels)
+        self._flagged = metrics.counter("fraud_stream_flagged_total", "Votes written to flagged_votes", labels)
+        self._rejected = metrics.counter("fraud_stream_rejected_total", "Events refused by offer() on a full queue", labels)
+        self._backpressure = metrics.counter("fraud_stream_backpressure_seconds_total", "Time producers waited for queue room", labels)
+        self._batch_size = metrics.histogram("fraud_stream_batch_size", "Events per scored micro-batch", labels,
+                                             buckets=(1, 4, 16, 64, 256, 1024, 4096))
+
+    def start(self):
+        if self._tasks:
+            return
+        self._events = asyncio.Queue(self.queue_size)
+        self._joined = asyncio.Queue(STAGE_QUEUE_BATCHES)
+        self._scored = asyncio.Queue(STAGE_QUEUE_BATCHES)
+        self._started_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._join_stage()), loop.create_task(self._score_stage()),
+                       loop.create_task(self._write_stage())]
+        if self.feed is not None:
+            self._tasks.append(loop.create_task(self._feed_stage()))
+
+    async def submit(self, event: dict):
+        """Queue one vote event, waiting while the pipeline is full."""
+        self.start()
+        if self._events.full():
+            start = time.perf_counter()
+            await self._events.put(event)
+            self._backpressure.inc(time.perf_counter() - start)
+        else:
+            self._events.put_nowait(event)
+        self._stage_events["feed"].inc()
+
+    def offer(self, event: dict) -> bool:
+        """Queue one vote event without waiting; False (and counted) when the pipeline is full."""
+        self.start()
+        try:
+            self._events.put_nowait(event)
+        except asyncio.QueueFull:
+            self._rejected.inc()
+            return False
+        self._stage_events["feed"].inc()
+        return True
+
+    async def _retrying(self, stage: str, fn, *args, retry_all: bool = False):
+        """
+        Run one stage call, retrying transient errors (or all, with `retry_all`) with backoff.
+        Later batches wait behind a retried one, which preserves order. Raises StageFailed on a
+        non-transient error.
+        """
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = await fn(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stage_errors[stage].inc()
+                if not (retry_all or is_transient(e)):
+                    raise StageFailed(stage, e) from e
+                delay = min(self.retry_delay * 2 ** attempt, self.max_retry_delay)
+                attempt += 1
+                log_event(logger, "fraud_stream_stage_failed", logging.WARNING, stage=stage, attempt=attempt,
+                          retry_in=delay, error=str(e))
+                await asyncio.sleep(delay)
+                continue
+            self._stage_seconds[stage].observe(time.perf_counter() - start)
+            return result
+
+    async def _feed_stage(self):
+        # Reading vote_events has no batch to set aside: keep retrying until the database answers
+        last_id = await self._retrying("feed", io_pool.run, self.feed.checkpoint, retry_all=True)
+        while True:
+            events = await self._retrying("feed", io_pool.run, self.feed.fetch, last_id, self.batch_size,
+                                          retry_all=True)
+            for event in events:
+                await self.submit(event)
+            if events:
+                last_id = events[-1]["vote_event_id"]
+            if len(events) < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self._events.get()]
+        deadline = time.perf_counter() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._events.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._events.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _join_stage(self):
+        while True:
+            batch = await self._next_batch()
+            voters = [event.get("voter") for event in batch]
+            signals, failure = None, None
+            try:
+                signals = await self._retrying("join", io_pool.run, self.store.signals, voters)
+            except StageFailed as e:
+                failure = e
+            self._stage_events["join"].inc(len(batch))
+            await self._joined.put((batch, signals, failure))
+
+    async def _score_stage(self):
+        while True:
+            batch, signals, failure = await self._joined.get()
+            flagged = []
+            if failure is None:
+                try:
+                    flagged = await self._flag(batch, signals)
+                except StageFailed as e:
+                    failure = e
+            self._stage_events["score"].inc(len(batch))
+            event_ids = [event["vote_event_id"] for event in batch if event.get("vote_event_id") is not None]
+            await self._scored.put((batch, flagged, max(event_ids) if event_ids else None, failure))
+
+    async def _flag(self, batch: List[dict], signals: Dict[str, tuple]) -> List[dict]:
+        known = [event for event in batch if (event.get("voter") or "").lower() in signals]
+        flags = []
+        if known:
+            frame = pd.DataFrame(
+                [signals[event["voter"].lower()] for event in known], columns=FEATURE_COLUMNS[1:]
+            )
+            frame.insert(0, "Address", [event["voter"] for event in known])
+            flags = await self._retrying("score", self.score_pool.run, self.score, frame)
+        self._batch_size.observe(len(known))
+
+        flagged = [self._flagged_row(event, "model", signals[event["voter"].lower()])
+                   for event, is_fraud in zip(known, flags) if is_fraud]
+        if self.flag_unknown:
+            flagged += [self._flagged_row(event, "no_signals", None)
+                        for event in batch if (event.get("voter") or "").lower() not in signals]
+        return flagged
+
+    @staticmethod
+    def _flagged_row(event: dict, reason: str, features: Optional[tuple]) -> dict:
+        row = {field: event.get(field) for field in EVENT_FIELDS}
+        row["voter"] = row["voter"].lower() if row["voter"] else None
+        row["reason"] = reason
+        # Every row has the same keys, as one executemany needs
+        row.update(dict.fromkeys(FEATURE_FIELDS))
+        if features is not None:
+            minutes, attempts, robot, match, liveness = features
+            row.update(time_diff_mins=float(minutes), face_attempts=int(attempts), robot_detected=int(robot),
+                       face_match_percentage=float(match), liveness_score=float(liveness))
+        return row
+
+    async def _write_stage(self):
+        while True:
+            batch, flagged, last_event_id, failure = await self._scored.get()
+            if failure is None:
+                try:
+                    await self._retrying("write", io_pool.run, self.store.write, flagged, last_event_id)
+                    self._flagged.inc(len(flagged))
+                except StageFailed as e:
+                    failure = e
+            if failure is not None and not await self._dead_letter(batch, failure, last_event_id):
+                # Nothing of this batch is stored: stop before a later batch moves the checkpoint past
+                # it, so a restart scores it again
+                self._halted = f"{failure.stage}: {failure.error}"
+                self._halted_gauge.set(1)
+                log_event(logger, "fraud_stream_halted", logging.ERROR, events=len(batch), last_event_id=last_event_id)
+                return
+            self._stage_events["write"].inc(len(batch))
+
+    async def _dead_letter(self, batch: List[dict], failure: StageFailed, last_event_id: Optional[int]) -> bool:
+        log_event(logger, "fraud_stream_batch_dead_lettered", logging.ERROR, stage=failure.stage,
+                  events=len(batch), last_event_id=last_event_id, error=str(failure.error))
+        error = f"{type(failure.error).__name__}: {failure.error}"[:500]
+        rows = [{"stage": failure.stage, "error": error, **{field: event.get(field) for field in DEAD_LETTER_FIELDS}}
+                for event in batch]
+        try:
+            await self._retrying("write", io_pool.run, self.store.dead_letter, rows, last_event_id)
+        except StageFailed as e:
+            log_event(logger, "fraud_stream_dead_letter_failed", logging.ERROR, events=len(batch), error=str(e.error))
+            return False
+        self._dead_letters.inc(len(batch))
+        return True
+
+    @property
+    def halted(self) -> Optional[str]:
+        """Why the write stage stopped, or None while it runs."""
+        return self._halted
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until every queued event is written (used by tests and the load test)."""
+        async def drained():
+            while (self._stage_events["write"].value < self._stage_events["feed"].value
+                   or not self._events.empty()):
+                if self._halted:
+                    raise RuntimeError(f"fraud stream halted: {self._halted}")
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(drained(), timeout)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        stages = {}
+        for stage in STAGES:
+            count = self._stage_events[stage].value
+            stages[stage] = {
+                "events": count,
+                "events_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+                "errors": self._stage_errors[stage].value,
+                "batch_seconds": self._stage_seconds[stage].snapshot(),
+            }
+        return {
+            "running": bool(self._tasks),
+            "queued_events": self._events.qsize() if self._events is not None else 0,
+            "queue_size": self.queue_size,
+            "queued_batches": {
+                "score": self._joined.qsize() if self._joined is not None else 0,
+                "write": self._scored.qsize() if self._scored is not None else 0,
+            },
+            "stages": stages,
+            "flagged": self._flagged.value,
+            "dead_lettered": self._dead_letters.value,
+            "halted": self._halted,
+            "rejected": self._rejected.value,
+            "backpressure_seconds": self._backpressure.value,
+            "batch_size": self._batch_size.snapshot(),
+        }
+
+
+def create_fraud_stream(session_factory: Callable[[], Session] = SessionLocal, from_vote_events: bool = True, **kwargs) -> FraudStream:
+    feed = VoteEventFeed(session_factory) if from_vote_events else None
+    return FraudStream(FlaggedVoteStore(session_factory), feed=feed, **kwargs)
@@ -1,7 +1,83 @@
-from tensorflow.keras.preprocessing import image
+import io
+import os
+from typing import Optional, Sequence, Tuple
+
 import numpy as np
+from dotenv import load_dotenv
+from PIL import Image
+
+load_dotenv()
+
+LIVENESS_INPUT_SIZE = (224, 224)
+# "frame": the liveness model sees the whole upload, as it was trained; "face": only the detected
+# face and a margin around it. Opt-in until its accuracy is measured on labelled uploads
+LIVENESS_CROP = os.getenv("LIVENESS_CROP", "frame").lower()
+# Margin added on each side of the face box, as a fraction of the box size
+LIVENESS_FACE_MARGIN = float(os.getenv("LIVENESS_FACE_MARGIN", "0.25"))
+
+# uint8 pixel -> [0, 1]; indexing it gives the same float32 values as dividing by 255.0
+_UNIT_SCALE = np.arange(256, dtype=np.float32) / 255.0
+
+
+def decode_image(content: bytes) -> np.ndarray:
+    """
+    Decode uploaded image bytes once into an RGB uint8 array (H, W, 3).
+    Same conversion as face_recognition.load_image_file, without touching the disk.
+    """
+    with Image.open(io.BytesIO(content)) as img:
+        return np.array(img.convert('RGB'))
+
+
+def preprocess_image_from_array(img: np.ndarray) -> np.ndarray:
+    """
+    Liveness model input from an already decoded RGB array: equivalent to
+    preprocess_image_from_path (nearest-neighbour resize to 224x224, scaled to [0, 1]).
+    """
+    resized = Image.fromarray(img).resize(LIVENESS_INPUT_SIZE, Image.NEAREST)
+    img_array = np.asarray(resized, dtype=np.float32) / 255.0
+    return np.expand_dims(img_array, axis=0)
+
+
+def face_crop_box(location: Tuple[int, int, int, int], shape: Tuple[int, ...],
+                  margin: float = LIVENESS_FACE_MARGIN) -> Tuple[int, int, int, int]:
+    """(top, bottom, left, right) of a face box from face_recognition grown by `margin`, within the image."""
+    top, right, bottom, left = location
+    pad_y, pad_x = int((bottom - top) * margin), int((right - left) * margin)
+    height, width = shape[:2]
+    return max(0, top - pad_y), min(height, bottom + pad_y), max(0, left - pad_x), min(width, right + pad_x)
+
+
+def preprocess_face(img: np.ndarray, location: Optional[Tuple[int, int, int, int]] = None,
+                    out: Optional[np.ndarray] = None, margin: float = LIVENESS_FACE_MARGIN) -> np.ndarray:
+    """
+    Liveness model input (224, 224, 3) from the face at `location` (face_recognition's
+    (top, right, bottom, left)), written into `out` when given. Only the face region is copied and
+    resized, so the cost no longer grows with the upload size. Without a location the whole image
+    is used, giving the same values as preprocess_image_from_array.
+    """
+    if location is not None:
+        top, bottom, left, right = face_crop_box(location, img.shape, margin)
+        if bottom > top and right > left:
+            img = img[top:bottom, left:right]
+    resized = Image.fromarray(np.ascontiguousarray(img)).resize(LIVENESS_INPUT_SIZE, Image.NEAREST)
+    if out is None:
+        out = np.empty(LIVENESS_INPUT_SIZE + (3,), dtype=np.float32)
+    return np.take(_UNIT_SCALE, np.asarray(resized), out=out)
+
+
+def preprocess_faces(images: Sequence[np.ndarray], locations: Sequence[Optional[Tuple[int, int, int, int]]],
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """A (N, 224, 224, 3) liveness batch, reusing `out` (any array with at least N rows) when given."""
+    if out is None or len(out) < len(images):
+        out = np.empty((len(images),) + LIVENESS_INPUT_SIZE + (3,), dtype=np.float32)
+    for i, (img, location) in enumerate(zip(images, locations)):
+        preprocess_face(img, location, out[i])
+    return out[:len(images)]
+
 
 def preprocess_image_from_path(img_path: str):
+    from tensorflow.keras.preprocessing import image
+
     img = image.load_img(img_path, target_size=(224, 224))
     img_array = image.img_to_array(img)
     img_array = img_array / 255.0
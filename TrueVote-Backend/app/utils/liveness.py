@@ -0,0 +1,103 @@
+"""
+Liveness checks for the biometric routes.
+
+Concurrent checks are queued by a MicroBatcher and scored in one forward pass on the CPU pool.
+With LIVENESS_API_URL set, batches go to FaceRecognition/liveness_api (POST /predict/batch) over
+one shared async client instead, so the backend never loads TensorFlow and no worker is held
+while the service runs the model.
+"""
+import io
+import os
+from typing import Optional
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+from PIL import Image
+
+from app.utils.batching import MicroBatcher
+from app.utils.executors import cpu_pool, io_pool
+from app.utils.tracing import span
+
+load_dotenv()
+
+# Dispatch a liveness batch once this many images are waiting...
+LIVENESS_MAX_BATCH_SIZE = int(os.getenv("LIVENESS_MAX_BATCH_SIZE", "16"))
+# ...or once the oldest waiting image has waited this long
+LIVENESS_MAX_LATENCY_MS = float(os.getenv("LIVENESS_MAX_LATENCY_MS", "10"))
+# Batches allowed in flight at once (each occupies one CPU pool worker)
+LIVENESS_MAX_CONCURRENT_BATCHES = int(os.getenv("LIVENESS_MAX_CONCURRENT_BATCHES", "1"))
+# Base URL of FaceRecognition/liveness_api; when set, TensorFlow is not loaded in this process
+LIVENESS_API_URL = os.getenv("LIVENESS_API_URL", "").rstrip("/")
+LIVENESS_API_TIMEOUT = float(os.getenv("LIVENESS_API_TIMEOUT", "10"))
+LIVENESS_API_CONNECT_TIMEOUT = float(os.getenv("LIVENESS_API_CONNECT_TIMEOUT", "2"))
+
+# Shared by every remote batch so connections to the liveness service are reused
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _predict_batch(img_arrays):
+    # Runs in a CPU pool worker, which loads the Keras model on first use
+    from app.models.model import predict_batch
+    return predict_batch(img_arrays)
+
+
+def _encode_png(img_array) -> bytes:
+    # Inputs are uint8 pixels scaled to [0, 1], so PNG round-trips them exactly; the service's
+    # 224x224 nearest-neighbour resize is then a no-op
+    buffer = io.BytesIO()
+    Image.fromarray(np.rint(img_array * 255).astype(np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _encode_frames(img_arrays) -> list:
+    return [("files", (f"frame{i}.png", _encode_png(img), "image/png")) for i, img in enumerate(img_arrays)]
+
+
+def _liveness_client() -> httpx.AsyncClient:
+    global _client
+    # Created on first use so it binds to the running event loop; one connection per batch in flight
+    if _client is None:
+        limits = httpx.Limits(max_connections=LIVENESS_MAX_CONCURRENT_BATCHES,
+                              max_keepalive_connections=LIVENESS_MAX_CONCURRENT_BATCHES)
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(LIVENESS_API_TIMEOUT, connect=LIVENESS_API_CONNECT_TIMEOUT),
+                                    limits=limits)
+    return _client
+
+
+async def _remote_predict_batch(img_arrays):
+    # PNG encoding is the only blocking part; the request itself waits on the loop
+    files = await io_pool.run(_encode_frames, img_arrays)
+    response = await _liveness_client().post(f"{LIVENESS_API_URL}/predict/batch", files=files)
+    response.raise_for_status()
+    return [(item["prediction"], item["label"]) for item in response.json()]
+
+
+async def aclose_liveness_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _run_batch(img_arrays):
+    if LIVENESS_API_URL:
+        return await _remote_predict_batch(img_arrays)
+    return await cpu_pool.run(_predict_batch, img_arrays)
+
+
+liveness_batcher = MicroBatcher(
+    _run_batch,
+    max_batch_size=LIVENESS_MAX_BATCH_SIZE,
+    max_latency=LIVENESS_MAX_LATENCY_MS / 1000,
+    max_concurrency=LIVENESS_MAX_CONCURRENT_BATCHES,
+    name="liveness",
+)
+
+
+async def check_liveness(img_array) -> dict:
+    """Liveness score for one preprocessed (224, 224, 3) image, batched with concurrent requests."""
+    # Includes the wait for the batch to fill; batcher_queue_wait_seconds separates the two
+    with span("liveness"):
+        prediction, label = await liveness_batcher.submit(img_array)
+    return {"prediction": prediction, "label": label}
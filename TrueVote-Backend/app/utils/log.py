@@ -0,0 +1,80 @@
+"""
+Structured logging for the request hot paths.
+
+Events are written one per line (JSON by default) with their fields as keys, so they can be
+filtered and aggregated instead of grepped. Events logged with `sample=True` (one line per
+request, vote or face comparison) are written for a LOG_SAMPLE_RATE fraction of calls only;
+the sampling decision is made before anything is formatted, so a dropped event costs one random
+draw. Warnings and errors are never sampled.
+"""
+import json
+import logging
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "json": one JSON object per line; "text": event name followed by key=value pairs
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraction of sampled (per-request) events that are written
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+ROOT_LOGGER = "truevote"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{record.levelname.lower():<7} {record.name} {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    if root.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    # Uvicorn's own loggers are separate; do not print every event twice through the root logger
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    _configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def should_log(logger: logging.Logger, level: int = logging.INFO, sample: bool = False) -> bool:
+    """Whether an event would be written; lets callers skip building expensive fields."""
+    if sample and level < logging.WARNING and random.random() >= LOG_SAMPLE_RATE:
+        return False
+    return logger.isEnabledFor(level)
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, sample: bool = False,
+              exc_info=None, **fields):
+    if should_log(logger, level, sample):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
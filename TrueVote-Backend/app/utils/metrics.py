@@ -0,0 +1,208 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+# Default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(text: str, quotes: bool = False) -> str:
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quotes else text
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v, quotes=True)}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: LabelKey = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self):
+        return self._value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: LabelKey = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self):
+        return self._value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: LabelKey = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus the +Inf overflow slot
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def cumulative_counts(self):
+        """Return [(upper_bound, cumulative_count), ...] ending with +Inf."""
+        with self._lock:
+            counts = list(self._counts)
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile using the upper bound of the bucket that contains it."""
+        if self._count == 0:
+            return None
+        target = q * self._count
+        for bound, cumulative in self.cumulative_counts():
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide store of named metrics, one instance per (name, labels) pair."""
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, description, labels, **kwargs):
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, description, key[1], **kwargs)
+                    self._metrics[key] = metric
+        return metric
+
+    def counter(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None,
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets=buckets)
+
+    def collect(self):
+        return list(self._metrics.values())
+
+    def snapshot(self, prefix: str = "") -> dict:
+        """JSON-friendly view of every metric whose name starts with `prefix`."""
+        result = {}
+        for metric in self.collect():
+            if not metric.name.startswith(prefix):
+                continue
+            key = metric.name
+            if metric.labels:
+                key += "{" + ",".join(f"{k}={v}" for k, v in metric.labels) + "}"
+            result[key] = metric.snapshot()
+        return result
+
+    def prometheus_text(self) -> str:
+        """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+        families: Dict[str, list] = {}
+        for metric in self.collect():
+            families.setdefault(metric.name, []).append(metric)
+        lines = []
+        for name in sorted(families):
+            family = sorted(families[name], key=lambda m: m.labels)
+            lines.append(f"# HELP {name} {_escape(family[0].description)}")
+            lines.append(f"# TYPE {name} {family[0].kind}")
+            for metric in family:
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{_format_labels(metric.labels)} {_format_value(metric.value)}")
+                    continue
+                for bound, cumulative in metric.cumulative_counts():
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(metric.labels + le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(metric.labels)} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(metric.labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -1,65 +1,112 @@
-import joblib
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import RobustScaler
-from xgboost import XGBClassifier
+import logging
+import numpy as np
 import pandas as pd
-import os
-from Crypto.Hash import keccak
-
-iso_foret_model = joblib.load('./models/isolation_forest_model.pkl')    # Use ../../models/isolation_forest_model.pkl when doing unit tests
-logistic_regression_model = joblib.load('./models/logistic_regression_model.pkl')    # Use ../../models/logistic_regression_model.pkl when doing unit tests
-meta_model = joblib.load('./models/model_xgb.joblib')     # Use ../../models/model_xgb.joblib when doing unit tests
-
-
-
-def hash_address(address):
-    print("Hashing address:", address)
-
-    if not isinstance(address, str):
-        print("Invalid address type:", type(address))
-        raise ValueError("Address must be a non-null string.")
-    keccak_hash = keccak.new(digest_bits=256)
+from app.utils.model_registry import registry
+from app.utils.log import get_logger, log_event, should_log
+from app.utils.tracing import span
+from app.utils.address_hash import (
+    hash_address,
+    hash_addresses,
+    configure_address_hash_cache,
+    address_hash_cache_stats,
+)
+
+logger = get_logger("fraud")
+
+# Column order the isolation forest was fitted on; the logistic regression uses all but 'Address'
+FEATURE_COLUMNS = [
+    'Address',
+    'Time Diff between first and last (Mins)',
+    'Face Attempts',
+    'Detected As a Robot At Least Once',
+    'Face Match Percentage',
+    'Liveness Score of The Face',
+]
+
+
+class CompiledRobustScaler:
+    """
+    RobustScaler parameters pulled out once so every feature can be scaled in a single
+    vectorized NumPy expression. The fitted scaler is single-feature and is applied to
+    every column, so center/scale are broadcast across the whole matrix.
+    """
+
+    def __init__(self, scaler):
+        self.source = scaler
+        self.center = np.asarray(scaler.center_, dtype=np.float64) if scaler.with_centering else None
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_scaling else None
+
+    def transform(self, values):
+        # Same in-place operations, in the same order, as RobustScaler.transform
+        if self.center is not None:
+            values -= self.center
+        if self.scale is not None:
+            values /= self.scale
+        return values
+
+
+_compiled_robust_scaler = None
+
+
+def get_compiled_robust_scaler():
+    global _compiled_robust_scaler
+    scaler = registry.get('robust_scaler')
+    compiled = _compiled_robust_scaler
+    # Recompile only when the registry hot-reloads a new scaler object
+    if compiled is None or compiled.source is not scaler:
+        compiled = CompiledRobustScaler(scaler)
+        _compiled_robust_scaler = compiled
+    return compiled
+
+
+def pre_process_array(data):
+    """
+    Hash and scale the feature columns of `data` into a contiguous float64 matrix
+    in FEATURE_COLUMNS order.
+    """
+    values = np.empty((len(data), len(FEATURE_COLUMNS)), dtype=np.float64)
 
     try:
-        keccak_hash.update(address.encode())
+        values[:, 0] = hash_addresses(data['Address'])
     except Exception as e:
-        print("Error during hashing:", str(e))
+        log_event(logger, "address_hashing_failed", logging.ERROR, error=str(e))
         raise
 
-    decimal_address = int(keccak_hash.hexdigest(), 16)
+    values[:, 1:] = np.asarray(data[FEATURE_COLUMNS[1:]], dtype=np.float64)
 
     try:
-        normalized_address = decimal_address / (2**256 - 1)
-    except ZeroDivisionError:
-        print("Error during normalization:", str(e))
-        raise
+        get_compiled_robust_scaler().transform(values)
     except Exception as e:
-        print("Error during normalization:", str(e))
+        log_event(logger, "scaling_failed", logging.ERROR, error=str(e))
         raise
 
-    return normalized_address
+    return values
 
 
 def pre_process_data(data):
+    return pd.DataFrame(pre_process_array(data), columns=FEATURE_COLUMNS, copy=False)
+
+
+def pre_process_data_dataframe(data):
+    # Original per-column implementation, kept as the reference for parity tests and benchmarks
     pre_process_data = data.copy()
     pre_process_data = pd.DataFrame(pre_process_data)
 
-    print("Columns available:", pre_process_data.columns)
+    log_event(logger, "preprocess_columns", logging.DEBUG, columns=list(pre_process_data.columns))
 
     try:
         pre_process_data['Address'] = pre_process_data['Address'].apply(hash_address)
     except Exception as e:
-        print("Error during address hashing:", e)
+        log_event(logger, "address_hashing_failed", logging.ERROR, error=str(e))
         raise
 
-    robust_scaler_path = './app/utils/feature_scalers/robust_scaler.joblib'      # Use ../../app/utils/feature_scalers/robust_scaler.joblib when doing unit tests
-    robust_scaler = joblib.load(robust_scaler_path)
+    robust_scaler = registry.get('robust_scaler')
     
     try:
         for col in pre_process_data.columns:
             pre_process_data[col] = robust_scaler.transform(pre_process_data[col].values.reshape(-1, 1))
     except Exception as e:
-        print("Error during scaling:", str(e))
+        log_event(logger, "scaling_failed", logging.ERROR, error=str(e))
         raise
 
     pre_process_data = pd.DataFrame(pre_process_data, columns=pre_process_data.columns)
@@ -67,36 +114,46 @@ def pre_process_data(data):
     return pre_process_data
 
 def scale_data(data):
-    scaler = joblib.load('./app/utils/feature_scalers/feature_scaler.joblib')      # Use ../../app/utils/feature_scalers/feature_scaler.joblib when doing unit tests
+    scaler = registry.get('feature_scaler')
     scaled_data = scaler.transform(data)
     return scaled_data
 
 def stacked_model_predict(data):
-    pre_processed_data = pre_process_data(data)
-
     if data is None or data.empty:
         raise ValueError("No data provided for prediction.")
+
+    with span("fraud_preprocess", backend="sklearn"):
+        pre_processed_data = pre_process_data(data)
     
-    iso_forest_preds = iso_foret_model.predict(pre_processed_data)
-    logistic_regression_preds = logistic_regression_model.predict_proba(pre_processed_data.drop(columns=['Address']))
+    iso_foret_model = registry.get('iso_forest')
+    logistic_regression_model = registry.get('logistic_regression')
+    meta_model = registry.get('meta_model')
+
+    with span("fraud_model", backend="sklearn", model="iso_forest"):
+        iso_forest_preds = iso_foret_model.predict(pre_processed_data)
+    with span("fraud_model", backend="sklearn", model="logistic_regression"):
+        logistic_regression_preds = logistic_regression_model.predict_proba(pre_processed_data.drop(columns=['Address']))
 
     # print("Fraud Probability: ", logistic_regression_preds[0][1], '\n', "Anomaly score: ", iso_forest_preds[0])
 
-    meta_dataset = pd.DataFrame({
-        'fraud_probability': logistic_regression_preds[:, 1],
-        'is_anomaly': [1 if pred == -1 else 0 for pred in iso_forest_preds],
-    })
+    # The meta model's span includes building and scaling its two input features
+    with span("fraud_model", backend="sklearn", model="meta_model"):
+        meta_dataset = pd.DataFrame({
+            'fraud_probability': logistic_regression_preds[:, 1],
+            'is_anomaly': [1 if pred == -1 else 0 for pred in iso_forest_preds],
+        })
 
-    expected_columns = ['fraud_probability', 'is_anomaly']
-    for col in expected_columns:
-        if col not in meta_dataset.columns:
-            meta_dataset[col] = 0 
+        expected_columns = ['fraud_probability', 'is_anomaly']
+        for col in expected_columns:
+            if col not in meta_dataset.columns:
+                meta_dataset[col] = 0 
 
-    meta_dataset = scale_data(meta_dataset)
-    # print("Fraud Probability: ", meta_dataset[0][0], '\n', "Anomaly score: ", meta_dataset[0][1])
+        meta_dataset = scale_data(meta_dataset)
+        # print("Fraud Probability: ", meta_dataset[0][0], '\n', "Anomaly score: ", meta_dataset[0][1])
 
-    is_fraud = meta_model.predict(meta_dataset)
-    print(is_fraud[0])
+        is_fraud = meta_model.predict(meta_dataset)
+    if should_log(logger, logging.DEBUG):
+        log_event(logger, "fraud_predictions", logging.DEBUG, predictions=np.asarray(is_fraud).tolist())
 
     return {'Address': data.Address, 'is_fraud': is_fraud}
 
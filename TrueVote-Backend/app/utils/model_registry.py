@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+
+logger = get_logger("model_registry")
+
+# TrueVote-Backend/ - artifact paths no longer depend on the working directory
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+FRAUD_ARTIFACTS = {
+    'iso_forest': os.path.join(BASE_DIR, 'models', 'isolation_forest_model.pkl'),
+    'logistic_regression': os.path.join(BASE_DIR, 'models', 'logistic_regression_model.pkl'),
+    'meta_model': os.path.join(BASE_DIR, 'models', 'model_xgb.joblib'),
+    'robust_scaler': os.path.join(BASE_DIR, 'app', 'utils', 'feature_scalers', 'robust_scaler.joblib'),
+    'feature_scaler': os.path.join(BASE_DIR, 'app', 'utils', 'feature_scalers', 'feature_scaler.joblib'),
+}
+
+
+def joblib_load(path: str):
+    # joblib (and scikit-learn/xgboost, pulled in by unpickling) load with the first artifact
+    import joblib
+    return joblib.load(path)
+
+
+def _file_signature(path: str):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModelRegistry:
+    """
+    Holds the fraud-detection models and scalers in memory.
+
+    Artifacts are unpickled once (eagerly via `load_all()` at startup, or lazily on the
+    first `get()`), and `reload_if_changed()` swaps in a new generation atomically when
+    any file on disk changes, so in-flight requests keep a consistent set of objects.
+    """
+
+    def __init__(self, artifacts: Dict[str, str], loader=joblib_load):
+        self._paths = dict(artifacts)
+        self._loader = loader
+        self._artifacts: Dict[str, object] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+        self.generation = 0
+
+    def _load(self, name: str):
+        path = self._paths[name]
+        start = time.perf_counter()
+        artifact = self._loader(path)
+        elapsed = time.perf_counter() - start
+        metrics.histogram("model_registry_load_seconds", "Time spent unpickling an artifact",
+                          {"artifact": name}).observe(elapsed)
+        metrics.counter("model_registry_loads_total", "Artifact loads from disk",
+                        {"artifact": name}).inc()
+        metrics.gauge("model_registry_last_load_seconds", "Duration of the most recent load",
+                      {"artifact": name}).set(elapsed)
+        return artifact
+
+    def load_all(self):
+        """Load every artifact into memory, replacing whatever is currently held."""
+        with self._lock:
+            loaded = {name: self._load(name) for name in self._paths}
+            signatures = {name: _file_signature(path) for name, path in self._paths.items()}
+            # Single reference swap: readers see either the old or the new generation
+            self._artifacts = loaded
+            self._signatures = signatures
+            self.generation += 1
+
+    def get(self, name: str):
+        artifacts = self._artifacts
+        if name in artifacts:
+            metrics.counter("model_registry_cache_hits_total", "Artifact lookups served from memory",
+                            {"artifact": name}).inc()
+            return artifacts[name]
+
+        metrics.counter("model_registry_cache_misses_total", "Artifact lookups that hit the disk",
+                        {"artifact": name}).inc()
+        with self._lock:
+            if name not in self._artifacts:
+                loaded = dict(self._artifacts)
+                loaded[name] = self._load(name)
+                self._signatures[name] = _file_signature(self._paths[name])
+                self._artifacts = loaded
+            return self._artifacts[name]
+
+    def changed(self):
+        """Names of loaded artifacts whose file on disk differs from what is in memory."""
+        changed = []
+        for name, signature in list(self._signatures.items()):
+            try:
+                if _file_signature(self._paths[name]) != signature:
+                    changed.append(name)
+            except FileNotFoundError:
+                # Mid-replace; pick it up on the next poll
+                continue
+        return changed
+
+    def reload_if_changed(self) -> bool:
+        """Reload the whole set if any artifact changed on disk. Returns True on reload."""
+        if not self.changed():
+            return False
+        try:
+            self.load_all()
+        except Exception as e:
+            # Keep serving the previous generation if the new files are unreadable
+            metrics.counter("model_registry_reload_errors_total", "Failed hot reloads").inc()
+            log_event(logger, "model_reload_failed", logging.ERROR, error=str(e))
+            return False
+        metrics.counter("model_registry_reloads_total", "Successful hot reloads").inc()
+        return True
+
+    def start_watcher(self, interval: float):
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop_watcher.clear()
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._stop_watcher.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "loaded": sorted(self._artifacts),
+            "metrics": metrics.snapshot(prefix="model_registry_"),
+        }
+
+
+registry = ModelRegistry(FRAUD_ARTIFACTS)
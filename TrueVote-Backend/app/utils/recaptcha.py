@@ -0,0 +1,196 @@
+"""
+reCAPTCHA token verification over one pooled async HTTP client.
+
+The client keeps connections to the verification endpoint alive between requests, retries
+only failures where the request was never sent (connection refused, connect timeout; tokens are
+single-use, so a token siteverify already saw would come back as a duplicate), and deduplicates identical tokens
+from the same requester: siteverify accepts a token only once, so a token resubmitted by the same
+client (double click, client retry) is answered with the first verdict for RECAPTCHA_CACHE_TTL
+seconds instead of a "timeout-or-duplicate" failure, and its concurrent submissions share one
+outbound call. A verdict is never given to a different requester, which keeps tokens single-use:
+the same token from another client or wallet goes to siteverify and is rejected as a duplicate.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+# Use reCAPTCHA secret key in .env file
+RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
+# Point at a local stub in tests and load tests
+RECAPTCHA_VERIFY_URL = os.getenv("RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
+# Seconds for the whole request (connect, write, read) and for establishing the connection
+RECAPTCHA_TIMEOUT = float(os.getenv("RECAPTCHA_TIMEOUT", "5"))
+RECAPTCHA_CONNECT_TIMEOUT = float(os.getenv("RECAPTCHA_CONNECT_TIMEOUT", "2"))
+# Extra attempts after the connection could not be opened (the token was never sent)
+RECAPTCHA_RETRIES = int(os.getenv("RECAPTCHA_RETRIES", "2"))
+RECAPTCHA_RETRY_BACKOFF = float(os.getenv("RECAPTCHA_RETRY_BACKOFF", "0.1"))
+RECAPTCHA_MAX_CONNECTIONS = int(os.getenv("RECAPTCHA_MAX_CONNECTIONS", "100"))
+# Seconds a verdict is reused for the same token and requester; 0 disables deduplication
+RECAPTCHA_CACHE_TTL = float(os.getenv("RECAPTCHA_CACHE_TTL", "30"))
+RECAPTCHA_CACHE_SIZE = int(os.getenv("RECAPTCHA_CACHE_SIZE", "10000"))
+
+
+class RecaptchaUnavailableError(RuntimeError):
+    """Raised when the verification endpoint cannot be reached or keeps failing."""
+
+
+class RecaptchaVerifier:
+    def __init__(
+        self,
+        url: str = RECAPTCHA_VERIFY_URL,
+        secret: Optional[str] = RECAPTCHA_SECRET_KEY,
+        timeout: float = RECAPTCHA_TIMEOUT,
+        connect_timeout: float = RECAPTCHA_CONNECT_TIMEOUT,
+        retries: int = RECAPTCHA_RETRIES,
+        retry_backoff: float = RECAPTCHA_RETRY_BACKOFF,
+        max_connections: int = RECAPTCHA_MAX_CONNECTIONS,
+        cache_ttl: float = RECAPTCHA_CACHE_TTL,
+        cache_size: int = RECAPTCHA_CACHE_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        name: str = "recaptcha",
+    ):
+        self.url = url
+        self.secret = secret
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._in_flight = {}
+
+        labels = {"client": name}
+        self._request_seconds = metrics.histogram("recaptcha_request_seconds", "One HTTP attempt to the verify endpoint", labels)
+        self._verify_seconds = metrics.histogram("recaptcha_verify_seconds", "Token verification including retries", labels)
+        self._retries = metrics.counter("recaptcha_retries_total", "Attempts repeated after an error", labels)
+        self._failures = metrics.counter("recaptcha_failures_total", "Verifications that exhausted their retries", labels)
+        self._cache_hits = metrics.counter("recaptcha_cache_hits_total", "Tokens answered from the dedup cache", labels)
+        self._coalesced = metrics.counter("recaptcha_coalesced_total", "Tokens that joined an identical in-flight call", labels)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self._transport)
+        return self._client
+
+    async def verify(self, token: str, requester: Optional[str] = None) -> dict:
+        """
+        `requester` identifies who submitted the token (client address, session wallet); only
+        submissions with the same token and requester are deduplicated. Without it every call
+        goes to the endpoint.
+        """
+        if requester is None:
+            return await self._verify(token)
+        key = (token, requester)
+
+        cached = self._cached(key)
+        if cached is not None:
+            self._cache_hits.inc()
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced.inc()
+        else:
+            task = asyncio.ensure_future(self._verify(token))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # Shielded so one caller disconnecting does not cancel the call the others wait on
+        return dict(await asyncio.shield(task))
+
+    def _finish(self, key: tuple, task: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    async def _verify(self, token: str) -> dict:
+        start = time.perf_counter()
+        try:
+            return await self._post_with_retries({"secret": self.secret, "response": token})
+        finally:
+            self._verify_seconds.observe(time.perf_counter() - start)
+
+    async def _post_with_retries(self, data: dict) -> dict:
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._retries.inc()
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(self.url, data=data)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Nothing was sent, so the token is still unused
+                last_error = e
+                continue
+            except httpx.TransportError as e:
+                # The token may have reached siteverify (read timeout, dropped connection): a retry
+                # would be rejected as a duplicate
+                last_error = e
+                break
+            finally:
+                self._request_seconds.observe(time.perf_counter() - start)
+            try:
+                response.raise_for_status()
+                result = response.json()
+            except (httpx.HTTPStatusError, ValueError) as e:
+                last_error = e
+                break
+            if attempt and "timeout-or-duplicate" in result.get("error-codes", ()):
+                # Rejected because an earlier attempt got through after all, not because of the user
+                last_error = "token consumed by an earlier attempt"
+                break
+            return result
+        self._failures.inc()
+        raise RecaptchaUnavailableError(f"reCAPTCHA verification failed: {last_error}")
+
+    def _cached(self, key: tuple) -> Optional[dict]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        return dict(result)
+
+    def _store(self, key: tuple, result: dict):
+        if self.cache_ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, dict(result))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "cached_tokens": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "request_seconds": self._request_seconds.snapshot(),
+            "verify_seconds": self._verify_seconds.snapshot(),
+            "retries": self._retries.value,
+            "failures": self._failures.value,
+            "cache_hits": self._cache_hits.value,
+            "coalesced": self._coalesced.value,
+        }
+
+
+recaptcha_verifier = RecaptchaVerifier()
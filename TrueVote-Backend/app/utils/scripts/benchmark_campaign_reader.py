@@ -0,0 +1,93 @@
+"""
+Benchmark of campaign state reads against a local node (e.g. `npx hardhat node` with the
+TrueVote contracts deployed).
+
+Compares, for the same campaigns:
+  naive   one eth_call per view function, as the frontend does it: every getter, then
+          getCandidatesCount() and getCandidate(i) for each candidate
+  cold    CampaignReader with an empty cache: head block + one JSON-RPC batch
+  warm    CampaignReader again within the same block: served from the per-block cache
+and reports HTTP round trips and wall time of each.
+
+Campaigns are listed from the factory (getDeployedCampaigns()) or given with --campaigns.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_campaign_reader --factory 0x5FbDB2315678afecb367f032d93F642f64180aa3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.campaign_reader import CampaignReader, CAMPAIGN_CALLS, VOTER_CALLS
+from app.utils.chain_rpc import JsonRpcClient, CHAIN_RPC_URL, encode_call, decode_abi
+
+
+def deployed_campaigns(rpc, factory):
+    data = rpc.call("eth_call", [{"to": factory, "data": encode_call("getDeployedCampaigns()")}, "latest"])
+    return decode_abi("address[]", data)[0]
+
+
+def read_naive(rpc, address, voter):
+    def view(signature, types, *args):
+        return decode_abi(types, rpc.call("eth_call", [{"to": address, "data": encode_call(signature, *args)}, "latest"]))
+
+    state = {field: view(signature, types)[0]
+             for field, (signature, types) in CAMPAIGN_CALLS.items() if field != "candidates"}
+    if voter:
+        state.update({field: view(signature, types, voter)[0] for field, (signature, types) in VOTER_CALLS.items()})
+    count = view("getCandidatesCount()", "uint256")[0]
+    state["candidates"] = [view("getCandidate(uint256)", "string,uint256", i) for i in range(count)]
+    return state
+
+
+def timed(runs, fn):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def report(label, seconds, round_trips):
+    p50, p95 = np.percentile(seconds, [50, 95]) * 1000
+    print(f"  {label:<6} {round_trips:>6.0f} round trips   p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def run(rpc_url, factory, addresses, voter, runs):
+    rpc = JsonRpcClient(rpc_url, name="benchmark_naive")
+    if factory:
+        addresses = deployed_campaigns(rpc, factory) + list(addresses)
+    if not addresses:
+        raise SystemExit("No campaigns: pass --factory or --campaigns")
+    print(f"{len(addresses)} campaigns on {rpc_url}, {runs} runs each")
+
+    before = rpc.stats()["round_trips"]
+    naive = timed(runs, lambda: [read_naive(rpc, address, voter) for address in addresses])
+    report("naive", naive, (rpc.stats()["round_trips"] - before) / runs)
+
+    batched_rpc = JsonRpcClient(rpc_url, name="benchmark_batched")
+    cold_seconds, warm_seconds, cold_trips, warm_trips = [], [], 0, 0
+    for _ in range(runs):
+        # A fresh reader per run so every "cold" read starts with an empty cache
+        reader = CampaignReader(batched_rpc, name="benchmark")
+        before = batched_rpc.stats()["round_trips"]
+        cold_seconds += timed(1, lambda: reader.read(addresses, voter))
+        middle = batched_rpc.stats()["round_trips"]
+        warm_seconds += timed(1, lambda: reader.read(addresses, voter))
+        cold_trips += middle - before
+        warm_trips += batched_rpc.stats()["round_trips"] - middle
+    report("cold", cold_seconds, cold_trips / runs)
+    report("warm", warm_seconds, warm_trips / runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-url", default=CHAIN_RPC_URL)
+    parser.add_argument("--factory", help="CampaignFactory address to list campaigns from")
+    parser.add_argument("--campaigns", nargs="*", default=[], help="campaign addresses")
+    parser.add_argument("--voter", help="also read isVoted / isEligibleVoter for this address")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.rpc_url, args.factory, args.campaigns, args.voter, args.runs)
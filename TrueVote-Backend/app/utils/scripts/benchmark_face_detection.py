@@ -0,0 +1,130 @@
+"""
+Latency vs. match accuracy of the face detection settings on a fixture set.
+
+The reference is the previous path: face_recognition.face_encodings on the full-resolution image
+with default detection (HOG, one upsample). Each configuration of detection size, model and
+upsamples is timed from decoded image to encoding and compared with the reference:
+  found      images where a face was detected (reference: all images with a face)
+  drift      mean distance between the configuration's encoding and the reference encoding
+  agreement  image pairs whose match decision (distance < --threshold) equals the reference's
+
+Then compare_faces (detection at FACE_DETECTION_MAX_SIDE, encodings at the detected boxes) is
+timed against two face_encodings calls on full-resolution images.
+
+Needs face_recognition (dlib). Phone photos are larger than the bundled fixtures; pass a
+directory of representative uploads with --images, or --upscale to enlarge the fixtures.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_face_detection --repeat 5
+    python -m app.utils.scripts.benchmark_face_detection --images ~/faces --max-side 0 480 640 960 --upsample 0 1
+"""
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.utils.face_matching import compare_faces, detect_faces, load_face_recognition
+from app.utils.image_preprocess import decode_image
+
+FIXTURE_DIRS = [
+    os.path.join('..', 'FaceRecognition', 'liveness_api', 'test_images'),
+    os.path.join('tests', 'liveness', 'fixtures'),
+]
+
+
+def load_fixtures(directories, upscale):
+    images = {}
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                with open(os.path.join(directory, name), 'rb') as f:
+                    image = decode_image(f.read())
+                if upscale != 1:
+                    size = (image.shape[1] * upscale, image.shape[0] * upscale)
+                    image = np.asarray(Image.fromarray(image).resize(size, Image.BICUBIC))
+                images[name] = image
+    return images
+
+
+def median_seconds(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, sorted(timings)[len(timings) // 2]
+
+
+def reference_encoding(image):
+    encodings = load_face_recognition().face_encodings(image)
+    return encodings[0] if encodings else None
+
+
+def configured_encoding(image, max_side, model, upsample):
+    locations = detect_faces(image, max_side=max_side, model=model, upsample=upsample)
+    if not locations:
+        return None
+    return load_face_recognition().face_encodings(image, known_face_locations=locations[:1])[0]
+
+
+def decisions(encodings, threshold):
+    names = [name for name, encoding in encodings.items() if encoding is not None]
+    return {(a, b): bool(np.linalg.norm(encodings[a] - encodings[b]) < threshold)
+            for a, b in itertools.combinations(names, 2)}
+
+
+def run(images, max_sides, models, upsamples, repeat, threshold):
+    print(f"{len(images)} images, sizes {sorted({image.shape[:2] for image in images.values()})}")
+    reference, seconds = {}, []
+    for name, image in images.items():
+        reference[name], elapsed = median_seconds(lambda: reference_encoding(image), repeat)
+        seconds.append(elapsed)
+    reference_pairs = decisions(reference, threshold)
+    print(f"{'configuration':<28} {'ms/image':>9} {'found':>7} {'drift':>7} {'agreement':>10}")
+    print(f"{'reference (full, hog, 1)':<28} {np.mean(seconds) * 1000:>9.1f} "
+          f"{sum(e is not None for e in reference.values()):>3}/{len(images):<3} {'-':>7} {'-':>10}")
+
+    for max_side, model, upsample in itertools.product(max_sides, models, upsamples):
+        encodings, seconds = {}, []
+        for name, image in images.items():
+            encodings[name], elapsed = median_seconds(
+                lambda: configured_encoding(image, max_side, model, upsample), repeat)
+            seconds.append(elapsed)
+        drift = [np.linalg.norm(encodings[name] - reference[name]) for name in images
+                 if encodings[name] is not None and reference[name] is not None]
+        pairs = decisions(encodings, threshold)
+        agreed = sum(pairs.get(pair) == decision for pair, decision in reference_pairs.items())
+        label = f"{max_side or 'full'}, {model}, {upsample}"
+        print(f"{label:<28} {np.mean(seconds) * 1000:>9.1f} "
+              f"{sum(e is not None for e in encodings.values()):>3}/{len(images):<3} "
+              f"{np.mean(drift) if drift else float('nan'):>7.3f} {agreed:>4}/{len(reference_pairs):<5}")
+
+    face_recognition = load_face_recognition()
+    pairs = list(itertools.combinations(images.values(), 2))
+    _, old = median_seconds(lambda: [(face_recognition.face_encodings(a), face_recognition.face_encodings(b))
+                                     for a, b in pairs], repeat)
+    _, new = median_seconds(lambda: [compare_faces(a, b, threshold) for a, b in pairs], repeat)
+    print(f"compare_faces over {len(pairs)} pairs: {old / len(pairs) * 1000:.1f} ms -> "
+          f"{new / len(pairs) * 1000:.1f} ms per pair")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", nargs="+", default=FIXTURE_DIRS, help="directories of face images")
+    parser.add_argument("--upscale", type=int, default=1, help="enlarge the fixtures to phone-photo size")
+    parser.add_argument("--max-side", type=int, nargs="+", default=[0, 480, 640, 960], help="0: full resolution")
+    parser.add_argument("--model", nargs="+", default=["hog"], choices=["hog", "cnn"])
+    parser.add_argument("--upsample", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    images = load_fixtures(args.images, args.upscale)
+    run(images, args.max_side, args.model, args.upsample, args.repeat, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the duplicate-face index on synthetic encodings: recall@1 and latency of exact
+search against IVF at several nprobe values.
+
+Encodings are drawn around --people random identities (real encodings of different people
+are ~0.8 apart); the queries are fresh noisy photos of enrolled people (~0.35 from their
+enrollment, under face_recognition's 0.6), so the true nearest neighbor is known. The index is
+built in a temporary directory with batched inserts, the same path registrations take.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_face_index --faces 1000000
+    python -m app.utils.scripts.benchmark_face_index --faces 200000 --nprobe 4 8 16 32 --lists 1024
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.utils.face_encoding import FACE_ENCODING_SIZE
+from app.utils.face_index import FaceIndex
+
+# Per-coordinate spread of identities and of photos around their identity
+IDENTITY_SD = 0.056
+PHOTO_SD = 0.031
+
+
+def synthetic_faces(count, rng, chunk=100000):
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        yield rng.normal(0, IDENTITY_SD, (size, FACE_ENCODING_SIZE)).astype(np.float32)
+
+
+def timed_search(index, queries, **kwargs):
+    # One registration searches one face: time single queries, like the API does
+    seconds, rows = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, row = index.search(query, **kwargs)
+        seconds.append(time.perf_counter() - start)
+        rows.append(row[0, 0])
+    return np.array(rows), np.array(seconds)
+
+
+def report(label, rows, truth, seconds):
+    print(f"  {label:<14} recall@1 {np.mean(rows == truth):6.1%}   "
+          f"p50 {np.percentile(seconds, 50) * 1000:7.2f} ms   p99 {np.percentile(seconds, 99) * 1000:7.2f} ms   "
+          f"{len(seconds) / seconds.sum():8.0f} queries/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default 4 * sqrt(faces))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = FaceIndex(directory, mode="exact", name="benchmark")
+        truth = np.sort(rng.choice(args.faces, args.queries, replace=False))
+        enrolled = []
+        start = time.perf_counter()
+        for chunk in synthetic_faces(args.faces, rng):
+            first = index.add([f"0x{len(index) + j:040x}" for j in range(len(chunk))], chunk)
+            picked = truth[(truth >= first) & (truth < first + len(chunk))]
+            enrolled.append(chunk[picked - first])
+        print(f"Inserted {args.faces:,} faces in {time.perf_counter() - start:.1f}s")
+        queries = np.concatenate(enrolled) + rng.normal(0, PHOTO_SD, (args.queries, FACE_ENCODING_SIZE)).astype(np.float32)
+
+        print(f"{args.queries} single-face queries:")
+        rows, seconds = timed_search(index, queries)
+        report("exact", rows, truth, seconds)
+
+        start = time.perf_counter()
+        index.mode = "auto"
+        index.train(args.lists)
+        print(f"Trained {index.stats()['lists']} IVF lists in {time.perf_counter() - start:.1f}s")
+        for nprobe in args.nprobe:
+            rows, seconds = timed_search(index, queries, nprobe=nprobe)
+            report(f"ivf nprobe={nprobe}", rows, truth, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare worker startup time, peak memory and throughput of the two fraud model backends:
+"sklearn" (unpickled scikit-learn/XGBoost models) and "compact" (NumPy evaluator over
+models/fraud_model.npz). Each backend is measured in a fresh interpreter.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_fraud_backends --rows 2000
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+WORKER = r'''
+import json, resource, sys, time, warnings
+warnings.filterwarnings("ignore")
+backend, rows = sys.argv[1], int(sys.argv[2])
+
+start = time.perf_counter()
+if backend == "compact":
+    from app.utils.fraud_inference import CompactFraudModel
+    model = CompactFraudModel.load()
+    predict = model.predict_frame
+else:
+    from app.utils.model import stacked_model_predict, registry
+    registry.load_all()
+    predict = stacked_model_predict
+startup = time.perf_counter() - start
+rss_after_startup = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+import pandas as pd
+data = pd.read_csv("./app/utils/datasets/test_data.csv").drop(columns=["is_fraud"]).head(rows)
+predict(data.head(1))
+
+start = time.perf_counter()
+for i in range(len(data)):
+    predict(data.iloc[i:i + 1])
+single = time.perf_counter() - start
+
+start = time.perf_counter()
+predict(data)
+batch = time.perf_counter() - start
+
+print(json.dumps({
+    "startup_s": startup,
+    "startup_rss_mb": rss_after_startup / 1024,
+    "single_votes_per_s": len(data) / single,
+    "batch_votes_per_s": len(data) / batch,
+}))
+'''
+
+
+def measure(backend, rows):
+    output = subprocess.run([sys.executable, "-c", WORKER, backend, str(rows)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(rows):
+    results = {backend: measure(backend, rows) for backend in ["sklearn", "compact"]}
+    print(f"{'backend':>8} {'startup (s)':>12} {'peak RSS (MB)':>14} {'single (votes/s)':>17} {'batch (votes/s)':>16}")
+    for backend, r in results.items():
+        print(f"{backend:>8} {r['startup_s']:>12.3f} {r['startup_rss_mb']:>14.1f} "
+              f"{r['single_votes_per_s']:>17,.0f} {r['batch_votes_per_s']:>16,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    run(parser.parse_args().rows)
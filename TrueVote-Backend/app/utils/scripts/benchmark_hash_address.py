@@ -0,0 +1,62 @@
+"""
+Benchmark hash_address with and without the LRU cache over a skewed address stream.
+
+A small set of wallets accounts for most requests (the same voters log in, pass
+biometric auth and cast a vote), modelled as a Zipf distribution over a pool of
+unique addresses.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_hash_address --unique 20000 --calls 200000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.utils import address_hash
+
+
+def generate_eth_address(rng):
+    return "0x" + ''.join(rng.choices('0123456789abcdefABCDEF', k=40))
+
+
+def address_stream(unique, calls, zipf_a, seed):
+    rng = random.Random(seed)
+    pool = [generate_eth_address(rng) for _ in range(unique)]
+    ranks = np.random.default_rng(seed).zipf(zipf_a, size=calls)
+    return [pool[(rank - 1) % unique] for rank in ranks]
+
+
+def run(unique, calls, cache_size, zipf_a, seed):
+    stream = address_stream(unique, calls, zipf_a, seed)
+    uncached = address_hash._normalized_address.__wrapped__
+
+    start = time.perf_counter()
+    for address in stream:
+        uncached(address)
+    uncached_elapsed = time.perf_counter() - start
+
+    address_hash.configure_address_hash_cache(cache_size)
+    start = time.perf_counter()
+    for address in stream:
+        address_hash.hash_address(address)
+    cached_elapsed = time.perf_counter() - start
+
+    stats = address_hash.address_hash_cache_stats()
+    print(f"Calls: {calls:,}  unique wallets: {unique:,}  cache size: {cache_size:,}")
+    print(f"Uncached: {uncached_elapsed:.3f} s  ({calls / uncached_elapsed:,.0f} calls/s)")
+    print(f"Cached:   {cached_elapsed:.3f} s  ({calls / cached_elapsed:,.0f} calls/s)")
+    print(f"Speedup:  {uncached_elapsed / cached_elapsed:.1f}x")
+    print(f"Hit rate: {stats['hit_rate']:.1%}  evictions: {stats['evictions']:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--unique", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--cache-size", type=int, default=address_hash.ADDRESS_HASH_CACHE_SIZE)
+    parser.add_argument("--zipf", type=float, default=1.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.unique, args.calls, args.cache_size, args.zipf, args.seed)
@@ -0,0 +1,87 @@
+"""
+Per-request disk I/O and decode cost of the biometric image pipeline: the previous
+temp-file flow vs. decoding the upload once in memory.
+
+Previous flow per /biometric_auth request: write the upload to a temp file, download the
+enrolled image from S3 to a second temp file, decode both for face matching
+(face_recognition.load_image_file) and decode the upload again for the liveness model
+(keras load_img). Both libraries decode with PIL, which is what is timed here so the
+benchmark runs without face_recognition or TensorFlow installed.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_image_pipeline --repeat 20
+"""
+import argparse
+import io
+import os
+import time
+import uuid
+
+import numpy as np
+from PIL import Image
+
+from app.utils.image_preprocess import decode_image, preprocess_image_from_array
+
+TEST_IMAGES = os.path.join('..', 'FaceRecognition', 'liveness_api', 'test_images')
+
+
+def load_image_file(path):
+    with Image.open(path) as img:
+        return np.array(img.convert('RGB'))
+
+
+def keras_load_img(path):
+    with Image.open(path) as img:
+        resized = img.convert('RGB').resize((224, 224), Image.NEAREST)
+    return np.expand_dims(np.asarray(resized, dtype=np.float32) / 255.0, axis=0)
+
+
+def temp_file_pipeline(upload, enrolled):
+    written = 0
+    uploaded_path = f"uploaded_temp_{uuid.uuid4()}.png"
+    stored_path = f"stored_temp_{uuid.uuid4()}.png"
+    try:
+        for path, content in [(uploaded_path, upload), (stored_path, enrolled)]:
+            with open(path, 'wb') as f:
+                f.write(content)
+            written += len(content)
+        load_image_file(stored_path)
+        load_image_file(uploaded_path)
+        keras_load_img(uploaded_path)
+    finally:
+        for path in [uploaded_path, stored_path]:
+            if os.path.exists(path):
+                os.remove(path)
+    return written, 3
+
+
+def in_memory_pipeline(upload):
+    # The enrolled face is a stored encoding, so only the upload is decoded
+    image = decode_image(upload)
+    preprocess_image_from_array(image)
+    return 0, 1
+
+
+def timed(fn, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return result, sorted(timings)[len(timings) // 2]
+
+
+def run(repeat):
+    print(f"{'image':>28} {'temp files (ms)':>16} {'in memory (ms)':>15} {'disk bytes saved':>17} {'decodes saved':>14}")
+    for name in sorted(os.listdir(TEST_IMAGES)):
+        with open(os.path.join(TEST_IMAGES, name), 'rb') as f:
+            content = f.read()
+        (written, decodes_old), old = timed(temp_file_pipeline, repeat, content, content)
+        (_, decodes_new), new = timed(in_memory_pipeline, repeat, content)
+        print(f"{name:>28} {old * 1000:>16.1f} {new * 1000:>15.1f} {written:>17,} {decodes_old - decodes_new:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args().repeat)
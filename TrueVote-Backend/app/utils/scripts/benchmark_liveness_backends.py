@@ -0,0 +1,103 @@
+"""
+CPU latency and memory of the liveness model backends (keras, tflite, onnx). Each model
+is measured in a fresh interpreter: load time, peak RSS after loading and after
+inference, and p50/p99 latency for single images and for batches.
+
+Models default to the configured LIVENESS_*_PATH files that exist; pass --models to
+compare specific files, e.g. several TFLite quantization variants.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_liveness_backends --repeat 50 --batch-size 16
+    python -m app.utils.scripts.benchmark_liveness_backends --models keras=models/face-latest.hdf5 \\
+        tflite=models/face-float16.tflite tflite=models/face-int8.tflite onnx=models/face-latest.onnx
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app.models.model import LIVENESS_MODEL_PATHS
+from app.utils.model_registry import BASE_DIR
+
+WORKER = r'''
+import json, os, resource, sys, time, warnings
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+warnings.filterwarnings("ignore")
+import numpy as np
+from app.models.liveness_backends import load_backend
+
+backend, path, repeat, batch_size, threads = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+model = load_backend(backend, path, threads)
+load_s = time.perf_counter() - start
+rss_loaded = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+images = np.random.default_rng(0).random((batch_size, 224, 224, 3), dtype=np.float32)
+
+def latencies(batch):
+    model.predict_scores(batch)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict_scores(batch)
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+single_p50, single_p99 = latencies(images[:1])
+batch_p50, batch_p99 = latencies(images)
+
+print(json.dumps({
+    "load_s": load_s,
+    "rss_loaded_mb": (rss_loaded - rss_before) / 1024,
+    "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "single_p50_ms": single_p50 * 1000,
+    "single_p99_ms": single_p99 * 1000,
+    "batch_p50_ms": batch_p50 * 1000,
+    "batch_p99_ms": batch_p99 * 1000,
+    "batch_images_per_s": batch_size / batch_p50,
+    "size_mb": os.path.getsize(path) / 1e6,
+}))
+'''
+
+
+def measure(backend, path, repeat, batch_size, threads):
+    result = subprocess.run([sys.executable, "-c", WORKER, backend, path, str(repeat), str(batch_size), str(threads)],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def default_models():
+    return [f"{backend}={path}" for backend, path in LIVENESS_MODEL_PATHS.items() if os.path.exists(path)]
+
+
+def run(models, repeat, batch_size, threads):
+    print(f"{'model':<36} {'MB':>6} {'load s':>7} {'+RSS MB':>8} {'peak MB':>8} "
+          f"{'1 img p50/p99 ms':>17} {f'{batch_size} img p50/p99 ms':>18} {'img/s':>7}")
+    for spec in models:
+        backend, path = spec.split("=", 1)
+        label = f"{backend}:{os.path.basename(path)}"
+        r = measure(backend, path, repeat, batch_size, threads)
+        if "error" in r:
+            print(f"{label:<36} failed: {r['error']}")
+            continue
+        print(f"{label:<36} {r['size_mb']:>6.1f} {r['load_s']:>7.2f} {r['rss_loaded_mb']:>8.0f} {r['rss_peak_mb']:>8.0f} "
+              f"{r['single_p50_ms']:>8.1f}/{r['single_p99_ms']:<8.1f} {r['batch_p50_ms']:>9.1f}/{r['batch_p99_ms']:<8.1f} "
+              f"{r['batch_images_per_s']:>7.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", help="backend=path pairs (default: configured models that exist)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=1, help="intra-op threads for tflite/onnx")
+    args = parser.parse_args()
+    models = args.models or default_models()
+    if not models:
+        parser.error("no liveness models found; convert one or pass --models")
+    run(models, args.repeat, args.batch_size, args.threads)
@@ -0,0 +1,88 @@
+"""
+Throughput vs tail latency of the liveness micro-batcher.
+
+Concurrent callers submit single 224x224x3 images through app.utils.batching.MicroBatcher
+for a sweep of max batch sizes; size 1 is the unbatched baseline (one forward pass per
+request). By default the model is a stand-in with a fixed per-call overhead plus a
+per-image cost, run on a thread like Keras would be; pass --keras to use the real model
+in models/face-latest.hdf5 (requires TensorFlow).
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_liveness_batching --requests 512 --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.utils.batching import MicroBatcher
+from app.utils.image_preprocess import LIVENESS_INPUT_SIZE
+
+
+def synthetic_model(call_ms, image_ms):
+    def predict_batch(img_arrays):
+        time.sleep((call_ms + image_ms * len(img_arrays)) / 1000)
+        return [(float(img.mean()), "Live") for img in img_arrays]
+    return predict_batch
+
+
+def keras_model():
+    from app.models.model import predict_batch
+    return predict_batch
+
+
+async def run(predict_batch, batch_size, latency_ms, requests, concurrency):
+    async def run_batch(img_arrays):
+        return await asyncio.to_thread(predict_batch, img_arrays)
+
+    batcher = MicroBatcher(run_batch, max_batch_size=batch_size, max_latency=latency_ms / 1000,
+                           name=f"benchmark-{batch_size}-{latency_ms}")
+    image = np.random.default_rng(0).random((*LIVENESS_INPUT_SIZE, 3), dtype=np.float32)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.submit(image)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    stats = batcher.stats()
+    await batcher.stop()
+    return {
+        "images_per_second": requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "mean_batch": stats["batch_size"]["sum"] / stats["batch_size"]["count"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[2, 10])
+    parser.add_argument("--call-ms", type=float, default=20.0, help="synthetic per-call overhead")
+    parser.add_argument("--image-ms", type=float, default=2.0, help="synthetic per-image cost")
+    parser.add_argument("--keras", action="store_true", help="use the real Keras liveness model")
+    args = parser.parse_args()
+
+    predict_batch = keras_model() if args.keras else synthetic_model(args.call_ms, args.image_ms)
+    # Warm up so model loading / graph tracing is not measured
+    predict_batch(np.zeros((1, *LIVENESS_INPUT_SIZE, 3), dtype=np.float32))
+
+    print(f"{'batch':>5} {'wait ms':>8} {'img/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for batch_size in args.batch_sizes:
+        for latency_ms in (args.latency_ms if batch_size > 1 else [0]):
+            result = asyncio.run(run(predict_batch, batch_size, latency_ms, args.requests, args.concurrency))
+            print(f"{batch_size:>5} {latency_ms:>8g} {result['images_per_second']:>9.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['mean_batch']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Liveness preprocessing: the whole upload resized to 224x224 (previous path) vs. only the face
+region found by face_recognition, written into a preallocated float32 buffer.
+
+Times both paths per fixture image and for a batch of --batch images. When the liveness model
+is available, also prints the score of every fixture on each input, with the expected label
+taken from the file name (live_* / spoof_*), so the effect of the crop on spoof detection can be
+checked before switching LIVENESS_CROP.
+
+Needs face_recognition for the face boxes. --upscale enlarges the fixtures to phone-photo size.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_liveness_crop --upscale 10
+    python -m app.utils.scripts.benchmark_liveness_crop --images ~/liveness_samples --margin 0.4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.utils.face_matching import detect_faces
+from app.utils.image_preprocess import (
+    decode_image, preprocess_face, preprocess_faces, preprocess_image_from_array, LIVENESS_FACE_MARGIN,
+)
+from app.utils.scripts.convert_liveness_model import FIXTURES_DIR
+
+
+def load(directory, upscale):
+    images = {}
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                image = decode_image(f.read())
+            if upscale != 1:
+                image = np.asarray(Image.fromarray(image).resize(
+                    (image.shape[1] * upscale, image.shape[0] * upscale), Image.BICUBIC))
+            images[name] = image
+    return images
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def scores(batch):
+    from app.models import model
+    if not os.path.exists(model.model_path):
+        return None
+    return [prediction for prediction, _ in model.predict_batch(batch)]
+
+
+def run(images, margin, batch_size, repeat):
+    locations = {}
+    for name, image in images.items():
+        found = detect_faces(image)
+        locations[name] = found[0] if found else None
+
+    out = np.empty((224, 224, 3), dtype=np.float32)
+    print(f"{'image':<28} {'size':>12} {'face':>5} {'frame (ms)':>11} {'face crop (ms)':>15}")
+    for name, image in images.items():
+        frame = median_ms(lambda: preprocess_image_from_array(image), repeat)
+        crop = median_ms(lambda: preprocess_face(image, locations[name], out, margin), repeat)
+        print(f"{name:<28} {'x'.join(map(str, image.shape[:2])):>12} {'yes' if locations[name] else 'no':>5} "
+              f"{frame:>11.2f} {crop:>15.2f}")
+
+    names = [name for name in images for _ in range(batch_size // len(images) + 1)][:batch_size]
+    buffer = np.empty((batch_size, 224, 224, 3), dtype=np.float32)
+    frame = median_ms(lambda: np.concatenate([preprocess_image_from_array(images[n]) for n in names]), repeat)
+    crop = median_ms(lambda: preprocess_faces([images[n] for n in names], [locations[n] for n in names], buffer),
+                     repeat)
+    print(f"batch of {batch_size}: frame {frame:.1f} ms, face crops into a preallocated buffer {crop:.1f} ms")
+
+    frames = np.concatenate([preprocess_image_from_array(image) for image in images.values()])
+    crops = preprocess_faces(list(images.values()), [locations[name] for name in images])
+    frame_scores, crop_scores = scores(frames), scores(crops)
+    if frame_scores is None:
+        print("Liveness model not found; skipping the score comparison")
+        return
+    print(f"{'image':<28} {'expected':>9} {'frame score':>12} {'crop score':>11}")
+    for name, frame_score, crop_score in zip(images, frame_scores, crop_scores):
+        expected = "Live" if name.lower().startswith("live") else "Spoof" if name.lower().startswith("spoof") else "?"
+        print(f"{name:<28} {expected:>9} {frame_score:>12.3f} {crop_score:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=FIXTURES_DIR)
+    parser.add_argument("--upscale", type=int, default=1)
+    parser.add_argument("--margin", type=float, default=LIVENESS_FACE_MARGIN)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    run(load(args.images, args.upscale), args.margin, args.batch, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Micro-benchmark: per-column DataFrame preprocessing vs. the vectorized NumPy path.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_preprocess --rows 1 100 2000 --repeat 20
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.model import pre_process_array, pre_process_data_dataframe
+
+
+def best_of(fn, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(row_counts, repeat):
+    rows = pd.read_csv('./app/utils/datasets/test_data.csv').drop(columns=['is_fraud'])
+
+    print(f"{'rows':>8} {'dataframe (ms)':>16} {'numpy (ms)':>12} {'speedup':>9} {'identical':>10}")
+    for n in row_counts:
+        data = pd.concat([rows] * (n // len(rows) + 1), ignore_index=True).head(n)
+        # hash_address prints per call; silence it for both paths
+        with contextlib.redirect_stdout(io.StringIO()):
+            identical = np.array_equal(pre_process_array(data), pre_process_data_dataframe(data).to_numpy())
+            legacy = best_of(pre_process_data_dataframe, data, repeat)
+            vectorized = best_of(pre_process_array, data, repeat)
+        print(f"{n:>8} {legacy * 1000:>16.3f} {vectorized * 1000:>12.3f} {legacy / vectorized:>8.1f}x {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
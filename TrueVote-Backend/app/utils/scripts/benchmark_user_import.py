@@ -0,0 +1,99 @@
+"""
+Rows/sec of user enrollment strategies against a fresh database:
+
+- per-row (two checks): SELECT by wallet, SELECT by email, INSERT, COMMIT per user (old register_user)
+- per-row (one check):  one combined SELECT, INSERT, COMMIT per user (current register_user)
+- bulk:                 UserImporter, one SELECT and one executemany INSERT per chunk
+
+Uses a temporary SQLite file unless --database-url points at a scratch database (the
+users table is created there and must start empty).
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_user_import --users 20000 --chunk-sizes 500 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.user import User
+from app.utils.user_import import UserImporter, conflict_query, registration_conflict
+
+
+def make_rows(count, offset=0):
+    return [{
+        "row": i + 1,
+        "wallet_address": f"0x{i + offset:040x}",
+        "first_name": "Voter",
+        "last_name": f"Number{i}",
+        "email": f"voter{i + offset}@example.com",
+        "image": f"https://truevote.s3.amazonaws.com/biometrics/{i + offset}.png",
+    } for i in range(count)]
+
+
+def per_row_two_checks(db, rows):
+    for row in rows:
+        if db.query(User).filter(User.wallet_address == row["wallet_address"]).first():
+            continue
+        if db.query(User).filter(User.email == row["email"]).first():
+            continue
+        db.add(User(wallet_address=row["wallet_address"], first_name=row["first_name"], last_name=row["last_name"],
+                    email=row["email"], biometric_image_url=row["image"]))
+        db.commit()
+
+
+def per_row_one_check(db, rows):
+    for row in rows:
+        existing = db.execute(conflict_query([row["wallet_address"]], [row["email"]]).limit(2)).all()
+        if registration_conflict(existing, row["wallet_address"], row["email"]):
+            continue
+        db.add(User(wallet_address=row["wallet_address"], first_name=row["first_name"], last_name=row["last_name"],
+                    email=row["email"], biometric_image_url=row["image"]))
+        db.commit()
+
+
+def timed(label, session_factory, fn, rows):
+    db = session_factory()
+    try:
+        db.execute(delete(User))
+        db.commit()
+        start = time.perf_counter()
+        fn(db, rows)
+        elapsed = time.perf_counter() - start
+        inserted = db.query(User).count()
+    finally:
+        db.close()
+    print(f"{label:<24} {len(rows):>8} rows {elapsed:>8.2f}s {len(rows) / elapsed:>10,.0f} rows/s  ({inserted} inserted)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--per-row-users", type=int, default=2000, help="per-row strategies are slow; use fewer rows")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'users.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+
+        per_row = make_rows(args.per_row_users)
+        timed("per-row (two checks)", session_factory, per_row_two_checks, per_row)
+        timed("per-row (one check)", session_factory, per_row_one_check, per_row)
+
+        rows = make_rows(args.users)
+        for chunk_size in args.chunk_sizes:
+            timed(f"bulk (chunk {chunk_size})", session_factory,
+                  lambda db, rows: UserImporter(db, chunk_size).import_rows(rows), rows)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Throughput benchmark: /validate_vote/ called once per vote vs. /validate_votes/ called once per batch.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.benchmark_validate_votes --votes 1000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from app.routes.detect_fraud import validate_vote, validate_votes
+from app.schemas.fraud_detection import ElectionFraudDetectionRequest
+
+
+def load_requests(n):
+    rows = pd.read_csv('./app/utils/datasets/test_data.csv').drop(columns=['is_fraud'])
+    rows = pd.concat([rows] * (n // len(rows) + 1), ignore_index=True).head(n)
+    return [ElectionFraudDetectionRequest(**row) for row in rows.to_dict(orient='records')]
+
+
+def run(n):
+    requests = load_requests(n)
+
+    # Route handlers print on every call; keep the console readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        single = [validate_vote(request) for request in requests]
+        single_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = validate_votes(requests)
+        batch_elapsed = time.perf_counter() - start
+
+    mismatches = sum(a.is_fraud != b.is_fraud for a, b in zip(single, batch))
+
+    print(f"Votes scored:        {n}")
+    print(f"Single  (/validate_vote/):  {single_elapsed:.3f} s  ({n / single_elapsed:,.0f} votes/s)")
+    print(f"Batch   (/validate_votes/): {batch_elapsed:.3f} s  ({n / batch_elapsed:,.0f} votes/s)")
+    print(f"Speedup:             {single_elapsed / batch_elapsed:.1f}x")
+    print(f"Mismatched results:  {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--votes", type=int, default=1000)
+    run(parser.parse_args().votes)
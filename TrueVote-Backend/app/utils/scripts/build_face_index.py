@@ -0,0 +1,66 @@
+"""
+Build the duplicate-face index from the face encodings already stored in users.
+
+New registrations (and logins that backfill a missing encoding) add themselves to the index;
+run this once to index the users enrolled before it existed. Pass --rebuild to start over
+from an empty directory.
+
+Registrations never train the index. This script builds the IVF lists once the index holds
+FACE_INDEX_IVF_MIN faces (FACE_INDEX_MODE=auto), so schedule it (e.g. nightly) on one host;
+--train (re)builds them regardless of size. The API keeps registering while it trains.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.build_face_index
+    python -m app.utils.scripts.build_face_index --rebuild --train --lists 1024
+"""
+import argparse
+import shutil
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from app.models.user import User
+from app.utils.database import SessionLocal
+from app.utils.face_encoding import encoding_from_bytes
+from app.utils.face_index import FaceIndex, FACE_INDEX_DIR
+
+
+def build(index, chunk_size):
+    indexed = index.wallet_addresses()
+    added = 0
+    with SessionLocal() as db:
+        query = (select(User.wallet_address, User.face_encoding)
+                 .where(User.face_encoding.is_not(None))
+                 .execution_options(yield_per=chunk_size))
+        for rows in db.execute(query).partitions():
+            rows = [(wallet, data) for wallet, data in rows if wallet not in indexed]
+            if rows:
+                index.add([wallet for wallet, _ in rows], np.stack([encoding_from_bytes(data) for _, data in rows]))
+                added += len(rows)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default=FACE_INDEX_DIR)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="users read and inserted per batch")
+    parser.add_argument("--rebuild", action="store_true", help="delete the existing index first")
+    parser.add_argument("--train", action="store_true", help="(re)build the IVF lists after inserting")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default 4 * sqrt(faces))")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        shutil.rmtree(args.directory, ignore_errors=True)
+    index = FaceIndex(args.directory)
+    start = time.perf_counter()
+    added = build(index, args.chunk_size)
+    print(f"Indexed {added} faces in {time.perf_counter() - start:.1f}s ({len(index)} in {args.directory})")
+    if (args.train and len(index)) or index.needs_training():
+        start = time.perf_counter()
+        index.train(args.lists)
+        print(f"Trained {index.stats()['lists']} IVF lists in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Convert the Keras liveness model (models/face-latest.hdf5) for the faster inference
+backends selected with LIVENESS_BACKEND, then report score parity on a folder of images.
+
+TFLite quantization modes: none, dynamic (int8 weights), float16 (float16 weights) and
+int8 (full integer; needs --calibration-dir with representative face images).
+ONNX modes: none, or dynamic (int8 weights via onnxruntime.quantization).
+
+Requires tensorflow; ONNX export also needs tf2onnx and onnxruntime. Run from the
+TrueVote-Backend directory:
+    python -m app.utils.scripts.convert_liveness_model --format tflite --quantization float16
+    python -m app.utils.scripts.convert_liveness_model --format tflite --quantization int8 --calibration-dir data/faces
+    python -m app.utils.scripts.convert_liveness_model --format onnx
+"""
+import argparse
+import os
+
+import numpy as np
+
+from app.models.liveness_backends import load_backend
+from app.models.model import LIVENESS_MODEL_PATHS
+from app.utils.image_preprocess import decode_image, preprocess_image_from_array
+from app.utils.model_registry import BASE_DIR
+
+FIXTURES_DIR = os.path.join(BASE_DIR, "tests", "liveness", "fixtures")
+QUANTIZATION_MODES = {
+    "tflite": ["none", "dynamic", "float16", "int8"],
+    "onnx": ["none", "dynamic"],
+}
+
+
+def load_images(directory: str, limit: int = None) -> np.ndarray:
+    """Preprocessed (N, 224, 224, 3) float32 batch from every image file in a directory."""
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith((".jpg", ".jpeg", ".png")))[:limit]
+    images = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            images.append(preprocess_image_from_array(decode_image(f.read()))[0])
+    if not images:
+        raise ValueError(f"No images found in {directory}")
+    return np.stack(images)
+
+
+def convert_tflite(keras_path: str, output: str, quantization: str, calibration: np.ndarray = None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(keras_path))
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        def representative_dataset():
+            for image in calibration:
+                yield [image[np.newaxis]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    with open(output, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(keras_path: str, output: str, quantization: str):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(keras_path)
+    # Dynamic batch dimension so the micro-batcher can send any batch size
+    signature = (tf.TensorSpec((None, 224, 224, 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=13, output_path=output)
+
+    if quantization == "dynamic":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(output, output, weight_type=QuantType.QInt8)
+
+
+def parity(keras_path: str, fmt: str, path: str, images: np.ndarray) -> dict:
+    reference = load_backend("keras", keras_path).predict_scores(images)
+    scores = load_backend(fmt, path).predict_scores(images)
+    return {
+        "images": len(images),
+        "max_abs_diff": float(np.max(np.abs(reference - scores))),
+        "label_agreement": float(np.mean((reference > 0.5) == (scores > 0.5))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=sorted(QUANTIZATION_MODES), default="tflite")
+    parser.add_argument("--quantization", default="none")
+    parser.add_argument("--keras-model", default=LIVENESS_MODEL_PATHS["keras"])
+    parser.add_argument("--output", help="defaults to LIVENESS_TFLITE_PATH / LIVENESS_ONNX_PATH")
+    parser.add_argument("--calibration-dir", help="representative images for int8 quantization")
+    parser.add_argument("--calibration-limit", type=int, default=500)
+    parser.add_argument("--parity-dir", default=FIXTURES_DIR, help="images used to compare against Keras")
+    args = parser.parse_args()
+
+    if args.quantization not in QUANTIZATION_MODES[args.format]:
+        parser.error(f"--quantization for {args.format} must be one of {QUANTIZATION_MODES[args.format]}")
+    if args.quantization == "int8" and not args.calibration_dir:
+        parser.error("int8 quantization needs --calibration-dir")
+    output = args.output or LIVENESS_MODEL_PATHS[args.format]
+
+    if args.format == "tflite":
+        calibration = load_images(args.calibration_dir, args.calibration_limit) if args.calibration_dir else None
+        convert_tflite(args.keras_model, output, args.quantization, calibration)
+    else:
+        convert_onnx(args.keras_model, output, args.quantization)
+    print(f"Wrote {output} ({os.path.getsize(output) / 1e6:.1f} MB, "
+          f"Keras model {os.path.getsize(args.keras_model) / 1e6:.1f} MB)")
+
+    result = parity(args.keras_model, args.format, output, load_images(args.parity_dir))
+    print(f"Parity on {result['images']} images: max |score diff| {result['max_abs_diff']:.4f}, "
+          f"label agreement {result['label_agreement']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Export the stacked fraud model (scalers, isolation forest, logistic regression and the
+XGBoost meta model) to a flat .npz archive evaluated by app.utils.fraud_inference.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.export_fraud_model --output models/fraud_model.npz
+"""
+import argparse
+import json
+
+import numpy as np
+from sklearn.ensemble._iforest import _average_path_length
+
+from app.utils.fraud_inference import COMPACT_MODEL_PATH
+from app.utils.model import FEATURE_COLUMNS
+from app.utils.model_registry import registry
+
+
+def flatten_trees(trees):
+    """
+    Concatenate per-tree node arrays into one set of flat arrays.
+    `trees` yields dicts with left, right, feature, threshold and value arrays
+    indexed locally; child indices are shifted by each tree's node offset.
+    """
+    roots, left, right, feature, threshold, value = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        is_leaf = tree['left'] == -1
+        roots.append(offset)
+        left.append(np.where(is_leaf, -1, tree['left'] + offset))
+        right.append(np.where(is_leaf, -1, tree['right'] + offset))
+        # Leaves never read their feature; point them at column 0 so indexing stays valid
+        feature.append(np.where(is_leaf, 0, tree['feature']))
+        threshold.append(tree['threshold'])
+        value.append(tree['value'])
+        offset += len(tree['left'])
+    return (
+        np.asarray(roots, dtype=np.int32),
+        np.concatenate(left).astype(np.int32),
+        np.concatenate(right).astype(np.int32),
+        np.concatenate(feature).astype(np.int32),
+        np.concatenate(threshold),
+        np.concatenate(value),
+    )
+
+
+def export_isolation_forest(iso_forest):
+    def trees():
+        for estimator, features in zip(iso_forest.estimators_, iso_forest.estimators_features_):
+            tree = estimator.tree_
+            # Same per-node path length scikit-learn adds when a sample lands in that leaf
+            leaf_depth = tree.compute_node_depths() + _average_path_length(tree.n_node_samples) - 1.0
+            yield {
+                'left': tree.children_left,
+                'right': tree.children_right,
+                # Map the tree's feature subset back to full-matrix column indices
+                'feature': np.asarray(features)[np.maximum(tree.feature, 0)],
+                'threshold': tree.threshold.astype(np.float64),
+                'value': leaf_depth.astype(np.float64),
+            }
+
+    roots, left, right, feature, threshold, leaf_depth = flatten_trees(trees())
+    max_samples = getattr(iso_forest, '_max_samples', iso_forest.max_samples_)
+    return {
+        'iso_roots': roots,
+        'iso_left': left,
+        'iso_right': right,
+        'iso_feature': feature,
+        'iso_threshold': threshold,
+        'iso_leaf_depth': leaf_depth,
+        'iso_denominator': np.float64(len(iso_forest.estimators_) * _average_path_length([max_samples])[0]),
+        'iso_offset': np.float64(iso_forest.offset_),
+    }
+
+
+def parse_base_score(value):
+    # Newer XGBoost versions store a vector such as "[5E-1]"
+    return float(str(value).strip('[]').split(',')[0])
+
+
+def export_xgboost(meta_model):
+    booster = meta_model.get_booster()
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    # Meta features are always finite, so missing-value default directions are not exported
+    def trees():
+        for tree in learner['gradient_booster']['model']['trees']:
+            left = np.asarray(tree['left_children'], dtype=np.int64)
+            split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            yield {
+                'left': left,
+                'right': np.asarray(tree['right_children'], dtype=np.int64),
+                'feature': np.asarray(tree['split_indices'], dtype=np.int64),
+                'threshold': split_conditions,
+                # Leaf outputs are stored in split_conditions for leaf nodes
+                'value': np.where(left == -1, split_conditions, np.float32(0)).astype(np.float32),
+            }
+
+    roots, left, right, feature, threshold, value = flatten_trees(trees())
+    base_score = parse_base_score(learner['learner_model_param']['base_score'])
+    return {
+        'xgb_roots': roots,
+        'xgb_left': left,
+        'xgb_right': right,
+        'xgb_feature': feature,
+        'xgb_threshold': threshold.astype(np.float32),
+        'xgb_value': value.astype(np.float32),
+        'xgb_base_margin': np.float32(np.log(base_score / (1.0 - base_score))),
+        'classes': np.asarray(meta_model.classes_),
+    }
+
+
+def export(output=COMPACT_MODEL_PATH):
+    robust_scaler = registry.get('robust_scaler')
+    feature_scaler = registry.get('feature_scaler')
+    logistic_regression = registry.get('logistic_regression')
+
+    arrays = {
+        'feature_columns': np.asarray(FEATURE_COLUMNS),
+        'robust_center': np.asarray(robust_scaler.center_ if robust_scaler.with_centering else [0.0], dtype=np.float64),
+        'robust_scale': np.asarray(robust_scaler.scale_ if robust_scaler.with_scaling else [1.0], dtype=np.float64),
+        'lr_coef': np.asarray(logistic_regression.coef_, dtype=np.float64),
+        'lr_intercept': np.asarray(logistic_regression.intercept_, dtype=np.float64),
+        'meta_mean': np.asarray(feature_scaler.mean_ if feature_scaler.with_mean else [0.0, 0.0], dtype=np.float64),
+        'meta_scale': np.asarray(feature_scaler.scale_ if feature_scaler.with_std else [1.0, 1.0], dtype=np.float64),
+    }
+    arrays.update(export_isolation_forest(registry.get('iso_forest')))
+    arrays.update(export_xgboost(registry.get('meta_model')))
+
+    np.savez_compressed(output, **arrays)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=COMPACT_MODEL_PATH)
+    path = export(parser.parse_args().output)
+    print(f"Exported compact fraud model to {path}")
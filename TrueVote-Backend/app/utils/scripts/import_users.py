@@ -0,0 +1,57 @@
+"""
+Bulk-register voters from a CSV (with header) or JSONL file into the users table.
+
+Columns: wallet_address, first_name, last_name, email, image. `image` is an S3 URL of an
+uploaded enrollment photo, or a local file path when --upload is given (the file is
+uploaded to S3_BUCKET_NAME like /api/users/register does). Face encodings are computed on
+each user's first biometric login. Rows that fail validation or clash with existing users
+are skipped and listed at the end (or written to --failures as CSV).
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.import_users voters.csv --chunk-size 1000
+    python -m app.utils.scripts.import_users voters.jsonl --upload --failures failed_rows.csv
+"""
+import argparse
+import csv
+
+from app.utils.database import SessionLocal
+from app.utils.user_import import import_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help=".csv or .jsonl file")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per uniqueness query and INSERT")
+    parser.add_argument("--upload", action="store_true", help="upload local image files to S3")
+    parser.add_argument("--upload-workers", type=int, default=16)
+    parser.add_argument("--failures", help="write failed rows to this CSV file")
+    args = parser.parse_args()
+
+    uploader = None
+    if args.upload:
+        from app.controllers.user_controller import store_biometric_image
+        uploader = store_biometric_image
+
+    db = SessionLocal()
+    try:
+        report = import_users(db, args.path, args.chunk_size, uploader, args.upload_workers)
+    finally:
+        db.close()
+
+    print(f"{report['rows']} rows: {report['inserted']} inserted, {report['failed']} failed "
+          f"in {report['seconds']:.2f}s ({report['rows_per_second']:,.0f} rows/s)")
+    if args.failures:
+        with open(args.failures, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["row", "wallet_address", "error"])
+            writer.writeheader()
+            writer.writerows(report["failures"])
+        print(f"Failed rows written to {args.failures}")
+    else:
+        for failure in report["failures"][:50]:
+            print(f"  row {failure['row']} ({failure['wallet_address']}): {failure['error']}")
+        if report["failed"] > 50:
+            print(f"  ... {report['failed'] - 50} more (use --failures to save them all)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Offline macro load test of the voter-facing API, with a JSON report for regression tracking.
+
+Drives the real FastAPI app in-process (httpx ASGI transport) with asyncio clients, one
+scenario at a time:
+  validate_vote    POST /validate_vote/ with random features (stacked fraud model)
+  login            POST /api/users/login for registered wallets (database + user cache)
+  biometric_auth   POST /api/users/biometric_auth with the enrolled face (face matching + liveness)
+  verify_captcha   POST /verify-captcha with unique tokens
+
+Nothing leaves the machine: MySQL is replaced by a SQLite file, S3 by moto, and the reCAPTCHA
+endpoint by a local stub. The liveness model is used when its file is present, otherwise a
+constant-score stand-in (noted in the report). Users are registered through /api/users/register
+with the liveness fixture images before the scenarios run.
+
+The report holds per-scenario throughput, latency percentiles and status codes plus the
+environment it ran in. With --baseline, p50 and p99 latencies are compared against an earlier
+report and the exit status is 1 when any scenario regressed by more than --max-regression.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.load_test_api --requests 500 --concurrency 32 --report load-report.json
+    python -m app.utils.scripts.load_test_api --scenarios login validate_vote --baseline load-report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+SCENARIOS = ("validate_vote", "login", "biometric_auth", "verify_captcha")
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "tests", "liveness", "fixtures")
+# Enrolled and presented at login; the liveness fixture with a face detectable at every size
+FACE_IMAGE = "live_1.jpg"
+BUCKET = "truevote-loadtest"
+
+
+def configure_offline_environment(directory):
+    """Point every external dependency at a local stand-in; must run before the app is imported."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'users.db')}",
+        "DB_ASYNC": "0",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_REGION": "us-east-1",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "S3_BUCKET_NAME": BUCKET,
+        "RECAPTCHA_SECRET_KEY": "testing",
+        "FACE_INDEX_DIR": os.path.join(directory, "face_index"),
+        "USER_CACHE_BACKEND": "memory",
+        "STARTUP_WARMUP": "",
+    })
+
+
+def summarize(latencies, statuses, seconds):
+    latencies = np.asarray(latencies) * 1000
+    counts = {}
+    for status in statuses:
+        counts[str(status)] = counts.get(str(status), 0) + 1
+    return {
+        "requests": len(latencies),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 1) if seconds else None,
+        "errors": sum(1 for status in statuses if not 200 <= status < 300),
+        "status_codes": counts,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2),
+            "p99": round(float(np.percentile(latencies, 99)), 2),
+            "max": round(float(latencies.max()), 2),
+        },
+    }
+
+
+def compare_reports(report, baseline, max_regression):
+    """Scenarios whose p50 or p99 latency grew by more than `max_regression` (a fraction) over the baseline."""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for percentile in ("p50", "p99"):
+            before, after = previous["latency_ms"][percentile], result["latency_ms"][percentile]
+            if before and after > before * (1 + max_regression):
+                regressions.append({"scenario": name, "percentile": percentile, "baseline_ms": before,
+                                    "current_ms": after, "change": round(after / before - 1, 3)})
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def vote_payload(rng):
+    return {
+        "Address": "0x" + "".join(rng.choices("0123456789abcdef", k=40)),
+        "Time Diff between first and last (Mins)": rng.uniform(0, 60),
+        "Face Attempts": rng.randint(1, 5),
+        "Detected As a Robot At Least Once": rng.randint(0, 1),
+        "Face Match Percentage": rng.uniform(0, 100),
+        "Liveness Score of The Face": rng.uniform(0, 100),
+    }
+
+
+def scenario_requests(name, wallets, face, rng):
+    """Keyword arguments for client.request of one request of the scenario."""
+    if name == "validate_vote":
+        return {"method": "POST", "url": "/validate_vote/", "json": vote_payload(rng)}
+    if name == "login":
+        return {"method": "POST", "url": "/api/users/login", "json": {"address": rng.choice(wallets)}}
+    if name == "biometric_auth":
+        return {"method": "POST", "url": "/api/users/biometric_auth", "data": {"wallet_address": rng.choice(wallets)},
+                "files": {"biometric_image": (FACE_IMAGE, face, "image/jpeg")}}
+    return {"method": "POST", "url": "/verify-captcha", "json": {"token": uuid.uuid4().hex}}
+
+
+async def run_scenario(client, name, total, concurrency, wallets, face, seed):
+    rng = random.Random(seed)
+    requests = [scenario_requests(name, wallets, face, rng) for _ in range(total)]
+    latencies, statuses = [], []
+    pending = iter(requests)
+
+    async def worker():
+        for request in pending:
+            start = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def register_users(client, count, face):
+    wallets = []
+    for i in range(count):
+        wallet = f"0x{i:040x}"
+        response = await client.post("/api/users/register", data={
+            "wallet_address": wallet, "first_name": "Load", "last_name": f"Test{i}", "email": f"voter{i}@example.com",
+        }, files={"biometric_image": (FACE_IMAGE, face, "image/jpeg")})
+        if response.status_code != 200:
+            raise RuntimeError(f"Registering {wallet} failed: {response.status_code} {response.text}")
+        wallets.append(wallet)
+    return wallets
+
+
+def stub_recaptcha():
+    import httpx
+    from app.utils.recaptcha import RecaptchaVerifier
+
+    async def siteverify(request):
+        return httpx.Response(200, json={"success": True, "score": 0.9})
+    return RecaptchaVerifier(url="http://recaptcha.stub/siteverify", secret="testing",
+                             transport=httpx.MockTransport(siteverify), name="loadtest")
+
+
+async def stub_liveness(img_arrays):
+    return [(0.99, "Live") for _ in img_arrays]
+
+
+async def run(scenarios, total, concurrency, users, seed, warmup):
+    import boto3
+    import httpx
+    from app.main import app
+    from app.models import model
+    from app.models.base import Base
+    from app.utils.database import engine
+    from app.routes import verify_captcha
+    from app.utils.liveness import liveness_batcher, aclose_liveness_client, LIVENESS_API_URL
+
+    environment = {"liveness": "remote" if LIVENESS_API_URL else model.LIVENESS_BACKEND}
+    if not LIVENESS_API_URL and not os.path.exists(model.model_path):
+        liveness_batcher.predict_batch = stub_liveness
+        environment["liveness"] = "stub (model file not found)"
+    verify_captcha.recaptcha_verifier = stub_recaptcha()
+    Base.metadata.create_all(engine)
+    boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+
+    with open(os.path.join(FIXTURES_DIR, FACE_IMAGE), "rb") as f:
+        face = f.read()
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+        wallets = await register_users(client, users, face)
+        for name in scenarios:
+            # Untimed requests first: model loading and worker start-up are not part of the steady state
+            await run_scenario(client, name, warmup, min(concurrency, warmup), wallets, face, seed)
+            results[name] = await run_scenario(client, name, total, concurrency, wallets, face, seed)
+            print(f"{name:<16} {results[name]['requests_per_second']:>8} req/s   "
+                  f"p50 {results[name]['latency_ms']['p50']:>8} ms   p99 {results[name]['latency_ms']['p99']:>8} ms   "
+                  f"errors {results[name]['errors']}")
+    await liveness_batcher.stop()
+    await aclose_liveness_client()
+    await verify_captcha.recaptcha_verifier.aclose()
+    return results, environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per scenario")
+    parser.add_argument("--users", type=int, default=20, help="registered wallets to log in with")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed latency growth, as a fraction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="truevote-loadtest-") as directory:
+        configure_offline_environment(directory)
+        from moto import mock_aws
+        from app.utils.executors import shutdown_pools, pools_stats, CPU_POOL_KIND, CPU_POOL_SIZE
+
+        with mock_aws():
+            results, environment = asyncio.run(run(args.scenarios, args.requests, args.concurrency, args.users,
+                                                   args.seed, args.warmup))
+        pools = pools_stats()
+        shutdown_pools()
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "users": args.users,
+                   "seed": args.seed, "cpu_pool": f"{CPU_POOL_KIND} x{CPU_POOL_SIZE}", **environment},
+        "scenarios": results,
+        "pools": pools,
+    }
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} {regression['percentile']}: {regression['baseline_ms']} ms -> "
+                  f"{regression['current_ms']} ms ({regression['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No scenario regressed by more than {args.max_regression:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Concurrent-request load test for the executor layer.
+
+Fires many concurrent requests at an in-process FastAPI app (httpx ASGI transport, no
+network) with two otherwise identical async handlers that perform a simulated blocking
+call: one calls it directly on the event loop, the other dispatches it to the I/O pool.
+It then drives the real /verify-captcha route against a local async stub of the
+verification endpoint with the same latency (unique tokens, so nothing is deduplicated).
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.load_test_executors --requests 200 --concurrency 50 --latency-ms 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.routes import verify_captcha
+from app.utils.executors import io_pool, pools_stats
+from app.utils.recaptcha import RecaptchaVerifier
+
+
+def make_blocking_call(latency):
+    def blocking_call(*args, **kwargs):
+        time.sleep(latency)
+        return StubResponse()
+    return blocking_call
+
+
+class StubResponse:
+    def json(self):
+        return {"success": True}
+
+
+def stub_verifier(latency):
+    async def siteverify(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"success": True})
+    return RecaptchaVerifier(url="http://recaptcha.stub/siteverify", secret="test",
+                             transport=httpx.MockTransport(siteverify), name="loadtest")
+
+
+def build_app(latency):
+    app = FastAPI()
+    blocking_call = make_blocking_call(latency)
+
+    @app.get("/blocking")
+    async def blocking():
+        blocking_call()
+        return {"ok": True}
+
+    @app.get("/offloaded")
+    async def offloaded():
+        await io_pool.run(blocking_call)
+        return {"ok": True}
+
+    app.include_router(verify_captcha.router)
+    return app
+
+
+async def drive(client, method, path, total, concurrency, make_json=None):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            response = await client.request(method, path, json=make_json(i) if make_json else None)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    return time.perf_counter() - start
+
+
+async def run(total, concurrency, latency):
+    verify_captcha.recaptcha_verifier = stub_verifier(latency)
+    transport = httpx.ASGITransport(app=build_app(latency))
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        results = {
+            "GET /blocking (on event loop)": await drive(client, "GET", "/blocking", total, concurrency),
+            "GET /offloaded (I/O pool)": await drive(client, "GET", "/offloaded", total, concurrency),
+            "POST /verify-captcha (async client)": await drive(client, "POST", "/verify-captcha", total, concurrency,
+                                                               make_json=lambda i: {"token": f"token-{i}"}),
+        }
+    await verify_captcha.recaptcha_verifier.aclose()
+
+    print(f"{total} requests, concurrency {concurrency}, simulated blocking latency {latency * 1000:.0f} ms")
+    for name, elapsed in results.items():
+        print(f"{name:>36}: {elapsed:7.2f} s  {total / elapsed:8.1f} req/s")
+    io = pools_stats()["io"]
+    verify = verify_captcha.recaptcha_verifier.stats()["verify_seconds"]
+    print(f"reCAPTCHA verify p50/p99: {verify['p50']}/{verify['p99']} s")
+    print(f"I/O pool wait p50/p99: {io['wait_seconds']['p50']}/{io['wait_seconds']['p99']} s, rejected: {io['rejected']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.latency_ms / 1000))
+    io_pool.shutdown()
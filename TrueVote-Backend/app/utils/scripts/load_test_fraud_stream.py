@@ -0,0 +1,106 @@
+"""
+Load test for the streaming fraud scorer with synthetic voters and votes.
+
+Creates --voters voters with random verification signals and --votes vote events in a scratch
+SQLite database, then streams the votes through the scorer either from vote_events (the indexer
+path, --source indexer) or through the in-process queue (--source queue), scoring with the real
+fraud model. Reports the throughput of each stage, the micro-batch sizes, how long producers
+were held back by a full queue, and the number of flagged votes.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.load_test_fraud_stream --votes 100000 --batch-size 256
+    python -m app.utils.scripts.load_test_fraud_stream --source queue --queue-size 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.chain import VoteEvent
+from app.models.fraud import VoterSignals
+from app.utils.executors import shutdown_pools
+from app.utils.fraud_stream import create_fraud_stream
+
+
+def populate(session_factory, voters, votes):
+    now = datetime.utcnow()
+    addresses = [f"0x{random.getrandbits(160):040x}" for _ in range(voters)]
+    with session_factory() as db:
+        # A tenth of the votes come from wallets that never went through the checks
+        db.execute(insert(VoterSignals), [{
+            "wallet_address": address,
+            "first_seen_at": now,
+            "last_seen_at": now + timedelta(minutes=random.uniform(1, 60)),
+            "face_attempts": random.randint(1, 5),
+            "robot_detections": int(random.random() < 0.05),
+            "face_match_percentage": random.uniform(30, 100),
+            "liveness_score": random.uniform(30, 100),
+        } for address in addresses[: int(voters * 0.9)]])
+        events = [{
+            "campaign_address": "0x" + "ab" * 20, "candidate_index": random.randrange(4), "vote_count": i + 1,
+            "voter": random.choice(addresses), "block_number": i, "block_hash": "0x0",
+            "tx_hash": f"0x{i:064x}", "log_index": 0,
+        } for i in range(votes)]
+        for start in range(0, votes, 10000):
+            db.execute(insert(VoteEvent), events[start:start + 10000])
+        db.commit()
+    return events
+
+
+async def run(session_factory, events, source, **kwargs):
+    stream = create_fraud_stream(session_factory, from_vote_events=source == "indexer", **kwargs)
+    start = time.perf_counter()
+    stream.start()
+    if source == "queue":
+        for event in events:
+            await stream.submit({"voter": event["voter"], "campaign_address": event["campaign_address"],
+                                 "tx_hash": event["tx_hash"], "log_index": event["log_index"]})
+    while stream.stats()["stages"]["write"]["events"] < len(events):
+        await asyncio.sleep(0.05)
+    seconds = time.perf_counter() - start
+    await stream.stop()
+    return seconds, stream.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=10000)
+    parser.add_argument("--votes", type=int, default=100000)
+    parser.add_argument("--source", choices=("indexer", "queue"), default="indexer")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-wait", type=float, default=0.05)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'fraud.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        events = populate(session_factory, args.voters, args.votes)
+
+        seconds, stats = asyncio.run(run(
+            session_factory, events, args.source, batch_size=args.batch_size, batch_wait=args.batch_wait,
+            queue_size=args.queue_size, poll_interval=0.01, name="loadtest",
+        ))
+        engine.dispose()
+    shutdown_pools()
+
+    print(f"{args.votes} votes from {args.voters} voters via {args.source}, batches of up to {args.batch_size}: "
+          f"{seconds:.2f}s ({args.votes / seconds:.0f} votes/s end to end)")
+    for stage, s in stats["stages"].items():
+        batch = s["batch_seconds"]
+        print(f"  {stage:<6} {s['events']:>8.0f} events  {s['events'] / seconds:>9.0f}/s   "
+              f"per batch p50 {batch['p50']} s, p99 {batch['p99']} s   errors {s['errors']:.0f}")
+    print(f"  scored batch size p50 {stats['batch_size']['p50']}, producers held back "
+          f"{stats['backpressure_seconds']:.2f}s, flagged {stats['flagged']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Load test for live tally streaming with simulated subscribers.
+
+Opens --subscribers subscriptions spread over --campaigns campaigns on one in-process TallyHub
+(the same hub behind /api/campaigns/{address}/stream, with an in-memory vote source instead of
+the database), casts --votes votes in bursts, and reports how many updates were published and
+delivered, how many bursts were coalesced, the publish-to-receive latency and the memory per
+subscriber. Every subscriber reads like an SSE connection would; --slow makes a fraction of
+them read only every 100 ms to show conflation.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.load_test_tally_stream --subscribers 20000 --campaigns 50 --votes 20000
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.utils.executors import io_pool
+from app.utils.tally_stream import TallyHub, HEARTBEAT
+
+
+class SimulatedVotes:
+    """Vote source kept in memory; changes() is called from the I/O pool."""
+
+    def __init__(self):
+        self.counts = {}
+        self.changed = set()
+        self.lock = threading.Lock()
+
+    def vote(self, campaign, candidate):
+        with self.lock:
+            votes = self.counts.setdefault(campaign, {})
+            votes[candidate] = votes.get(candidate, 0) + 1
+            self.changed.add(campaign)
+
+    def _tally(self, campaign):
+        votes = self.counts.get(campaign, {})
+        return {"tallies": [{"candidate_index": i, "votes": n} for i, n in sorted(votes.items())],
+                "total_votes": sum(votes.values()), "indexed_block": None}
+
+    def snapshot(self, campaigns):
+        with self.lock:
+            return {c: self._tally(c) for c in campaigns}
+
+    def changes(self, campaigns):
+        with self.lock:
+            changed, self.changed = self.changed & campaigns, set()
+            return {c: self._tally(c) for c in changed}
+
+
+class TimedHub(TallyHub):
+    """Records when each update was published so subscribers can measure latency."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.published_at = {}
+
+    def publish(self, campaign, tally):
+        super().publish(campaign, tally)
+        self.published_at[self._seq] = time.perf_counter()
+
+
+async def subscriber(hub, campaign, slow, latencies, done):
+    subscription = await hub.subscribe(campaign)
+    received = 0
+    try:
+        while not done.is_set():
+            message = await subscription.next()
+            if message is HEARTBEAT:
+                continue
+            now = time.perf_counter()
+            seq = int(message[4:message.index(b"\n")])
+            if seq in hub.published_at:
+                latencies.append(now - hub.published_at[seq])
+            received += 1
+            if slow:
+                await asyncio.sleep(0.1)
+    finally:
+        hub.unsubscribe(subscription)
+    return received
+
+
+async def run(subscribers, campaigns, candidates, votes, burst, burst_interval, poll_interval, slow_fraction):
+    source = SimulatedVotes()
+    hub = TimedHub(source, poll_interval=poll_interval, name="loadtest")
+    addresses = [f"0x{i:040x}" for i in range(campaigns)]
+    latencies = []
+    done = asyncio.Event()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(subscriber(hub, addresses[i % campaigns], random.random() < slow_fraction, latencies, done))
+        for i in range(subscribers)
+    ]
+    while hub.stats()["subscribers"] < subscribers:
+        failed = [task for task in tasks if task.done()]
+        if failed:
+            failed[0].result()
+        await asyncio.sleep(0.01)
+    connect_seconds = time.perf_counter() - start
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    cast = 0
+    while cast < votes:
+        for _ in range(min(burst, votes - cast)):
+            source.vote(random.choice(addresses), random.randrange(candidates))
+            cast += 1
+        await asyncio.sleep(burst_interval)
+    # Let the last poll go out and the subscribers drain
+    await asyncio.sleep(poll_interval * 2 + 0.2)
+    voting_seconds = time.perf_counter() - start
+
+    done.set()
+    # Wake idle subscribers so they see `done`
+    hub.send_heartbeats()
+    received = sum(await asyncio.gather(*tasks))
+    await hub.stop()
+    stats = hub.stats()
+
+    print(f"{subscribers} subscribers on {campaigns} campaigns, {votes} votes in bursts of {burst} "
+          f"every {burst_interval * 1000:.0f} ms, poll interval {poll_interval * 1000:.0f} ms")
+    print(f"  subscribed in {connect_seconds:.2f}s, ~{per_subscriber / 1024:.1f} KiB per subscriber (tracemalloc)")
+    print(f"  voting phase {voting_seconds:.2f}s: {stats['updates']:.0f} updates published for {votes} votes "
+          f"({votes / max(stats['updates'], 1):.1f} votes coalesced per update)")
+    print(f"  {stats['deliveries']:.0f} deliveries, {received} messages read, {stats['conflated']:.0f} skipped by slow readers")
+    if latencies:
+        p50, p99, worst = np.percentile(latencies, [50, 99, 100]) * 1000
+        print(f"  publish-to-read latency p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {worst:.2f} ms")
+    fanout = stats["fanout_seconds"]
+    print(f"  fan-out per update p50/p99: {fanout['p50']}/{fanout['p99']} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=20000)
+    parser.add_argument("--campaigns", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--votes", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=500, help="votes cast back to back")
+    parser.add_argument("--burst-interval-ms", type=float, default=50)
+    parser.add_argument("--poll-interval-ms", type=float, default=250)
+    parser.add_argument("--slow", type=float, default=0.1, help="fraction of subscribers that read slowly")
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.campaigns, args.candidates, args.votes, args.burst,
+                    args.burst_interval_ms / 1000, args.poll_interval_ms / 1000, args.slow))
+    io_pool.shutdown()
@@ -0,0 +1,133 @@
+"""
+Startup cost report: import time per module and package for the backend entry point,
+plus the time and memory taken by each lazily loaded subsystem.
+
+Runs `python -X importtime` in a fresh interpreter so nothing is already cached, then
+loads each heavy subsystem (fraud models, face_recognition, the Keras liveness model)
+one at a time in another fresh interpreter and reports the wall time and RSS growth.
+Subsystems whose dependencies are not installed are reported as unavailable.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.profile_startup --top 20
+    python -m app.utils.scripts.profile_startup --json startup_report.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.utils.model_registry import BASE_DIR
+
+SUBSYSTEMS = {
+    "app.main import": "import app.main",
+    "fraud models (sklearn)": "from app.utils.model_registry import registry; registry.load_all()",
+    "fraud model (compact)": "from app.utils.fraud_inference import compact_registry; compact_registry.load_all()",
+    "face_recognition": "from app.utils.face_matching import load_face_recognition; load_face_recognition()",
+    "liveness model (keras)": "from app.models import model; model.load(); model.warmup()",
+    "boto3 client": "import boto3; boto3.client('s3', region_name='us-east-1')",
+}
+
+MEASURE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec(sys.argv[1])
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def parse_importtime(stderr):
+    """Rows of (module, self_us, cumulative_us, depth) from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def import_profile(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(statement):
+    result = subprocess.run([sys.executable, "-c", MEASURE, statement], cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        return {"error": error}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(module, top):
+    rows = import_profile(module)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    # Depth-0 rows are the modules imported directly by the statement; their cumulative times add up
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+
+    # Baseline interpreter footprint, so subsystem RSS is reported as growth
+    baseline = measure("pass")
+    subsystems = {}
+    for name, statement in SUBSYSTEMS.items():
+        result = measure(statement)
+        if "max_rss_mb" in result:
+            result["rss_growth_mb"] = result["max_rss_mb"] - baseline["max_rss_mb"]
+        subsystems[name] = result
+
+    return {
+        "module": module,
+        "import_seconds": total_us / 1e6,
+        "packages": sorted(((p, us / 1e6) for p, us in by_package.items()), key=lambda x: -x[1])[:top],
+        "modules_self": sorted(((n, s / 1e6) for n, s, _, _ in rows), key=lambda x: -x[1])[:top],
+        "app_modules_cumulative": sorted(
+            ((n, c / 1e6) for n, _, c, _ in rows if n == "app" or n.startswith("app.")), key=lambda x: -x[1]
+        )[:top],
+        "subsystems": subsystems,
+    }
+
+
+def print_report(data):
+    print(f"Import of {data['module']}: {data['import_seconds'] * 1000:.0f} ms")
+    for title, key in (("Self time by top-level package", "packages"),
+                       ("Slowest modules (self time)", "modules_self"),
+                       ("Backend modules (cumulative, includes what they import)", "app_modules_cumulative")):
+        print(f"\n{title}:")
+        for name, seconds in data[key]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    print("\nSubsystems, each loaded in a fresh interpreter:")
+    for name, result in data["subsystems"].items():
+        if "error" in result:
+            print(f"  {name:<26} unavailable ({result['error']})")
+        else:
+            print(f"  {name:<26} {result['seconds'] * 1000:8.0f} ms  +{result['rss_growth_mb']:.0f} MB RSS")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    data = report(args.module, args.top)
+    print_report(data)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Run the streaming fraud scorer: score every vote the chain indexer stores in vote_events against
+the voter's recorded verification signals and write flagged votes to flagged_votes.
+
+Run one scorer per database next to the indexer (not one per API worker). It resumes from its
+stored checkpoint; its tables are created on first start. It exits with status 1 when a batch can
+be neither written nor dead-lettered, leaving the checkpoint before that batch: run it under a
+supervisor that restarts it.
+
+Run from the TrueVote-Backend directory:
+    python -m app.utils.scripts.run_fraud_stream
+    python -m app.utils.scripts.run_fraud_stream --batch-size 512 --report-interval 10
+"""
+import argparse
+import asyncio
+import json
+
+from app.models.base import Base
+from app.models.fraud import VoterSignals, FlaggedVote, FraudStreamCheckpoint, FraudStreamDeadLetter
+from app.utils.database import SessionLocal, engine
+from app.utils.executors import shutdown_pools
+from app.utils.fraud_stream import (
+    create_fraud_stream, FRAUD_STREAM_BATCH_SIZE, FRAUD_STREAM_BATCH_WAIT, FRAUD_STREAM_POLL_INTERVAL,
+)
+
+
+async def run(batch_size, batch_wait, poll_interval, report_interval):
+    stream = create_fraud_stream(SessionLocal, batch_size=batch_size, batch_wait=batch_wait, poll_interval=poll_interval)
+    stream.start()
+    try:
+        while True:
+            await asyncio.sleep(report_interval)
+            stats = stream.stats()
+            stages = {stage: f"{s['events']:.0f} ({s['events_per_second']}/s)" for stage, s in stats["stages"].items()}
+            print(json.dumps({"stages": stages, "queued": stats["queued_events"], "flagged": stats["flagged"],
+                              "dead_lettered": stats["dead_lettered"], "halted": stats["halted"]}))
+            if stream.halted:
+                raise SystemExit(1)
+    finally:
+        await stream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=FRAUD_STREAM_BATCH_SIZE)
+    parser.add_argument("--batch-wait", type=float, default=FRAUD_STREAM_BATCH_WAIT)
+    parser.add_argument("--poll-interval", type=float, default=FRAUD_STREAM_POLL_INTERVAL)
+    parser.add_argument("--report-interval", type=float, default=30, help="seconds between stats lines")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (VoterSignals, FlaggedVote, FraudStreamCheckpoint,
+                                                                      FraudStreamDeadLetter)])
+    print("Scoring new vote_events (Ctrl+C to stop)")
+    try:
+        asyncio.run(run(args.batch_size, args.batch_wait, args.poll_interval, args.report_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Run the chain event indexer: follow CampaignFactory/Campaign events from a JSON-RPC node into
+the campaigns and vote_events tables served by /api/campaigns.
+
+Run one indexer process per database (not one per API worker). It resumes from its stored
+checkpoint; the tables are created on first start.
+
+Run from the TrueVote-Backend directory against a local Hardhat node:
+    npx hardhat node                      # in Solidity/, then deploy the factory
+    python -m app.utils.scripts.run_indexer --rpc-url http://127.0.0.1:8545 --factory 0x5FbDB2315678afecb367f032d93F642f64180aa3
+    python -m app.utils.scripts.run_indexer --once      # catch up to the head and exit
+"""
+import argparse
+import time
+
+from app.models.base import Base
+from app.models.chain import Campaign, VoteEvent, IndexedBlock, IndexerCheckpoint
+from app.utils.chain_rpc import JsonRpcClient, CHAIN_RPC_URL
+from app.utils.database import SessionLocal, engine
+from app.utils.event_indexer import (
+    EventIndexer, INDEXER_FACTORY_ADDRESS, INDEXER_START_BLOCK, INDEXER_BATCH_SIZE,
+    INDEXER_CONFIRMATIONS, INDEXER_POLL_INTERVAL,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-url", default=CHAIN_RPC_URL)
+    parser.add_argument("--factory", default=INDEXER_FACTORY_ADDRESS, help="CampaignFactory address")
+    parser.add_argument("--start-block", type=int, default=INDEXER_START_BLOCK)
+    parser.add_argument("--batch-size", type=int, default=INDEXER_BATCH_SIZE, help="blocks per eth_getLogs range")
+    parser.add_argument("--confirmations", type=int, default=INDEXER_CONFIRMATIONS)
+    parser.add_argument("--poll-interval", type=float, default=INDEXER_POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="sync to the current head and exit")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=[t.__table__ for t in (Campaign, VoteEvent, IndexedBlock, IndexerCheckpoint)])
+    indexer = EventIndexer(
+        JsonRpcClient(args.rpc_url),
+        SessionLocal,
+        factory_address=args.factory,
+        start_block=args.start_block,
+        batch_size=args.batch_size,
+        confirmations=args.confirmations,
+    )
+
+    if args.once:
+        start = time.perf_counter()
+        blocks = indexer.sync_once()
+        stats = indexer.stats()
+        print(f"Scanned {blocks} blocks in {time.perf_counter() - start:.2f}s: "
+              f"{stats['campaigns']:.0f} campaigns, {stats['votes']:.0f} votes, checkpoint {stats['checkpoint']:.0f}")
+        return
+
+    print(f"Indexing {args.factory} from {args.rpc_url} every {args.poll_interval}s (Ctrl+C to stop)")
+    try:
+        indexer.run_forever(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Live tally updates for /api/campaigns/{address}/stream (Server-Sent Events).
+
+One poller per worker watches `vote_events` (written by the indexer process) and publishes the
+new tally of every subscribed campaign that changed; subscribers never query the database
+themselves, so the cost of a vote is one grouped query per campaign regardless of how many
+clients watch it.
+
+Bursts are coalesced twice: all votes that arrive within one TALLY_POLL_INTERVAL become a single
+update, and each subscriber holds only the latest unsent message, so a slow client skips
+intermediate tallies instead of buffering them. Every message is the campaign's full tally
+(votes per candidate index), which makes skipping safe. The SSE bytes of an update are encoded
+once and shared by all its subscribers.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.controllers.campaign_controller import tally_query, checkpoint_query, reorgs_query, group_tallies
+from app.models.chain import VoteEvent
+from app.utils.database import SessionLocal
+from app.utils.executors import io_pool
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+logger = get_logger("tally_stream")
+
+# Seconds between checks for new votes; also the coalescing window for bursts
+TALLY_POLL_INTERVAL = float(os.getenv("TALLY_POLL_INTERVAL", "0.5"))
+# Seconds between SSE keep-alive comments on idle streams
+TALLY_HEARTBEAT_INTERVAL = float(os.getenv("TALLY_HEARTBEAT_INTERVAL", "15"))
+
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def encode_event(seq: int, campaign: str, tally: dict) -> bytes:
+    data = json.dumps({"campaign_address": campaign, **tally}, separators=(",", ":"))
+    return f"id: {seq}\nevent: tally\ndata: {data}\n\n".encode()
+
+
+class VoteEventSource:
+    """
+    Reads tallies of changed campaigns from vote_events (sync; run it on the I/O pool).
+
+    A poll reads only rows above the last id it saw, plus the indexer's reorg counter: a rollback
+    deletes rows, which no id range shows, so a new count refreshes every watched campaign.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self._last_id: Optional[int] = None
+        self._reorgs = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _position(db: Session):
+        # Counter first: rows deleted after it is read are caught by the next poll
+        reorgs = db.scalars(reorgs_query()).first() or 0
+        return db.scalar(select(func.max(VoteEvent.id))) or 0, reorgs
+
+    def snapshot(self, campaigns: Iterable[str]) -> Dict[str, dict]:
+        campaigns = list(campaigns)
+        with self.session_factory() as db, self._lock:
+            if self._last_id is None:
+                # Votes stored after this point are reported by the next changes() call
+                self._last_id, self._reorgs = self._position(db)
+            return self._tallies(db, campaigns)
+
+    def changes(self, campaigns: Set[str]) -> Dict[str, dict]:
+        with self.session_factory() as db, self._lock:
+            if self._last_id is None:
+                self._last_id, self._reorgs = self._position(db)
+                return {}
+
+            reorgs = db.scalars(reorgs_query()).first() or 0
+            if reorgs != self._reorgs:
+                # Rows were deleted (indexer reorg rollback): refresh everything being watched
+                self._last_id = db.scalar(select(func.max(VoteEvent.id))) or 0
+                self._reorgs = reorgs
+                changed = set(campaigns)
+            else:
+                new_rows = db.execute(
+                    select(VoteEvent.campaign_address, func.max(VoteEvent.id))
+                    .where(VoteEvent.id > self._last_id)
+                    .group_by(VoteEvent.campaign_address)
+                ).all()
+                if not new_rows:
+                    return {}
+                self._last_id = max(last_id for _, last_id in new_rows)
+                changed = {campaign for campaign, _ in new_rows} & campaigns
+            return self._tallies(db, list(changed)) if changed else {}
+
+    @staticmethod
+    def _tallies(db: Session, campaigns) -> Dict[str, dict]:
+        block = db.scalars(checkpoint_query()).first()
+        return group_tallies(db.execute(tally_query(campaigns)).all(), campaigns, block)
+
+
+class Subscription:
+    """One client's view of a campaign: holds only the newest message not yet sent."""
+
+    __slots__ = ("campaign", "_latest", "_waiter", "conflated")
+
+    def __init__(self, campaign: str):
+        self.campaign = campaign
+        self._latest: Optional[bytes] = None
+        # A bare future instead of asyncio.Event + wait_for: no extra task or timer per wait,
+        # which matters with tens of thousands of idle subscribers
+        self._waiter: Optional[asyncio.Future] = None
+        self.conflated = 0
+
+    def push(self, message: bytes):
+        if self._latest is not None and self._latest is not HEARTBEAT:
+            self.conflated += 1
+        self._latest = message
+        self._wake()
+
+    def heartbeat(self):
+        if self._latest is None:
+            self._latest = HEARTBEAT
+            self._wake()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """The newest message, or None if nothing arrived within `timeout`."""
+        if self._latest is None:
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            timer = loop.call_later(timeout, self._wake) if timeout is not None else None
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if timer is not None:
+                    timer.cancel()
+        message, self._latest = self._latest, None
+        return message
+
+
+class TallyHub:
+    def __init__(self, source, poll_interval: float = TALLY_POLL_INTERVAL,
+                 heartbeat_interval: float = TALLY_HEARTBEAT_INTERVAL, name: str = "tallies"):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._messages: Dict[str, bytes] = {}
+        self._snapshots: Dict[str, asyncio.Future] = {}
+        self._seq = 0
+        self._poller: Optional[asyncio.Task] = None
+
+        labels = {"hub": name}
+        self._connected = metrics.gauge("tally_stream_subscribers", "Open tally subscriptions", labels)
+        self._updates = metrics.counter("tally_stream_updates_total", "Tally updates published", labels)
+        self._deliveries = metrics.counter("tally_stream_deliveries_total", "Messages handed to subscribers", labels)
+        self._conflated = metrics.counter("tally_stream_conflated_total", "Messages a slow subscriber skipped (counted when it leaves)", labels)
+        self._errors = metrics.counter("tally_stream_poll_errors_total", "Failed polls for new votes", labels)
+        self._poll_seconds = metrics.histogram("tally_stream_poll_seconds", "Time per poll for new votes", labels)
+        self._fanout_seconds = metrics.histogram("tally_stream_fanout_seconds", "Time to hand one update to all subscribers", labels)
+
+    def _ensure_started(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll_forever())
+
+    async def subscribe(self, campaign: str) -> Subscription:
+        campaign = campaign.lower()
+        self._ensure_started()
+        subscription = Subscription(campaign)
+        self._subscribers[campaign].add(subscription)
+        self._connected.inc()
+        if campaign not in self._messages:
+            try:
+                await self._load_snapshot(campaign)
+            except BaseException:
+                self.unsubscribe(subscription)
+                raise
+        subscription.push(self._messages[campaign])
+        return subscription
+
+    async def _load_snapshot(self, campaign: str):
+        # First watchers of a campaign in this worker start from the current tally; clients
+        # connecting at the same time share one query
+        pending = self._snapshots.get(campaign)
+        if pending is None:
+            pending = asyncio.ensure_future(io_pool.run(self.source.snapshot, [campaign]))
+            self._snapshots[campaign] = pending
+            pending.add_done_callback(lambda _: self._snapshots.pop(campaign, None))
+        snapshot = await asyncio.shield(pending)
+        if campaign not in self._messages:
+            self._seq += 1
+            self._messages[campaign] = encode_event(self._seq, campaign, snapshot[campaign])
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.campaign)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self._connected.dec()
+        self._conflated.inc(subscription.conflated)
+        if not subscribers:
+            del self._subscribers[subscription.campaign]
+            self._messages.pop(subscription.campaign, None)
+
+    def publish(self, campaign: str, tally: dict):
+        start = time.perf_counter()
+        self._seq += 1
+        message = encode_event(self._seq, campaign, tally)
+        self._messages[campaign] = message
+        subscribers = self._subscribers.get(campaign, ())
+        for subscription in subscribers:
+            subscription.push(message)
+        self._updates.inc()
+        self._deliveries.inc(len(subscribers))
+        self._fanout_seconds.observe(time.perf_counter() - start)
+
+    async def poll_once(self):
+        campaigns = set(self._subscribers)
+        start = time.perf_counter()
+        changes = await io_pool.run(self.source.changes, campaigns)
+        self._poll_seconds.observe(time.perf_counter() - start)
+        for campaign, tally in changes.items():
+            if campaign in self._subscribers:
+                self.publish(campaign, tally)
+
+    def send_heartbeats(self):
+        """Keep-alive for every subscriber with nothing pending (one pass instead of a timer per client)."""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.heartbeat()
+
+    async def _poll_forever(self):
+        last_heartbeat = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                # Database or pool unavailable: subscribers keep their last tally until the next poll
+                self._errors.inc()
+                log_event(logger, "tally_stream_poll_failed", logging.WARNING, error=str(e))
+            if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                self.send_heartbeats()
+                last_heartbeat = time.monotonic()
+
+    async def stream(self, campaign: str) -> AsyncIterator[bytes]:
+        """SSE body for one client; unsubscribes when the client disconnects."""
+        subscription = await self.subscribe(campaign)
+        try:
+            while True:
+                yield await subscription.next()
+        finally:
+            self.unsubscribe(subscription)
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self._connected.value,
+            "campaigns": len(self._subscribers),
+            "poll_interval": self.poll_interval,
+            "updates": self._updates.value,
+            "deliveries": self._deliveries.value,
+            "conflated": self._conflated.value,
+            "poll_errors": self._errors.value,
+            "poll_seconds": self._poll_seconds.snapshot(),
+            "fanout_seconds": self._fanout_seconds.snapshot(),
+        }
+
+
+tally_hub = TallyHub(VoteEventSource(SessionLocal))
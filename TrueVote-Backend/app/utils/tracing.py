@@ -0,0 +1,144 @@
+"""
+Per-stage request timing.
+
+`span(stage, **labels)` times a block and records it in the `stage_seconds` histogram (and
+`stage_errors_total` when the block raises). RequestMetricsMiddleware times every HTTP request
+and, for the requests it logs, includes the spans the request went through, so one log line
+shows where a slow request spent its time.
+
+Work running in the CPU pool cannot record into this process's registry (the worker may be
+another process), so it collects its spans with `capture()`, returns them with its result, and
+the caller hands them to `record_all()`.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.utils.log import get_logger, log_event, should_log
+from app.utils.metrics import metrics, DEFAULT_BUCKETS
+
+load_dotenv()
+
+# Requests slower than this are always logged; faster ones follow LOG_SAMPLE_RATE
+REQUEST_LOG_SLOW_MS = float(os.getenv("REQUEST_LOG_SLOW_MS", "1000"))
+
+# Stages such as a single-row fraud preprocess finish well under a millisecond
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005) + DEFAULT_BUCKETS
+
+# (stage, seconds, error, labels)
+Stage = Tuple[str, float, bool, dict]
+
+# Spans of the current request, set by RequestMetricsMiddleware
+_trace: ContextVar[Optional[List[Stage]]] = ContextVar("trace", default=None)
+# Spans collected inside capture(), returned to the caller instead of being recorded here
+_captured: ContextVar[Optional[List[Stage]]] = ContextVar("captured", default=None)
+
+logger = get_logger("http")
+
+
+def record(stage: str, seconds: float, error: bool = False, **labels):
+    tags = {"stage": stage, **labels}
+    metrics.histogram("stage_seconds", "Time spent in a request stage", tags, buckets=STAGE_BUCKETS).observe(seconds)
+    if error:
+        metrics.counter("stage_errors_total", "Request stages that raised", tags).inc()
+    trace = _trace.get()
+    if trace is not None:
+        trace.append((stage, seconds, error, labels))
+
+
+def record_all(stages: List[Stage]):
+    for stage, seconds, error, labels in stages:
+        record(stage, seconds, error, **labels)
+
+
+@contextmanager
+def span(stage: str, **labels):
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        captured = _captured.get()
+        if captured is not None:
+            captured.append((stage, seconds, error, labels))
+        else:
+            record(stage, seconds, error, **labels)
+
+
+@contextmanager
+def capture():
+    stages: List[Stage] = []
+    token = _captured.set(stages)
+    try:
+        yield stages
+    finally:
+        _captured.reset(token)
+
+
+def _stage_timings(stages: List[Stage]) -> dict:
+    timings = {}
+    for stage, seconds, _, labels in stages:
+        key = ":".join([stage] + [str(v) for v in labels.values()])
+        timings[key] = round(timings.get(key, 0.0) + seconds * 1000, 3)
+    return timings
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording `http_request_seconds` and `http_requests_total` per route
+    template (not the raw path, so wallet addresses do not become label values).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Reported when the app raises before starting a response
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stages: List[Stage] = []
+        token = _trace.set(stages)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            _trace.reset(token)
+            self._record(scope, status, seconds, stages)
+
+    @staticmethod
+    def _record(scope, status: int, seconds: float, stages: List[Stage]):
+        route = scope.get("route")
+        labels = {"method": scope["method"], "route": getattr(route, "path", "unmatched")}
+        metrics.histogram("http_request_seconds", "Time to respond to an HTTP request", labels).observe(seconds)
+        metrics.counter("http_requests_total", "HTTP requests by response status", {**labels, "status": status}).inc()
+
+        ms = seconds * 1000
+        if status >= 500:
+            level = logging.ERROR
+        elif ms >= REQUEST_LOG_SLOW_MS:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        if should_log(logger, level, sample=True):
+            log_event(logger, "request", level, status=status, ms=round(ms, 3), stages=_stage_timings(stages),
+                      **labels)
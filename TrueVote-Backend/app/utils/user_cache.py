@@ -0,0 +1,193 @@
+"""
+Read-through cache of users keyed by wallet address, in front of the users table.
+
+Entries are plain column dicts (ORM objects are tied to a session), rebuilt into detached
+User instances on a hit. Only existing users are cached, so a registration never has to
+evict a cached "not found". Writes that change a user call `invalidate()`.
+
+Backends:
+- memory: per-process TTL + LRU; other workers may serve a stale entry for up to the TTL
+- redis:  shared by all workers (any Redis-compatible server, e.g. Redis, Valkey, KeyDB)
+- none:   every lookup goes to the database
+
+Cache failures never fail a request: they are counted and the database is used instead.
+"""
+import base64
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+from app.models.user import User
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+logger = get_logger("user_cache")
+
+USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "memory").lower()
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "50000"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+USER_COLUMNS = [column.name for column in User.__table__.columns]
+
+
+def user_to_dict(user: User) -> dict:
+    return {name: getattr(user, name) for name in USER_COLUMNS}
+
+
+def user_from_dict(data: dict) -> User:
+    return User(**data)
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    async def set(self, key: str, value: dict, ttl: float):
+        self._entries[key] = (self._clock() + ttl, dict(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Stores entries as JSON with a server-side expiry. `client` is any object with the async
+    get/set(ex=)/delete methods of redis.asyncio.Redis; by default one is created from the URL.
+    """
+
+    name = "redis"
+
+    def __init__(self, client=None, url: str = USER_CACHE_REDIS_URL, prefix: str = "truevote:user:"):
+        if client is None:
+            import redis.asyncio
+            client = redis.asyncio.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    @staticmethod
+    def encode(value: dict) -> str:
+        encoded = dict(value)
+        if encoded.get("face_encoding") is not None:
+            encoded["face_encoding"] = base64.b64encode(encoded["face_encoding"]).decode("ascii")
+        return json.dumps(encoded)
+
+    @staticmethod
+    def decode(raw) -> dict:
+        value = json.loads(raw)
+        if value.get("face_encoding") is not None:
+            value["face_encoding"] = base64.b64decode(value["face_encoding"])
+        return value
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return self.decode(raw) if raw is not None else None
+
+    async def set(self, key: str, value: dict, ttl: float):
+        await self.client.set(self.prefix + key, self.encode(value), ex=max(int(ttl), 1))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class UserCache:
+    def __init__(self, backend, ttl: float = USER_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        labels = {"backend": backend.name if backend is not None else "none"}
+        self._hits = metrics.counter("user_cache_hits_total", "User lookups served from the cache", labels)
+        self._misses = metrics.counter("user_cache_misses_total", "User lookups that went to the database", labels)
+        self._invalidations = metrics.counter("user_cache_invalidations_total", "Entries dropped after a write", labels)
+        self._errors = metrics.counter("user_cache_errors_total", "Cache operations that failed", labels)
+
+    async def get_or_load(self, wallet_address: str, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+        if self.backend is None:
+            return await loader()
+
+        try:
+            cached = await self.backend.get(wallet_address)
+        except Exception as e:
+            self._errors.inc()
+            log_event(logger, "user_cache_read_failed", logging.WARNING, error=str(e))
+            cached = None
+        if cached is not None:
+            self._hits.inc()
+            return user_from_dict(cached)
+
+        self._misses.inc()
+        user = await loader()
+        if user is not None:
+            try:
+                await self.backend.set(wallet_address, user_to_dict(user), self.ttl)
+            except Exception as e:
+                self._errors.inc()
+                log_event(logger, "user_cache_write_failed", logging.WARNING, error=str(e))
+        return user
+
+    async def invalidate(self, wallet_address: str):
+        if self.backend is None:
+            return
+        self._invalidations.inc()
+        try:
+            await self.backend.delete(wallet_address)
+        except Exception as e:
+            # The entry expires after the TTL at the latest
+            self._errors.inc()
+            log_event(logger, "user_cache_invalidation_failed", logging.WARNING, error=str(e))
+
+    def stats(self) -> dict:
+        hits, misses = self._hits.value, self._misses.value
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "ttl": self.ttl,
+            "size": self.backend.size() if self.backend is not None else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "invalidations": self._invalidations.value,
+            "errors": self._errors.value,
+        }
+
+
+def create_backend(kind: str = USER_CACHE_BACKEND):
+    if kind == "none":
+        return None
+    if kind == "redis":
+        return RedisBackend()
+    if kind == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown USER_CACHE_BACKEND {kind!r}; expected memory, redis or none")
+
+
+user_cache = UserCache(create_backend())
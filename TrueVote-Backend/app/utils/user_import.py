@@ -0,0 +1,242 @@
+"""
+Bulk voter enrollment from CSV or JSONL files.
+
+Each row has wallet_address, first_name, last_name, email and image. `image` is either an
+S3 URL of an already uploaded enrollment photo (stored as-is; the face encoding is computed,
+and checked against the duplicate-face index, on the user's first biometric login) or a local file path, which needs an `uploader`
+callable that stores the bytes and returns the URL.
+
+Rows are processed in chunks: validation and in-file duplicate detection happen in memory,
+uniqueness against the database is one set-based SELECT per chunk, and valid rows are
+written with a single executemany INSERT per chunk. Failures are reported per row and do
+not stop the import.
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from email_validator import validate_email, EmailNotValidError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+DUPLICATE_WALLET = "User with this wallet address already exists"
+DUPLICATE_EMAIL = "Email already registered"
+
+IMPORT_FIELDS = ["wallet_address", "first_name", "last_name", "email", "image"]
+# Column limits from app/models/user.py
+MAX_LENGTHS = {
+    "wallet_address": User.wallet_address.type.length,
+    "first_name": User.first_name.type.length,
+    "last_name": User.last_name.type.length,
+    "email": User.email.type.length,
+    "biometric_image_url": User.biometric_image_url.type.length,
+}
+
+
+def conflict_query(wallet_addresses, emails):
+    """One SELECT returning the (wallet_address, email) of every user clashing with either set."""
+    return select(User.wallet_address, User.email).where(
+        or_(User.wallet_address.in_(wallet_addresses), User.email.in_(emails))
+    )
+
+
+def registration_conflict(rows, wallet_address: str, email: str) -> Optional[str]:
+    """Error message for the first unique constraint a new registration would violate, if any."""
+    rows = list(rows)
+    if any(row.wallet_address == wallet_address for row in rows):
+        return DUPLICATE_WALLET
+    if any(row.email == email for row in rows):
+        return DUPLICATE_EMAIL
+    return None
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    """Yield rows from a .csv (with header) or .jsonl file, numbered from 1 in `row`."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield {"row": number, **json.loads(line)}
+        else:
+            for number, record in enumerate(csv.DictReader(f), start=1):
+                yield {"row": number, **record}
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_row(row: dict) -> dict:
+    """Normalized user values for a row; raises ValueError with a readable reason."""
+    values = {field: str(row.get(field) or "").strip() for field in IMPORT_FIELDS}
+    missing = [field for field in IMPORT_FIELDS if not values[field]]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        values["email"] = validate_email(values["email"], check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(f"invalid email: {e}")
+    for field in ("wallet_address", "first_name", "last_name", "email"):
+        if len(values[field]) > MAX_LENGTHS[field]:
+            raise ValueError(f"{field} longer than {MAX_LENGTHS[field]} characters")
+    return values
+
+
+def resolve_image(image: str, wallet_address: str, uploader: Optional[Callable[[bytes, str], str]]) -> str:
+    if image.startswith(("https://", "http://")):
+        url = image
+    elif uploader is None:
+        raise ValueError("local image path given but no uploader configured (use --upload)")
+    elif not os.path.isfile(image):
+        raise ValueError(f"image not found: {image}")
+    else:
+        with open(image, "rb") as f:
+            url = uploader(f.read(), wallet_address)
+    if len(url) > MAX_LENGTHS["biometric_image_url"]:
+        raise ValueError(f"image URL longer than {MAX_LENGTHS['biometric_image_url']} characters")
+    return url
+
+
+class UserImporter:
+    """
+    Imports users into the `users` table through a sync Session.
+
+    `uploader(content, wallet_address) -> url` is called for rows whose image is a local file,
+    on up to `upload_workers` threads at once.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = 1000,
+                 uploader: Optional[Callable[[bytes, str], str]] = None, upload_workers: int = 16):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.uploader = uploader
+        self.upload_workers = upload_workers
+        self.inserted = 0
+        self.failures: List[Dict] = []
+        self._seen_wallets = set()
+        self._seen_emails = set()
+
+    def _fail(self, row: dict, error: str):
+        self.failures.append({"row": row["row"], "wallet_address": row.get("wallet_address"), "error": error})
+
+    def _validate_chunk(self, chunk: List[dict]) -> List[dict]:
+        valid = []
+        for row in chunk:
+            try:
+                values = validate_row(row)
+            except ValueError as e:
+                self._fail(row, str(e))
+                continue
+            # Earlier rows of the same file win
+            if values["wallet_address"] in self._seen_wallets:
+                self._fail(row, "duplicate wallet_address in file")
+                continue
+            if values["email"] in self._seen_emails:
+                self._fail(row, "duplicate email in file")
+                continue
+            self._seen_wallets.add(values["wallet_address"])
+            self._seen_emails.add(values["email"])
+            valid.append({"row": row["row"], **values})
+        return valid
+
+    def _filter_existing(self, rows: List[dict]) -> List[dict]:
+        if not rows:
+            return rows
+        existing = self.db.execute(conflict_query(
+            [row["wallet_address"] for row in rows], [row["email"] for row in rows]
+        )).all()
+        existing_wallets = {r.wallet_address for r in existing}
+        existing_emails = {r.email for r in existing}
+
+        new_rows = []
+        for row in rows:
+            if row["wallet_address"] in existing_wallets:
+                self._fail(row, DUPLICATE_WALLET)
+            elif row["email"] in existing_emails:
+                self._fail(row, DUPLICATE_EMAIL)
+            else:
+                new_rows.append(row)
+        return new_rows
+
+    def _resolve(self, row: dict):
+        try:
+            return resolve_image(row["image"], row["wallet_address"], self.uploader), None
+        except Exception as e:
+            # Upload errors (network, credentials) fail the row, not the import
+            return None, str(e)
+
+    def _with_images(self, rows: List[dict]) -> List[dict]:
+        if self.uploader is not None and self.upload_workers > 1 and rows:
+            with ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="import-upload") as executor:
+                resolved = list(executor.map(self._resolve, rows))
+        else:
+            resolved = [self._resolve(row) for row in rows]
+
+        records = []
+        for row, (url, error) in zip(rows, resolved):
+            if error is not None:
+                self._fail(row, error)
+                continue
+            records.append({
+                "row": row["row"],
+                "wallet_address": row["wallet_address"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "email": row["email"],
+                "biometric_image_url": url,
+            })
+        return records
+
+    def _insert(self, records: List[dict]):
+        if not records:
+            return
+        values = [{k: v for k, v in record.items() if k != "row"} for record in records]
+        try:
+            self.db.execute(insert(User), values)
+            self.db.commit()
+            self.inserted += len(values)
+        except IntegrityError:
+            # Another writer registered one of these users since the check; isolate it row by row
+            self.db.rollback()
+            for record, value in zip(records, values):
+                try:
+                    self.db.execute(insert(User), [value])
+                    self.db.commit()
+                    self.inserted += 1
+                except IntegrityError:
+                    self.db.rollback()
+                    self._fail(record, "already exists (unique constraint)")
+
+    def import_rows(self, rows: Iterable[dict]) -> dict:
+        start = time.perf_counter()
+        total = 0
+        for chunk in chunked(rows, self.chunk_size):
+            total += len(chunk)
+            self._insert(self._with_images(self._filter_existing(self._validate_chunk(chunk))))
+        seconds = time.perf_counter() - start
+        return {
+            "rows": total,
+            "inserted": self.inserted,
+            "failed": len(self.failures),
+            "seconds": seconds,
+            "rows_per_second": total / seconds if seconds else 0.0,
+            "failures": self.failures,
+        }
+
+
+def import_users(db: Session, path: str, chunk_size: int = 1000,
+                 uploader: Optional[Callable[[bytes, str], str]] = None, upload_workers: int = 16) -> dict:
+    return UserImporter(db, chunk_size, uploader, upload_workers).import_rows(read_rows(path))
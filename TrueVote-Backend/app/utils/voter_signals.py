@@ -0,0 +1,110 @@
+"""
+Server-side record of each voter's verification signals, the inputs of the fraud model.
+
+/api/users/biometric_auth counts face attempts and keeps the match percentage and liveness
+score of the latest attempt. Robot detections stay at 0 until CAPTCHA results can be tied to a
+server-verified session; /verify-captcha does not record them. The streaming scorer (app/utils/fraud_stream.py) joins vote events with these
+rows instead of trusting features posted by the client.
+
+Recording is best effort: a failed write is logged and counted but never fails the request.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.fraud import VoterSignals
+from app.utils.database import is_async
+from app.utils.executors import io_pool
+from app.utils.log import get_logger, log_event
+from app.utils.metrics import metrics
+
+_recorded = metrics.counter("voter_signals_recorded_total", "Verification signals recorded")
+_record_errors = metrics.counter("voter_signals_errors_total", "Verification signals that could not be stored")
+logger = get_logger("voter_signals")
+
+
+def match_percentage(distance: Optional[float]) -> Optional[float]:
+    """face_recognition distance (0 = identical) as the 0-100 "Face Match Percentage" feature."""
+    if distance is None:
+        return None
+    return max(0.0, 1.0 - distance) * 100
+
+
+def _upsert(db: Session, wallet_address: str, now: datetime, face_attempt: bool, robot: bool,
+            face_match_percentage: Optional[float], liveness_score: Optional[float]):
+    values = {"last_seen_at": now}
+    if face_attempt:
+        values["face_attempts"] = VoterSignals.face_attempts + 1
+    if robot:
+        values["robot_detections"] = VoterSignals.robot_detections + 1
+    if face_match_percentage is not None:
+        values["face_match_percentage"] = face_match_percentage
+    if liveness_score is not None:
+        values["liveness_score"] = liveness_score
+
+    for _ in range(2):
+        updated = db.execute(
+            update(VoterSignals).where(VoterSignals.wallet_address == wallet_address).values(**values)
+        ).rowcount
+        if updated:
+            db.commit()
+            return
+        db.add(VoterSignals(
+            wallet_address=wallet_address, first_seen_at=now, last_seen_at=now,
+            face_attempts=int(face_attempt), robot_detections=int(robot),
+            face_match_percentage=face_match_percentage, liveness_score=liveness_score,
+        ))
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            # A concurrent request stored the first signal: update that row instead
+            db.rollback()
+
+
+async def record_signals(
+    db,
+    wallet_address: str,
+    face_attempt: bool = False,
+    robot: bool = False,
+    face_match_percentage: Optional[float] = None,
+    liveness_score: Optional[float] = None,
+):
+    args = (wallet_address.lower(), datetime.utcnow(), face_attempt, robot, face_match_percentage, liveness_score)
+    try:
+        if is_async(db):
+            await db.run_sync(_upsert, *args)
+        else:
+            await io_pool.run(_upsert, db, *args)
+        _recorded.inc()
+    except Exception as e:
+        _record_errors.inc()
+        log_event(logger, "voter_signals_record_failed", logging.WARNING, wallet_address=wallet_address, error=str(e))
+
+
+def signal_features(signals: VoterSignals) -> tuple:
+    """
+    Model features in FEATURE_COLUMNS order (without Address). A voter who never completed a
+    biometric check scores 0 for match and liveness, as the frontend reports it.
+    """
+    minutes = (signals.last_seen_at - signals.first_seen_at).total_seconds() / 60
+    return (
+        minutes,
+        signals.face_attempts,
+        int(signals.robot_detections > 0),
+        signals.face_match_percentage or 0.0,
+        signals.liveness_score or 0.0,
+    )
+
+
+def load_signal_features(db: Session, wallet_addresses: Iterable[str]) -> Dict[str, tuple]:
+    """Features of every given wallet that has signals, in one query (sync; run on the I/O pool)."""
+    wallets = list({w.lower() for w in wallet_addresses if w})
+    if not wallets:
+        return {}
+    rows = db.scalars(select(VoterSignals).where(VoterSignals.wallet_address.in_(wallets))).all()
+    return {row.wallet_address: signal_features(row) for row in rows}
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.log import get_logger, log_event
+
+load_dotenv()
+
+logger = get_logger("warmup")
+
+# Steps run in the background after startup; the service reports ready once all of them finish
+STARTUP_WARMUP = [step.strip() for step in os.getenv("STARTUP_WARMUP", "fraud_models,biometrics").split(",") if step.strip()]
+
+
+class Warmup:
+    """
+    Runs slow initialisation (model loading, heavy imports) as a background task so the
+    server starts accepting requests immediately, and tracks whether it has finished.
+
+    Steps are async callables run concurrently. Endpoints that need a step before it is
+    done still work: the models load lazily on first use, that request just pays for it.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Callable[[], Awaitable]] = {}
+        self._state: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, step: Callable[[], Awaitable]):
+        self._steps[name] = step
+        self._state[name] = {"status": "pending", "seconds": None, "error": None}
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self._steps.items()))
+
+    async def _run_step(self, name, step):
+        state = self._state[name]
+        state["status"] = "running"
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            state.update(status="failed", error=str(e))
+            log_event(logger, "warmup_step_failed", logging.ERROR, step=name, error=str(e))
+        else:
+            state["status"] = "ready"
+        state["seconds"] = time.perf_counter() - start
+
+    @property
+    def ready(self) -> bool:
+        return all(state["status"] == "ready" for state in self._state.values())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "steps": {name: dict(state) for name, state in self._state.items()}}
@@ -0,0 +1,53 @@
+import pytest
+import json
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.scripts.load_test_api import summarize, compare_reports
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def report(p50, p99):
+    return {'scenarios': {'login': {'latency_ms': {'p50': p50, 'p99': p99}}}}
+
+
+def test_summary_percentiles_and_errors():
+    summary = summarize([0.001 * i for i in range(1, 101)], [200] * 98 + [503, 404], seconds=2.0)
+
+    assert summary['requests'] == 100 and summary['requests_per_second'] == 50.0
+    assert summary['errors'] == 2 and summary['status_codes'] == {'200': 98, '503': 1, '404': 1}
+    assert summary['latency_ms']['p50'] == pytest.approx(50.5)
+    assert summary['latency_ms']['max'] == 100.0
+
+
+def test_regressions_beyond_the_allowed_growth():
+    baseline = report(p50=10.0, p99=40.0)
+
+    assert compare_reports(report(p50=11.0, p99=47.0), baseline, max_regression=0.2) == []
+    regressions = compare_reports(report(p50=13.0, p99=40.0), baseline, max_regression=0.2)
+    assert [(r['scenario'], r['percentile'], r['change']) for r in regressions] == [('login', 'p50', 0.3)]
+    # Scenarios missing from the baseline are not compared
+    assert compare_reports(report(p50=99.0, p99=99.0), {'scenarios': {}}, max_regression=0.2) == []
+
+
+def test_offline_run_writes_a_report(tmp_path):
+    pytest.importorskip('moto')
+    path = tmp_path / 'report.json'
+    env = {key: value for key, value in os.environ.items() if key != 'DATABASE_URL'}
+
+    subprocess.run(
+        [sys.executable, '-m', 'app.utils.scripts.load_test_api', '--scenarios', 'login', 'verify_captcha',
+         'validate_vote', '--requests', '10', '--concurrency', '4', '--warmup', '1', '--users', '2',
+         '--report', str(path)],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, timeout=300,
+    )
+
+    result = json.loads(path.read_text())
+    assert set(result['scenarios']) == {'login', 'verify_captcha', 'validate_vote'}
+    for scenario in result['scenarios'].values():
+        assert scenario['requests'] == 10 and scenario['errors'] == 0
+    assert result['config']['concurrency'] == 4
@@ -0,0 +1,127 @@
+import pytest
+import os
+import random
+import sys
+import numpy as np
+import pandas as pd
+
+pytest.importorskip('pytest_benchmark')
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models import model as liveness_model
+from app.utils import address_hash
+from app.utils.image_preprocess import decode_image, preprocess_face, preprocess_faces, preprocess_image_from_array
+from app.utils.model import hash_address, pre_process_data, stacked_model_predict
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'liveness', 'fixtures')
+FACE = (38, 204, 113, 129)
+
+
+def generate_eth_address(rng):
+    return "0x" + ''.join(rng.choices('0123456789abcdefABCDEF', k=40))
+
+
+def vote_frame(size, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Address": [generate_eth_address(rng) for _ in range(size)],
+        "Time Diff between first and last (Mins)": [rng.uniform(1, 100000) for _ in range(size)],
+        "Face Attempts": [rng.randint(1, 3) for _ in range(size)],
+        "Detected As a Robot At Least Once": [rng.randint(0, 1) for _ in range(size)],
+        "Face Match Percentage": [rng.uniform(30.0, 100.0) for _ in range(size)],
+        "Liveness Score of The Face": [rng.uniform(30.0, 100.0) for _ in range(size)],
+    })
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return decode_image(f.read())
+
+
+@pytest.mark.benchmark(group='hash_address')
+def test_hash_address_uncached(benchmark):
+    addresses = [generate_eth_address(random.Random(i)) for i in range(1000)]
+    uncached = address_hash._normalized_address.__wrapped__
+
+    benchmark(lambda: [uncached(address) for address in addresses])
+
+
+@pytest.mark.benchmark(group='hash_address')
+def test_hash_address_cached(benchmark):
+    addresses = [generate_eth_address(random.Random(i)) for i in range(1000)]
+    for address in addresses:
+        hash_address(address)
+
+    benchmark(lambda: [hash_address(address) for address in addresses])
+
+
+@pytest.mark.benchmark(group='pre_process_data')
+@pytest.mark.parametrize('size', [1, 1000])
+def test_pre_process_data(benchmark, size):
+    frame = vote_frame(size)
+    pre_process_data(frame)
+
+    result = benchmark(pre_process_data, frame)
+
+    assert result.shape == (size, 6)
+
+
+@pytest.mark.benchmark(group='stacked_model_predict')
+@pytest.mark.parametrize('size', [1, 1000])
+def test_stacked_model_predict(benchmark, size):
+    frame = vote_frame(size)
+    stacked_model_predict(frame)
+
+    result = benchmark(stacked_model_predict, frame)
+
+    assert len(result['is_fraud']) == size
+
+
+@pytest.mark.benchmark(group='compare_faces')
+def test_compare_faces(benchmark):
+    pytest.importorskip('face_recognition')
+    from app.utils.face_matching import compare_faces
+    live, spoof = fixture('live_1.jpg'), fixture('spoof_2.jpg')
+
+    result = benchmark.pedantic(compare_faces, args=(live, spoof), rounds=10, warmup_rounds=1)
+
+    assert result['error'] is None
+
+
+@pytest.mark.benchmark(group='liveness')
+@pytest.mark.parametrize('size', [1, 16])
+def test_liveness_predict(benchmark, size):
+    if not os.path.exists(liveness_model.model_path):
+        pytest.skip(f"{liveness_model.model_path} not available")
+    images = [fixture('live_1.jpg')] * size
+    batch = preprocess_faces(images, [FACE] * size)
+    liveness_model.predict_batch(batch)
+
+    result = benchmark.pedantic(liveness_model.predict_batch, args=(batch,), rounds=10, warmup_rounds=1)
+
+    assert len(result) == size and all(label in ('Live', 'Spoof') for _, label in result)
+
+
+@pytest.mark.benchmark(group='liveness')
+def test_liveness_preprocess_batch(benchmark):
+    images = [fixture('live_1.jpg')] * 16
+    buffer = np.empty((16, 224, 224, 3), dtype=np.float32)
+
+    benchmark(preprocess_faces, images, [FACE] * 16, buffer)
+
+
+@pytest.mark.benchmark(group='liveness_preprocess')
+@pytest.mark.parametrize('crop', ['frame', 'face'])
+def test_liveness_preprocess_phone_photo(benchmark, crop):
+    # A phone photo with the face in the middle third
+    img = np.random.default_rng(0).integers(0, 256, (3000, 4000, 3), dtype=np.uint8)
+    out = np.empty((224, 224, 3), dtype=np.float32)
+
+    if crop == 'frame':
+        result = benchmark.pedantic(preprocess_image_from_array, args=(img,), rounds=5, warmup_rounds=1)[0]
+    else:
+        result = benchmark.pedantic(preprocess_face, args=(img, (1000, 2500, 2000, 1500), out),
+                                    rounds=5, warmup_rounds=1)
+
+    assert result.shape == (224, 224, 3)
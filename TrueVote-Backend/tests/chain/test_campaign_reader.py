@@ -0,0 +1,218 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.campaign_reader import CampaignReader, CAMPAIGN_CALLS
+from app.utils.chain_rpc import JsonRpcClient, JsonRpcError, decode_abi, function_selector, to_int
+
+VOTER = '0x' + '01' * 20
+OWNER = '0x' + 'c0' * 20
+
+
+def uint(value):
+    return format(value, '064x')
+
+
+def encode_string(value):
+    data = value.encode()
+    return uint(len(data)) + data.hex().ljust(-(-len(data) // 32) * 64, '0')
+
+
+def encode_candidates(candidates):
+    """ABI encoding of one (string,uint256)[] return value."""
+    heads, tails = [], ''
+    for name, votes in candidates:
+        heads.append(uint(32 * len(candidates) + len(tails) // 2))
+        tails += uint(64) + uint(votes) + encode_string(name)
+    return '0x' + uint(32) + uint(len(candidates)) + ''.join(heads) + tails
+
+
+class FakeCampaign:
+    def __init__(self, name, candidates, voters=()):
+        self.name = name
+        self.candidates = candidates
+        self.voters = set(voters)
+
+    def call(self, data):
+        selector, args = data[:10], data[10:]
+        values = {
+            'getCampaignName()': lambda: '0x' + uint(32) + encode_string(self.name),
+            'getCampaignDescription()': lambda: '0x' + uint(32) + encode_string('About ' + self.name),
+            'getCampaignDate()': lambda: '0x' + uint(32) + encode_string('2026-10-18'),
+            'getCampaignNumber()': lambda: '0x' + uint(7),
+            'getCampaignOwner()': lambda: '0x' + OWNER[2:].rjust(64, '0'),
+            'getType()': lambda: '0x' + uint(1),
+            'getVotingStatus()': lambda: '0x' + uint(1),
+            'getStartTime()': lambda: '0x' + uint(1000),
+            'getEndTime()': lambda: '0x' + uint(4600),
+            'getRemainingTime()': lambda: '0x' + uint(600),
+            'getAllVotesOfCandidates()': lambda: encode_candidates(self.candidates),
+            'isVoted(address)': lambda: '0x' + uint('0x' + args[-40:] in self.voters),
+            'isEligibleVoter(address)': lambda: '0x' + uint(1),
+        }
+        for signature, value in values.items():
+            if function_selector(signature) == selector:
+                return value()
+        raise JsonRpcError(3, 'execution reverted')
+
+
+class RevertingContract:
+    def call(self, data):
+        raise JsonRpcError(3, 'execution reverted')
+
+
+class FakeNode:
+    """JSON-RPC node with Campaign contracts answering eth_call, counting HTTP requests."""
+
+    def __init__(self, contracts):
+        self.contracts = contracts
+        self.block = 10
+        self.requests = 0
+        self.calls = []
+
+    def handle(self, method, params):
+        if method == 'eth_blockNumber':
+            return hex(self.block)
+        if method == 'eth_call':
+            self.calls.append(to_int(params[1]))
+            contract = self.contracts.get(params[0]['to'])
+            # eth_call to an address without code succeeds with empty data
+            return contract.call(params[0]['data']) if contract else '0x'
+        raise JsonRpcError(-32601, f'method {method} not found')
+
+    def reply(self, request):
+        try:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'result': self.handle(request['method'], request['params'])}
+        except JsonRpcError as e:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': e.code, 'message': e.message}}
+
+    # requests.Session interface used by JsonRpcClient
+    def post(self, url, json, timeout):
+        self.requests += 1
+        body = [self.reply(r) for r in json] if isinstance(json, list) else self.reply(json)
+        return FakeResponse(body)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def campaigns(n):
+    return {'0x%040x' % (i + 1): FakeCampaign(f'Campaign {i}', [('Alice', i), ('Bob', 2 * i)]) for i in range(n)}
+
+
+def make_reader(node, **kwargs):
+    rpc = JsonRpcClient('http://fake-node', session=node, name='test-reader')
+    return CampaignReader(rpc, name='test-reader', **kwargs)
+
+
+def test_decode_abi_handles_nested_dynamic_types():
+    assert decode_abi('(string,uint256)[]', encode_candidates([('Alice', 3), ('A much longer candidate name that spans two words', 10)])) == \
+        [[('Alice', 3), ('A much longer candidate name that spans two words', 10)]]
+    assert decode_abi('string,uint256', '0x' + uint(64) + uint(5) + encode_string('hi')) == ['hi', 5]
+    assert decode_abi('(string,uint256)[]', encode_candidates([])) == [[]]
+    # ERC-20 transfer(address,uint256) selector checks the keccak256 implementation
+    assert function_selector('transfer(address,uint256)') == '0xa9059cbb'
+
+
+def test_reads_many_campaigns_in_constant_round_trips():
+    contracts = campaigns(50)
+    contracts['0x%040x' % 1].voters.add(VOTER)
+    node = FakeNode(contracts)
+    reader = make_reader(node, clock=Clock(), max_batch=1000)
+
+    states = reader.read(list(contracts), voter=VOTER)
+
+    # One eth_blockNumber + one batch of 50 * 13 eth_calls, all pinned to the same block
+    assert node.requests == 2
+    assert len(node.calls) == 50 * (len(CAMPAIGN_CALLS) + 2) and set(node.calls) == {10}
+    first, last = states[0], states[-1]
+    assert first['name'] == 'Campaign 0' and first['has_voted'] is True and first['owner'] == OWNER
+    assert last['candidates'] == [{'index': 0, 'name': 'Alice', 'votes': 49}, {'index': 1, 'name': 'Bob', 'votes': 98}]
+    assert last['total_votes'] == 147 and last['has_voted'] is False
+    assert last['block_number'] == 10 and last['errors'] == {}
+
+
+def test_splits_oversized_batches():
+    node = FakeNode(campaigns(10))
+    reader = make_reader(node, clock=Clock(), max_batch=50)
+
+    reader.read(list(node.contracts))
+
+    # 110 calls in batches of 50, plus the head block
+    assert node.requests == 1 + 3
+
+
+def test_caches_per_block():
+    node = FakeNode(campaigns(3))
+    clock = Clock()
+    reader = make_reader(node, clock=clock, block_ttl=1)
+    addresses = list(node.contracts)
+
+    reader.read(addresses)
+    reader.read(addresses[:2])
+    # Within the block TTL a warm read costs no round trip at all
+    assert node.requests == 2
+
+    clock.now = 2
+    node.contracts[addresses[0]].candidates = [('Alice', 5), ('Bob', 0)]
+    assert reader.read(addresses[:1])[0]['total_votes'] == 0  # head unchanged: still cached
+    assert node.requests == 3
+
+    node.block = 11
+    clock.now = 4
+    state = reader.read(addresses[:1])[0]
+    assert state['total_votes'] == 5 and state['block_number'] == 11
+    assert node.requests == 5
+    # Older blocks stay readable from the cache
+    assert reader.read(addresses[:1], block=10)[0]['total_votes'] == 0
+    assert node.requests == 5
+
+
+def test_failed_calls_only_fail_their_field():
+    node = FakeNode(campaigns(1))
+    # Some other contract: every Campaign getter reverts
+    node.contracts['0x' + 'ee' * 20] = RevertingContract()
+    reader = make_reader(node, clock=Clock())
+
+    good, broken, missing = reader.read(['0x%040x' % 1, '0x' + 'ee' * 20, '0x' + 'dd' * 20])
+
+    assert good['errors'] == {} and good['total_votes'] == 0
+    assert broken['name'] is None and broken['errors']['candidates'] == 'execution reverted'
+    assert broken['total_votes'] is None
+    assert 'no contract' in missing['errors']['name']
+
+
+def test_state_endpoint(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routes import campaign_routes
+
+    node = FakeNode(campaigns(2))
+    monkeypatch.setattr(campaign_routes, 'campaign_reader', make_reader(node, clock=Clock()))
+    app = FastAPI()
+    app.include_router(campaign_routes.router)
+
+    with TestClient(app) as client:
+        response = client.get('/api/campaigns/state', params={'address': list(node.contracts), 'voter': VOTER})
+        too_many = client.get('/api/campaigns/state', params={'address': ['0x%040x' % i for i in range(201)]})
+
+    assert response.status_code == 200
+    assert [s['name'] for s in response.json()] == ['Campaign 0', 'Campaign 1']
+    assert too_many.status_code == 400
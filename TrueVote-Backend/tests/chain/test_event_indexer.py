@@ -0,0 +1,237 @@
+import pytest
+import os
+import sys
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.chain import Campaign, VoteEvent, IndexerCheckpoint
+from app.models.fraud import FlaggedVote
+from app.routes import campaign_routes
+from app.utils.chain_rpc import JsonRpcClient, JsonRpcError, event_topic, to_int
+from app.utils.database import get_user_db
+from app.utils.event_indexer import EventIndexer, VOTE_CAST_TOPIC, CAMPAIGN_CREATED_TOPIC
+
+FACTORY = '0x' + 'fa' * 20
+CREATOR = '0x' + 'c0' * 20
+
+
+def word(value):
+    if isinstance(value, str):
+        return value[2:].rjust(64, '0')
+    return format(value, '064x')
+
+
+class FakeChain:
+    """In-memory JSON-RPC node: a list of blocks with logs, answering the calls the indexer makes."""
+
+    def __init__(self, max_log_range=None):
+        self.blocks = []
+        self.transactions = {}
+        self.max_log_range = max_log_range
+        self.requests = 0
+        self.fork = 0
+        self.mine()  # genesis
+
+    def mine(self, logs=()):
+        number = len(self.blocks)
+        block_hash = '0x%064x' % (number * 1000 + self.fork)
+        block_logs = []
+        for i, (address, topic, data, sender) in enumerate(logs):
+            tx_hash = '0x%064x' % (10 ** 9 + number * 100 + i + self.fork * 10 ** 6)
+            self.transactions[tx_hash] = {'hash': tx_hash, 'from': sender}
+            block_logs.append({
+                'address': address, 'topics': [topic], 'data': data, 'blockNumber': hex(number),
+                'blockHash': block_hash, 'transactionHash': tx_hash, 'logIndex': hex(i),
+            })
+        self.blocks.append({'number': hex(number), 'hash': block_hash, 'logs': block_logs})
+        return number
+
+    def create_campaign(self, address):
+        return self.mine([(FACTORY, CAMPAIGN_CREATED_TOPIC, '0x' + word(address) + word(CREATOR), CREATOR)])
+
+    def vote(self, campaign, candidate, count, voter):
+        return self.mine([(campaign, VOTE_CAST_TOPIC, '0x' + word(candidate) + word(count), voter)])
+
+    def reorg(self, height):
+        """Drop every block above `height`; blocks mined afterwards get new hashes."""
+        del self.blocks[height + 1:]
+        self.fork += 1
+
+    def handle(self, method, params):
+        if method == 'eth_blockNumber':
+            return hex(len(self.blocks) - 1)
+        if method == 'eth_getBlockByNumber':
+            number = to_int(params[0])
+            if number >= len(self.blocks):
+                return None
+            return {k: v for k, v in self.blocks[number].items() if k != 'logs'}
+        if method == 'eth_getTransactionByHash':
+            return self.transactions.get(params[0])
+        if method == 'eth_getLogs':
+            start, end = to_int(params[0]['fromBlock']), to_int(params[0]['toBlock'])
+            if self.max_log_range and end - start + 1 > self.max_log_range:
+                raise JsonRpcError(-32005, 'query returned more than 10000 results')
+            topics = params[0]['topics'][0]
+            return [log for block in self.blocks[start:end + 1] for log in block['logs'] if log['topics'][0] in topics]
+        raise JsonRpcError(-32601, f'method {method} not found')
+
+    def reply(self, request):
+        try:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'result': self.handle(request['method'], request['params'])}
+        except JsonRpcError as e:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': e.code, 'message': e.message}}
+
+    # requests.Session interface used by JsonRpcClient
+    def post(self, url, json, timeout):
+        self.requests += 1
+        body = [self.reply(r) for r in json] if isinstance(json, list) else self.reply(json)
+        return FakeResponse(body)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chain.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def make_indexer(chain, session_factory, **kwargs):
+    rpc = JsonRpcClient('http://fake-node', session=chain, name='test-indexer')
+    return EventIndexer(rpc, session_factory, factory_address=FACTORY, **kwargs)
+
+
+def tallies(session_factory, campaign):
+    with session_factory() as db:
+        rows = db.execute(select(VoteEvent.candidate_index, VoteEvent.voter)
+                          .where(VoteEvent.campaign_address == campaign)).all()
+    counts = {}
+    for candidate, _ in rows:
+        counts[candidate] = counts.get(candidate, 0) + 1
+    return counts
+
+
+def test_event_topics_match_the_contract_signatures():
+    # Well-known topic of the ERC-20 Transfer event checks the keccak256 implementation
+    assert event_topic('Transfer(address,address,uint256)') == \
+        '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+    assert VOTE_CAST_TOPIC != CAMPAIGN_CREATED_TOPIC
+
+
+def test_indexes_campaigns_and_votes_and_resumes(session_factory):
+    chain = FakeChain()
+    campaign = '0x' + 'ab' * 20
+    chain.create_campaign(campaign)
+    chain.vote(campaign, 0, 1, '0x' + '01' * 20)
+    chain.vote(campaign, 1, 1, '0x' + '02' * 20)
+    # Same event signature from a contract the factory did not create
+    chain.vote('0x' + 'ee' * 20, 0, 1, '0x' + '03' * 20)
+
+    indexer = make_indexer(chain, session_factory, batch_size=2)
+    assert indexer.sync_once() == 5  # genesis + 4 blocks
+    assert tallies(session_factory, campaign) == {0: 1, 1: 1}
+
+    chain.vote(campaign, 0, 2, '0x' + '04' * 20)
+    # A new process resumes from the stored checkpoint
+    assert make_indexer(chain, session_factory, batch_size=2).sync_once() == 1
+    assert tallies(session_factory, campaign) == {0: 2, 1: 1}
+
+    with session_factory() as db:
+        voters = set(db.scalars(select(VoteEvent.voter)).all())
+        stored = db.scalars(select(Campaign)).one()
+    assert voters == {'0x' + '01' * 20, '0x' + '02' * 20, '0x' + '04' * 20}
+    assert stored.creator == CREATOR
+
+
+def test_reorg_rolls_back_orphaned_events(session_factory):
+    chain = FakeChain()
+    campaign = '0x' + 'ab' * 20
+    chain.create_campaign(campaign)
+    fork_point = chain.vote(campaign, 0, 1, '0x' + '01' * 20)
+    chain.vote(campaign, 0, 2, '0x' + '02' * 20)
+    chain.vote(campaign, 0, 3, '0x' + '03' * 20)
+
+    indexer = make_indexer(chain, session_factory, batch_size=1)
+    indexer.sync_once()
+    assert tallies(session_factory, campaign) == {0: 3}
+    with session_factory() as db:
+        # As the fraud scorer would have flagged them
+        for event in db.scalars(select(VoteEvent)).all():
+            db.add(FlaggedVote(voter=event.voter, vote_event_id=event.id, tx_hash=event.tx_hash,
+                               log_index=event.log_index, block_number=event.block_number, reason='no_signals'))
+        db.commit()
+
+    chain.reorg(fork_point)
+    chain.vote(campaign, 1, 1, '0x' + '02' * 20)
+    chain.mine()
+    chain.mine()
+    indexer.sync_once()
+
+    assert tallies(session_factory, campaign) == {0: 1, 1: 1}
+    assert indexer.stats()['reorgs'] >= 1
+    with session_factory() as db:
+        assert [row.voter for row in db.scalars(select(FlaggedVote))] == ['0x' + '01' * 20]
+        # Readers of vote_events notice the rollback through the stored counter
+        assert db.get(IndexerCheckpoint, indexer.name).reorgs == indexer.stats()['reorgs']
+
+
+def test_shrinks_log_ranges_the_node_refuses(session_factory):
+    chain = FakeChain(max_log_range=3)
+    campaign = '0x' + 'ab' * 20
+    chain.create_campaign(campaign)
+    for i in range(10):
+        chain.vote(campaign, i % 2, i // 2 + 1, '0x%040x' % i)
+
+    make_indexer(chain, session_factory, batch_size=100).sync_once()
+
+    assert tallies(session_factory, campaign) == {0: 5, 1: 5}
+
+
+def test_campaign_api_reads_from_the_database(session_factory):
+    chain = FakeChain()
+    campaign = '0x' + 'ab' * 20
+    voter = '0x' + '01' * 20
+    chain.create_campaign(campaign)
+    chain.create_campaign('0x' + 'cd' * 20)
+    chain.vote(campaign, 1, 1, voter)
+    make_indexer(chain, session_factory).sync_once()
+    requests_after_indexing = chain.requests
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(campaign_routes.router)
+    app.dependency_overrides[get_user_db] = override_db
+    with TestClient(app) as client:
+        listed = client.get('/api/campaigns').json()
+        voted = client.get('/api/campaigns', params={'voter': voter.upper().replace('0X', '0x')}).json()
+        detail = client.get(f'/api/campaigns/{campaign}').json()
+        missing = client.get('/api/campaigns/0x' + '00' * 20)
+
+    assert [c['address'] for c in listed] == [campaign, '0x' + 'cd' * 20]
+    assert [c['total_votes'] for c in listed] == [1, 0]
+    assert [c['address'] for c in voted] == [campaign]
+    assert detail['tallies'] == [{'candidate_index': 1, 'votes': 1}]
+    assert detail['indexed_block'] == 3
+    assert missing.status_code == 404
+    assert chain.requests == requests_after_indexing
@@ -0,0 +1,145 @@
+import pytest
+import asyncio
+import json
+import os
+import sys
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.chain import VoteEvent, IndexerCheckpoint
+from app.utils.event_indexer import CHECKPOINT_NAME
+from app.utils.tally_stream import TallyHub, VoteEventSource, HEARTBEAT
+
+CAMPAIGN_A = '0x' + 'aa' * 20
+CAMPAIGN_B = '0x' + 'bb' * 20
+
+
+class MemorySource:
+    def __init__(self):
+        self.tallies = {}
+        self.changed = set()
+
+    def vote(self, campaign, candidate):
+        votes = self.tallies.setdefault(campaign, {})
+        votes[candidate] = votes.get(candidate, 0) + 1
+        self.changed.add(campaign)
+
+    def tally(self, campaign):
+        votes = self.tallies.get(campaign, {})
+        return {'tallies': [{'candidate_index': i, 'votes': n} for i, n in sorted(votes.items())],
+                'total_votes': sum(votes.values()), 'indexed_block': None}
+
+    def snapshot(self, campaigns):
+        return {c: self.tally(c) for c in campaigns}
+
+    def changes(self, campaigns):
+        changed, self.changed = self.changed & campaigns, set()
+        return {c: self.tally(c) for c in changed}
+
+
+def payload(message):
+    data = [line for line in message.decode().splitlines() if line.startswith('data: ')][0]
+    return json.loads(data[len('data: '):])
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'votes.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def add_votes(session_factory, campaign, candidates, block=1):
+    with session_factory() as db:
+        db.execute(insert(VoteEvent), [{
+            'campaign_address': campaign, 'candidate_index': c, 'vote_count': 0, 'voter': None,
+            'block_number': block, 'block_hash': '0x0', 'tx_hash': f'0x{campaign}{block}{i}', 'log_index': i,
+        } for i, c in enumerate(candidates)])
+        db.commit()
+
+
+def test_source_reports_only_changed_watched_campaigns(session_factory):
+    source = VoteEventSource(session_factory)
+    add_votes(session_factory, CAMPAIGN_A, [0, 1])
+
+    assert source.snapshot([CAMPAIGN_A])[CAMPAIGN_A]['total_votes'] == 2
+    assert source.changes({CAMPAIGN_A, CAMPAIGN_B}) == {}
+
+    add_votes(session_factory, CAMPAIGN_A, [1], block=2)
+    add_votes(session_factory, CAMPAIGN_B, [0], block=2)
+    changes = source.changes({CAMPAIGN_A})
+    assert list(changes) == [CAMPAIGN_A]
+    assert changes[CAMPAIGN_A]['tallies'] == [{'candidate_index': 0, 'votes': 1}, {'candidate_index': 1, 'votes': 2}]
+
+    # An indexer reorg rollback deletes rows and bumps the counter: every watched campaign is refreshed
+    with session_factory() as db:
+        db.execute(delete(VoteEvent).where(VoteEvent.block_number == 2))
+        db.add(IndexerCheckpoint(name=CHECKPOINT_NAME, block_number=1, reorgs=1))
+        db.commit()
+    changes = source.changes({CAMPAIGN_A, CAMPAIGN_B})
+    assert changes[CAMPAIGN_A]['total_votes'] == 2 and changes[CAMPAIGN_B]['total_votes'] == 0
+    assert source.changes({CAMPAIGN_A, CAMPAIGN_B}) == {}
+
+    # Polls read only rows above the last id seen
+    add_votes(session_factory, CAMPAIGN_B, [1], block=3)
+    assert list(source.changes({CAMPAIGN_A, CAMPAIGN_B})) == [CAMPAIGN_B]
+
+
+def test_subscribers_get_snapshot_then_coalesced_updates():
+    source = MemorySource()
+    source.vote(CAMPAIGN_A, 0)
+    hub = TallyHub(source, poll_interval=3600, name='test-coalesce')
+
+    async def main():
+        fast = await hub.subscribe(CAMPAIGN_A)
+        slow = await hub.subscribe(CAMPAIGN_A)
+        other = await hub.subscribe(CAMPAIGN_B)
+        first = await fast.next(1)
+
+        # A burst between two polls is one update
+        for _ in range(5):
+            source.vote(CAMPAIGN_A, 1)
+        await hub.poll_once()
+        second = await fast.next(1)
+
+        source.vote(CAMPAIGN_A, 2)
+        await hub.poll_once()
+        # The slow subscriber never read: it only sees the newest tally
+        slow_message = await slow.next(1)
+        nothing = await other.next(0.01)
+        idle = await other.next(0.01)
+        for subscription in (fast, slow, other):
+            hub.unsubscribe(subscription)
+        await hub.stop()
+        return first, second, slow_message, nothing, idle
+
+    first, second, slow_message, nothing, idle = asyncio.run(main())
+
+    assert payload(first)['total_votes'] == 1
+    assert payload(second)['tallies'][1] == {'candidate_index': 1, 'votes': 5}
+    assert payload(slow_message)['total_votes'] == 7
+    assert payload(nothing)['total_votes'] == 0   # snapshot of a campaign without votes
+    assert idle is None
+    stats = hub.stats()
+    assert stats['updates'] == 2 and stats['subscribers'] == 0 and stats['conflated'] >= 2
+
+
+def test_stream_sends_heartbeats_and_unsubscribes_on_close():
+    hub = TallyHub(MemorySource(), poll_interval=0.01, heartbeat_interval=0.01, name='test-heartbeat')
+
+    async def main():
+        stream = hub.stream(CAMPAIGN_A)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        connected = hub.stats()['subscribers']
+        await stream.aclose()
+        await hub.stop()
+        return chunks, connected
+
+    chunks, connected = asyncio.run(main())
+
+    assert chunks[0].startswith(b'id: ') and chunks[1] == HEARTBEAT
+    assert connected == 1
+    assert hub.stats()['subscribers'] == 0
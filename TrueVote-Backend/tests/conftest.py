@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# SQLite stands in for MySQL; must be set before app.utils.database creates its engine
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+# Registrations in the tests add faces to the duplicate-face index; keep it out of the source tree
+os.environ.setdefault('FACE_INDEX_DIR', tempfile.mkdtemp(prefix='truevote-face-index-'))
@@ -0,0 +1,160 @@
+import pytest
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.executors import BoundedPool, ExecutorBusyError
+
+
+def blocking_sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def make_thread_pool(name, workers, max_pending=100):
+    return BoundedPool(name, lambda: ThreadPoolExecutor(max_workers=workers), workers, max_pending)
+
+
+def test_blocking_calls_run_concurrently():
+    pool = make_thread_pool("test-concurrent", workers=8)
+
+    async def main():
+        start = time.perf_counter()
+        results = await asyncio.gather(*[pool.run(blocking_sleep, 0.1) for _ in range(8)])
+        return results, time.perf_counter() - start
+
+    try:
+        results, elapsed = asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    assert results == [0.1] * 8
+    # Serialized on the event loop this would take 0.8 s
+    assert elapsed < 0.4
+
+
+def test_event_loop_stays_responsive():
+    pool = make_thread_pool("test-responsive", workers=2)
+
+    async def main():
+        task = asyncio.ensure_future(pool.run(blocking_sleep, 0.2))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        tick = time.perf_counter() - start
+        await task
+        return tick
+
+    try:
+        assert asyncio.run(main()) < 0.1
+    finally:
+        pool.shutdown()
+
+
+def test_wait_time_and_queue_metrics():
+    pool = make_thread_pool("test-metrics", workers=1)
+
+    async def main():
+        tasks = [asyncio.ensure_future(pool.run(blocking_sleep, 0.05)) for _ in range(3)]
+        await asyncio.sleep(0)
+        peak = pool.stats()
+        await asyncio.gather(*tasks)
+        return peak
+
+    try:
+        peak = asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    assert peak["pending"] == 3
+    assert peak["queue_depth"] == 2
+    stats = pool.stats()
+    assert stats["pending"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["wait_seconds"]["count"] == 3
+    # The last task waited for the first two to finish
+    assert stats["wait_seconds"]["sum"] >= 0.1
+
+
+def test_rejects_when_full():
+    pool = make_thread_pool("test-full", workers=1, max_pending=1)
+
+    async def main():
+        first = asyncio.ensure_future(pool.run(blocking_sleep, 0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusyError):
+            await pool.run(blocking_sleep, 0.05)
+        await first
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["rejected"] == 1
+
+
+def test_errors_propagate_and_release_slot():
+    pool = make_thread_pool("test-errors", workers=1)
+
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(lambda: 1 / 0)
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    assert pool.pending == 0
+
+
+def test_process_pool():
+    pool = BoundedPool("test-process", lambda: ProcessPoolExecutor(max_workers=2), 2, 10)
+
+    async def main():
+        return await asyncio.gather(*[pool.run(pow, 2, n) for n in range(4)])
+
+    try:
+        assert asyncio.run(main()) == [1, 2, 4, 8]
+    finally:
+        pool.shutdown()
+
+
+# Set in each worker process by the patched biometric warmup
+WARMED = False
+
+
+def mark_warmed(load_liveness_model=True):
+    global WARMED
+    WARMED = True
+
+
+def worker_warmed():
+    time.sleep(0.05)
+    return os.getpid(), WARMED
+
+
+def test_every_cpu_worker_loads_the_models_before_its_first_task():
+    from app.utils import biometric_tasks, executors
+
+    with patch.object(executors, 'CPU_POOL_KIND', 'process'), \
+            patch.object(executors, 'CPU_POOL_SIZE', 2), \
+            patch.object(executors, 'STARTUP_WARMUP', ['biometrics']), \
+            patch.object(biometric_tasks, 'warmup', mark_warmed):
+        pool = BoundedPool("test-initializer", executors._cpu_executor, 2, 10)
+
+        async def main():
+            return await asyncio.gather(*[pool.run(worker_warmed) for _ in range(6)])
+
+        try:
+            results = asyncio.run(main())
+        finally:
+            pool.shutdown()
+
+    assert len({pid for pid, _ in results}) == 2
+    assert all(warmed for _, warmed in results)
@@ -0,0 +1,50 @@
+import pytest
+import os
+import sys
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi import HTTPException
+from app.routes import detect_fraud
+from app.routes.detect_fraud import validate_vote, validate_votes
+from app.schemas.fraud_detection import ElectionFraudDetectionRequest
+
+
+def generate_eth_address():
+    return "0x" + ''.join(random.choices('0123456789abcdefABCDEF', k=40))
+
+
+def generate_request():
+    return ElectionFraudDetectionRequest(**{
+        "Address": generate_eth_address(),
+        "Time Diff between first and last (Mins)": round(random.uniform(1, 100000), 1),
+        "Face Attempts": random.randint(1, 3),
+        "Detected As a Robot At Least Once": random.randint(0, 1),
+        "Face Match Percentage": round(random.uniform(30.0, 100.0), 1),
+        "Liveness Score of The Face": round(random.uniform(30.0, 100.0), 1),
+    })
+
+
+@pytest.mark.parametrize("size", [1, 7, 50])
+def test_batch_matches_single_predictions(size):
+    requests = [generate_request() for _ in range(size)]
+
+    batch = validate_votes(requests)
+    single = [validate_vote(request) for request in requests]
+
+    assert [r.Address for r in batch] == [r.Address for r in requests]
+    assert [r.is_fraud for r in batch] == [r.is_fraud for r in single]
+
+
+def test_empty_batch():
+    assert validate_votes([]) == []
+
+
+def test_batch_too_large(monkeypatch):
+    monkeypatch.setattr(detect_fraud, "VALIDATE_VOTES_MAX_BATCH", 2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        validate_votes([generate_request() for _ in range(3)])
+
+    assert exc_info.value.status_code == 413
@@ -0,0 +1,61 @@
+import pytest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.routes import detect_fraud
+from app.utils.fraud_inference import CompactFraudModel
+from app.utils.model import stacked_model_predict, pre_process_data
+from app.utils.model_registry import registry
+from app.utils.scripts.export_fraud_model import export
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), '..', '..', 'app', 'utils', 'datasets', 'test_data.csv')
+
+
+@pytest.fixture(scope="module")
+def features():
+    return pd.read_csv(TEST_DATA).drop(columns=['is_fraud'])
+
+
+@pytest.fixture(scope="module")
+def compact_model(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("export") / "fraud_model.npz")
+    export(path)
+    return CompactFraudModel.load(path)
+
+
+def test_predictions_match_stacked_model(features, compact_model):
+    expected = stacked_model_predict(features)
+    actual = compact_model.predict_frame(features)
+
+    assert list(actual['Address']) == list(expected['Address'])
+    np.testing.assert_array_equal(actual['is_fraud'], expected['is_fraud'])
+
+
+def test_stage_outputs_match(features, compact_model):
+    preprocessed = pre_process_data(features)
+    values = preprocessed.to_numpy()
+
+    expected_anomaly = registry.get('iso_forest').predict(preprocessed) == -1
+    np.testing.assert_array_equal(compact_model.is_anomaly(values), expected_anomaly)
+
+    expected_proba = registry.get('logistic_regression').predict_proba(preprocessed.drop(columns=['Address']))[:, 1]
+    np.testing.assert_allclose(compact_model.fraud_probability(values), expected_proba, rtol=0, atol=1e-12)
+
+
+def test_empty_input_raises(features, compact_model):
+    with pytest.raises(ValueError):
+        compact_model.predict_frame(features.head(0))
+
+
+def test_route_uses_compact_backend(monkeypatch, features, compact_model):
+    monkeypatch.setattr(detect_fraud, "FRAUD_MODEL_BACKEND", "compact")
+    monkeypatch.setattr(detect_fraud.compact_registry, "get", lambda name: compact_model)
+
+    batch = features.head(20)
+    result = detect_fraud.fraud_predict(batch)
+
+    np.testing.assert_array_equal(result['is_fraud'], stacked_model_predict(batch)['is_fraud'])
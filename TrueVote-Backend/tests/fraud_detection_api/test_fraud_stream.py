@@ -0,0 +1,286 @@
+import pytest
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.chain import VoteEvent
+from app.models.fraud import VoterSignals, FlaggedVote, FraudStreamCheckpoint, FraudStreamDeadLetter
+from app.utils.executors import io_pool
+from app.utils.fraud_stream import FraudStream, FlaggedVoteStore, VoteEventFeed, score_frame
+from app.utils.voter_signals import record_signals, load_signal_features
+
+CAMPAIGN = '0x' + 'ab' * 20
+HONEST = '0x' + 'a1' * 20
+SUSPICIOUS = '0x' + '02' * 20
+UNKNOWN = '0x' + '03' * 20
+
+
+def too_many_attempts(frame):
+    # Stand-in for the stacked model: flags more than three face attempts
+    return [attempts > 3 for attempts in frame['Face Attempts']]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fraud.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def add_signals(session_factory, wallet, attempts):
+    now = datetime(2026, 10, 18, 12, 0)
+    with session_factory() as db:
+        db.add(VoterSignals(wallet_address=wallet, first_seen_at=now, last_seen_at=now + timedelta(minutes=5),
+                            face_attempts=attempts, robot_detections=0, face_match_percentage=90.0, liveness_score=95.0))
+        db.commit()
+
+
+def add_votes(session_factory, voters, start=0):
+    with session_factory() as db:
+        db.execute(insert(VoteEvent), [{
+            'campaign_address': CAMPAIGN, 'candidate_index': 0, 'vote_count': i + 1, 'voter': voter,
+            'block_number': start + i, 'block_hash': '0x0', 'tx_hash': '0x%064x' % (start + i), 'log_index': 0,
+        } for i, voter in enumerate(voters)])
+        db.commit()
+
+
+def flagged(session_factory):
+    with session_factory() as db:
+        return sorted((row.voter, row.reason) for row in db.scalars(select(FlaggedVote)))
+
+
+async def wait_for_writes(stream, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while stream.stats()['stages']['write']['events'] < count:
+        assert time.monotonic() < deadline, stream.stats()
+        await asyncio.sleep(0.01)
+
+
+def test_record_signals_accumulates_per_wallet(session_factory):
+    async def main():
+        with session_factory() as db:
+            await record_signals(db, HONEST.upper().replace('0X', '0x'), face_attempt=True, face_match_percentage=40.0)
+            await record_signals(db, HONEST, face_attempt=True, face_match_percentage=92.5, liveness_score=88.0)
+            await record_signals(db, HONEST, robot=True)
+
+    asyncio.run(main())
+
+    with session_factory() as db:
+        features = load_signal_features(db, [HONEST, UNKNOWN])
+    assert list(features) == [HONEST]
+    _, attempts, robot, match, liveness = features[HONEST]
+    assert (attempts, robot, match, liveness) == (2, 1, 92.5, 88.0)
+
+
+def test_scores_indexed_votes_and_resumes_from_checkpoint(session_factory):
+    add_signals(session_factory, HONEST, attempts=1)
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+    add_votes(session_factory, [HONEST, SUSPICIOUS, UNKNOWN, HONEST])
+
+    def make_stream(name):
+        return FraudStream(FlaggedVoteStore(session_factory), feed=VoteEventFeed(session_factory),
+                           score=too_many_attempts, score_pool=io_pool, batch_size=3, batch_wait=0.01,
+                           poll_interval=0.01, name=name)
+
+    async def main():
+        stream = make_stream('test-feed')
+        stream.start()
+        await wait_for_writes(stream, 4)
+        await stream.stop()
+        stats = stream.stats()
+
+        # A new process only scores votes indexed after the checkpoint
+        add_votes(session_factory, [SUSPICIOUS], start=100)
+        resumed = make_stream('test-feed-resumed')
+        resumed.start()
+        await wait_for_writes(resumed, 1)
+        await resumed.stop()
+        return stats, resumed.stats()
+
+    stats, resumed = asyncio.run(main())
+
+    assert flagged(session_factory) == [(SUSPICIOUS, 'model'), (SUSPICIOUS, 'model'), (UNKNOWN, 'no_signals')]
+    assert stats['stages']['score']['events'] == 4 and stats['flagged'] == 2
+    assert resumed['stages']['feed']['events'] == 1
+    with session_factory() as db:
+        assert db.get(FraudStreamCheckpoint, 'vote_events').last_event_id == 5
+        row = db.scalars(select(FlaggedVote).where(FlaggedVote.reason == 'model')).first()
+    assert row.face_attempts == 7 and row.time_diff_mins == 5.0 and row.campaign_address == CAMPAIGN
+
+
+def test_full_pipeline_pushes_back_on_producers(session_factory):
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+
+    def slow_score(frame):
+        time.sleep(0.02)
+        return too_many_attempts(frame)
+
+    async def main():
+        stream = FraudStream(FlaggedVoteStore(session_factory), score=slow_score, score_pool=io_pool,
+                             batch_size=4, batch_wait=0.001, queue_size=4, name='test-backpressure')
+        # Fill the queue before the stages get to run
+        accepted = [stream.offer({'voter': SUSPICIOUS, 'tx_hash': '0x%064x' % i, 'log_index': 0}) for i in range(6)]
+        for i in range(6, 40):
+            await stream.submit({'voter': SUSPICIOUS, 'tx_hash': '0x%064x' % i, 'log_index': 0})
+        await stream.drain(timeout=5)
+        await stream.stop()
+        return accepted, stream.stats()
+
+    accepted, stats = asyncio.run(main())
+
+    assert accepted == [True] * 4 + [False] * 2
+    assert stats['rejected'] == 2 and stats['backpressure_seconds'] > 0
+    assert stats['stages']['write']['events'] == 38
+    assert stats['batch_size']['count'] >= 38 / 4
+    assert len(flagged(session_factory)) == 38
+
+
+def test_transient_failure_retries_without_losing_votes(session_factory):
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+
+    class FlakyStore(FlaggedVoteStore):
+        failures = 2
+
+        def write(self, flagged, last_event_id):
+            if self.failures:
+                self.failures -= 1
+                raise OperationalError('INSERT INTO flagged_votes', {}, Exception('database went away'))
+            super().write(flagged, last_event_id)
+
+    async def main():
+        stream = FraudStream(FlakyStore(session_factory), score=too_many_attempts, score_pool=io_pool,
+                             batch_wait=0.001, retry_delay=0.01, name='test-retry')
+        for i in range(3):
+            await stream.submit({'voter': SUSPICIOUS, 'tx_hash': '0x%064x' % i, 'log_index': 0})
+        await stream.drain(timeout=5)
+        await stream.stop()
+        return stream.stats()
+
+    stats = asyncio.run(main())
+
+    assert stats['stages']['write']['errors'] == 2
+    assert len(flagged(session_factory)) == 3
+
+
+def test_default_scorer_runs_the_fraud_model():
+    import pandas as pd
+    frame = pd.DataFrame({
+        'Address': [HONEST, SUSPICIOUS],
+        'Time Diff between first and last (Mins)': [5.0, 0.5],
+        'Face Attempts': [1, 9],
+        'Detected As a Robot At Least Once': [0, 1],
+        'Face Match Percentage': [92.0, 10.0],
+        'Liveness Score of The Face': [95.0, 5.0],
+    })
+
+    flags = score_frame(frame)
+
+    assert len(flags) == 2 and all(isinstance(flag, bool) for flag in flags)
+
+
+def test_permanent_failure_is_dead_lettered_and_the_stream_moves_on(session_factory):
+    add_signals(session_factory, HONEST, attempts=1)
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+    add_votes(session_factory, [SUSPICIOUS, HONEST])
+
+    class BrokenStore(FlaggedVoteStore):
+        def write(self, flagged, last_event_id):
+            if last_event_id == 1:
+                raise IntegrityError('INSERT INTO flagged_votes', {}, Exception('duplicate entry'))
+            super().write(flagged, last_event_id)
+
+    async def main():
+        stream = FraudStream(BrokenStore(session_factory), feed=VoteEventFeed(session_factory),
+                             score=too_many_attempts, score_pool=io_pool, batch_size=1, batch_wait=0.001,
+                             poll_interval=0.01, retry_delay=0.01, name='test-dead-letter')
+        stream.start()
+        await wait_for_writes(stream, 2)
+        add_votes(session_factory, [SUSPICIOUS], start=100)
+        await wait_for_writes(stream, 3)
+        await stream.stop()
+        return stream.stats()
+
+    stats = asyncio.run(main())
+
+    # Tried once, not retried forever
+    assert stats['stages']['write']['errors'] == 1 and stats['dead_lettered'] == 1
+    assert flagged(session_factory) == [(SUSPICIOUS, 'model')]
+    with session_factory() as db:
+        letter = db.scalars(select(FraudStreamDeadLetter)).one()
+        assert (letter.stage, letter.vote_event_id, letter.voter) == ('write', 1, SUSPICIOUS)
+        assert letter.error.startswith('IntegrityError')
+        assert db.get(FraudStreamCheckpoint, 'vote_events').last_event_id == 3
+
+
+def test_stream_halts_when_a_batch_can_be_neither_written_nor_dead_lettered(session_factory):
+    add_signals(session_factory, HONEST, attempts=1)
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+    add_votes(session_factory, [SUSPICIOUS, HONEST])
+
+    class BrokenStore(FlaggedVoteStore):
+        def write(self, flagged, last_event_id):
+            if last_event_id == 1:
+                raise IntegrityError('INSERT INTO flagged_votes', {}, Exception('duplicate entry'))
+            super().write(flagged, last_event_id)
+
+        def dead_letter(self, rows, last_event_id):
+            raise IntegrityError('INSERT INTO fraud_stream_dead_letters', {}, Exception('table is full'))
+
+    async def main():
+        stream = FraudStream(BrokenStore(session_factory), feed=VoteEventFeed(session_factory),
+                             score=too_many_attempts, score_pool=io_pool, batch_size=1, batch_wait=0.001,
+                             poll_interval=0.01, retry_delay=0.01, name='test-halt')
+        stream.start()
+        deadline = time.monotonic() + 5
+        while not stream.halted:
+            assert time.monotonic() < deadline, stream.stats()
+            await asyncio.sleep(0.01)
+        # The next batch is scored but never written past the lost one
+        await asyncio.sleep(0.1)
+        await stream.stop()
+        return stream.stats()
+
+    stats = asyncio.run(main())
+
+    assert stats['halted'].startswith('write') and stats['dead_lettered'] == 0
+    assert stats['stages']['write']['events'] == 0
+    assert flagged(session_factory) == []
+    with session_factory() as db:
+        # A restart resumes before the lost batch and scores it again
+        assert db.get(FraudStreamCheckpoint, 'vote_events') is None
+
+
+def test_vote_reinserted_after_a_reorg_replaces_its_flag(session_factory):
+    add_signals(session_factory, HONEST, attempts=1)
+    add_signals(session_factory, SUSPICIOUS, attempts=7)
+    add_votes(session_factory, [SUSPICIOUS, HONEST])
+
+    async def run(name, writes):
+        stream = FraudStream(FlaggedVoteStore(session_factory), feed=VoteEventFeed(session_factory),
+                             score=too_many_attempts, score_pool=io_pool, batch_wait=0.001,
+                             poll_interval=0.01, name=name)
+        stream.start()
+        await wait_for_writes(stream, writes)
+        await stream.stop()
+        return stream.stats()
+
+    asyncio.run(run('test-reorg-first', 2))
+    # The indexer rolls the vote back and stores the same log again under a new id
+    with session_factory() as db:
+        db.execute(delete(VoteEvent).where(VoteEvent.id == 1))
+        db.commit()
+    add_votes(session_factory, [SUSPICIOUS])
+    stats = asyncio.run(run('test-reorg-second', 1))
+
+    assert stats['stages']['write']['errors'] == 0
+    with session_factory() as db:
+        rows = db.scalars(select(FlaggedVote)).all()
+    assert [(row.vote_event_id, row.tx_hash, row.reason) for row in rows] == [(3, '0x%064x' % 0, 'model')]
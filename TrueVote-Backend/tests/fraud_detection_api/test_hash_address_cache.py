@@ -0,0 +1,60 @@
+import pytest
+import os
+import sys
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils import address_hash
+from app.utils.model import hash_address, address_hash_cache_stats, configure_address_hash_cache
+
+
+def generate_eth_address():
+    return "0x" + ''.join(random.choices('0123456789abcdefABCDEF', k=40))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    configure_address_hash_cache(address_hash.ADDRESS_HASH_CACHE_SIZE)
+    yield
+    configure_address_hash_cache(address_hash.ADDRESS_HASH_CACHE_SIZE)
+
+
+def test_cached_value_matches_uncached():
+    address = generate_eth_address()
+    expected = address_hash._normalized_address.__wrapped__(address)
+
+    assert hash_address(address) == expected
+    assert hash_address(address) == expected
+    assert 0.0 <= expected <= 1.0
+
+
+def test_repeated_addresses_hit_cache():
+    addresses = [generate_eth_address() for _ in range(5)]
+    for _ in range(3):
+        for address in addresses:
+            hash_address(address)
+
+    stats = address_hash_cache_stats()
+    assert stats["misses"] == 5
+    assert stats["hits"] == 10
+    assert stats["evictions"] == 0
+
+
+def test_evictions_counted_when_full():
+    configure_address_hash_cache(2)
+    for address in [generate_eth_address() for _ in range(5)]:
+        hash_address(address)
+
+    stats = address_hash_cache_stats()
+    assert stats["size"] == 2
+    assert stats["maxsize"] == 2
+    assert stats["evictions"] == 3
+
+
+@pytest.mark.parametrize("address", [None, 123, b"0xabc"])
+def test_invalid_address_not_cached(address):
+    with pytest.raises(ValueError):
+        hash_address(address)
+
+    assert address_hash_cache_stats()["size"] == 0
@@ -0,0 +1,82 @@
+import pytest
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.model_registry import ModelRegistry
+
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.fixture
+def artifact_files(tmp_path):
+    paths = {}
+    for name in ["scaler", "model"]:
+        path = tmp_path / f"{name}.txt"
+        path.write_text(f"{name}-v1")
+        paths[name] = str(path)
+    return paths
+
+
+def test_artifacts_loaded_once(artifact_files):
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        return read_text(path)
+
+    registry = ModelRegistry(artifact_files, loader=loader)
+    registry.load_all()
+
+    for _ in range(5):
+        assert registry.get("scaler") == "scaler-v1"
+        assert registry.get("model") == "model-v1"
+
+    assert len(calls) == 2
+
+
+def test_lazy_load_on_first_get(artifact_files):
+    registry = ModelRegistry(artifact_files, loader=read_text)
+
+    assert registry.get("model") == "model-v1"
+    assert registry.stats()["loaded"] == ["model"]
+
+
+def test_reload_if_changed(artifact_files):
+    registry = ModelRegistry(artifact_files, loader=read_text)
+    registry.load_all()
+    assert registry.reload_if_changed() is False
+
+    time.sleep(0.01)
+    with open(artifact_files["model"], "w") as f:
+        f.write("model-v2-updated")
+
+    assert registry.changed() == ["model"]
+    assert registry.reload_if_changed() is True
+    assert registry.get("model") == "model-v2-updated"
+    assert registry.generation == 2
+
+
+def test_failed_reload_keeps_previous_generation(artifact_files):
+    fail = {"enabled": False}
+
+    def loader(path):
+        if fail["enabled"]:
+            raise ValueError("corrupt artifact")
+        return read_text(path)
+
+    registry = ModelRegistry(artifact_files, loader=loader)
+    registry.load_all()
+
+    with open(artifact_files["scaler"], "w") as f:
+        f.write("scaler-v2-partial")
+    fail["enabled"] = True
+
+    assert registry.reload_if_changed() is False
+    assert registry.get("scaler") == "scaler-v1"
+    assert registry.generation == 1
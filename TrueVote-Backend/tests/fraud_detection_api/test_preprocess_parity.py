@@ -0,0 +1,46 @@
+import pytest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.model import FEATURE_COLUMNS, pre_process_array, pre_process_data, pre_process_data_dataframe
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), '..', '..', 'app', 'utils', 'datasets', 'test_data.csv')
+
+
+@pytest.fixture(scope="module")
+def features():
+    return pd.read_csv(TEST_DATA).drop(columns=['is_fraud']).head(500)
+
+
+def test_array_path_is_bit_identical(features):
+    expected = pre_process_data_dataframe(features).to_numpy()
+    actual = pre_process_array(features)
+
+    assert actual.dtype == np.float64
+    assert actual.flags['C_CONTIGUOUS']
+    assert np.array_equal(actual, expected)
+
+
+def test_dataframe_wrapper_keeps_columns(features):
+    preprocessed = pre_process_data(features.head(3))
+
+    assert isinstance(preprocessed, pd.DataFrame)
+    assert list(preprocessed.columns) == FEATURE_COLUMNS
+
+
+def test_column_order_does_not_matter(features):
+    shuffled = features[FEATURE_COLUMNS[::-1]]
+
+    assert np.array_equal(pre_process_array(shuffled), pre_process_array(features))
+
+
+def test_invalid_address_raises(features):
+    bad = features.head(2).copy()
+    bad['Address'] = [None, "0xabc"]
+
+    with pytest.raises(ValueError):
+        pre_process_array(bad)
@@ -0,0 +1,69 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models import model
+from app.models.liveness_backends import quantize, dequantize, load_backend
+from app.utils.scripts.convert_liveness_model import FIXTURES_DIR, load_images
+
+# Largest acceptable difference from the Keras score; quantized models drift slightly
+SCORE_TOLERANCE = 0.05
+
+
+class ConstantBackend:
+    def __init__(self, scores):
+        self.scores = np.asarray(scores, dtype=np.float32)
+
+    def predict_scores(self, img_arrays):
+        return self.scores[:len(img_arrays)]
+
+
+def test_quantize_round_trip_within_one_step():
+    values = np.linspace(0, 1, 1000, dtype=np.float32)
+    scale, zero_point = 1 / 255, -128
+
+    restored = dequantize(quantize(values, scale, zero_point, np.int8), scale, zero_point)
+
+    assert np.max(np.abs(restored - values)) <= scale / 2 + 1e-7
+
+
+def test_quantize_saturates():
+    assert quantize(np.array([-5.0, 5.0]), 1 / 255, -128, np.int8).tolist() == [-128, 127]
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        load_backend('tensorrt', 'model.plan')
+
+
+def test_predict_batch_labels_scores(monkeypatch):
+    monkeypatch.setattr(model, 'backend', ConstantBackend([0.9, 0.2]))
+
+    assert model.predict_batch(np.zeros((2, 224, 224, 3), dtype=np.float32)) == [
+        (pytest.approx(0.9), "Live"), (pytest.approx(0.2), "Spoof")
+    ]
+
+
+@pytest.mark.parametrize('backend', ['tflite', 'onnx'])
+def test_converted_model_matches_keras(backend):
+    keras_path = model.LIVENESS_MODEL_PATHS['keras']
+    converted_path = model.LIVENESS_MODEL_PATHS[backend]
+    for path in (keras_path, converted_path):
+        if not os.path.exists(path):
+            pytest.skip(f"{path} not available")
+    pytest.importorskip('tensorflow')
+    if backend == 'onnx':
+        pytest.importorskip('onnxruntime')
+
+    images = load_images(FIXTURES_DIR)
+    reference = load_backend('keras', keras_path).predict_scores(images)
+    scores = load_backend(backend, converted_path).predict_scores(images)
+
+    np.testing.assert_allclose(scores, reference, atol=SCORE_TOLERANCE)
+    assert ((scores > 0.5) == (reference > 0.5)).all()
+    # Batched and single-image calls agree (TFLite resizes its input tensor per batch size)
+    single = np.array([load_backend(backend, converted_path).predict_scores(image[np.newaxis])[0] for image in images])
+    np.testing.assert_allclose(single, scores, atol=1e-5)
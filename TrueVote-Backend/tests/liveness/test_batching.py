@@ -0,0 +1,130 @@
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.batching import BatcherStoppedError, MicroBatcher
+
+
+class RecordingModel:
+    """Stand-in for the Keras model: returns the mean of each input and records batch sizes."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.batch_sizes = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, batch):
+        self.batch_sizes.append(len(batch))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("inference failed")
+        return [float(item.mean()) for item in batch]
+
+
+def test_concurrent_requests_are_batched():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=8, max_latency=0.05)
+
+    async def main():
+        results = await asyncio.gather(*[batcher.submit(np.full((2, 2), i, dtype=np.float32)) for i in range(20)])
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    # Every caller gets the output for its own input
+    assert results == [float(i) for i in range(20)]
+    assert sum(model.batch_sizes) == 20
+    assert max(model.batch_sizes) == 8
+    assert len(model.batch_sizes) < 20
+
+
+def test_single_request_flushed_after_max_latency():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=32, max_latency=0.02)
+
+    async def main():
+        start = time.perf_counter()
+        result = await batcher.submit(np.ones(3, dtype=np.float32))
+        elapsed = time.perf_counter() - start
+        await batcher.stop()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(main())
+
+    assert result == 1.0
+    assert model.batch_sizes == [1]
+    assert 0.015 <= elapsed < 0.5
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    batcher = MicroBatcher(RecordingModel(fail=True), max_batch_size=4, max_latency=0.01)
+
+    async def main():
+        results = await asyncio.gather(*[batcher.submit(np.zeros(2)) for _ in range(4)], return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_requests_queue_while_batch_runs():
+    model = RecordingModel(delay=0.05)
+    batcher = MicroBatcher(model, max_batch_size=16, max_latency=0.001, name="test-queue-while-running")
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit(np.zeros(1)))
+        await asyncio.sleep(0.01)
+        rest = [asyncio.ensure_future(batcher.submit(np.zeros(1))) for _ in range(10)]
+        await asyncio.gather(first, *rest)
+        await batcher.stop()
+
+    asyncio.run(main())
+
+    # Work that arrives while a batch is running is coalesced into the next one
+    assert model.batch_sizes[0] == 1
+    assert len(model.batch_sizes) <= 3
+    assert batcher.stats()["batch_size"]["count"] == len(model.batch_sizes)
+
+
+def test_malformed_item_fails_its_batch_instead_of_hanging():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=4, max_latency=0.01, name="test-malformed")
+
+    async def main():
+        # Shapes do not stack; every caller in the batch gets the error
+        batch = asyncio.gather(batcher.submit(np.zeros(2)), batcher.submit(np.zeros(3)), return_exceptions=True)
+        results = await asyncio.wait_for(batch, 1)
+        # The slot was released, so later requests are still served
+        after = await asyncio.wait_for(batcher.submit(np.ones(2)), 1)
+        await batcher.stop()
+        return results, after
+
+    results, after = asyncio.run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert after == 1.0
+
+
+def test_stop_fails_requests_still_queued():
+    model = RecordingModel(delay=0.05)
+    batcher = MicroBatcher(model, max_batch_size=1, max_latency=0.001, name="test-stop")
+
+    async def main():
+        pending = [asyncio.ensure_future(batcher.submit(np.zeros(1))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), 1)
+
+    results = asyncio.run(main())
+
+    # The batch already running completes; nothing left in the queue is abandoned
+    assert results[0] == 0.0
+    assert all(isinstance(r, BatcherStoppedError) for r in results[1:])
@@ -0,0 +1,68 @@
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils import biometric_tasks
+from app.utils.image_preprocess import (
+    decode_image, face_crop_box, preprocess_face, preprocess_faces, preprocess_image_from_array,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+# (top, right, bottom, left) found by face_recognition in live_1.jpg
+LIVE_FACE = (38, 204, 113, 129)
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return decode_image(f.read())
+
+
+@pytest.mark.parametrize('name', sorted(os.listdir(FIXTURES)))
+def test_whole_frame_matches_current_path(name):
+    img = fixture(name)
+
+    np.testing.assert_array_equal(preprocess_face(img), preprocess_image_from_array(img)[0])
+
+
+def test_face_crop_matches_current_path_on_the_cropped_region():
+    img = fixture('live_1.jpg')
+    top, bottom, left, right = face_crop_box(LIVE_FACE, img.shape, margin=0.25)
+
+    crop = preprocess_face(img, LIVE_FACE, margin=0.25)
+
+    assert (top, bottom, left, right) == (20, 131, 111, 222)
+    assert crop.shape == (224, 224, 3) and crop.dtype == np.float32
+    np.testing.assert_array_equal(crop, preprocess_image_from_array(img[top:bottom, left:right])[0])
+
+
+def test_crop_box_stays_inside_the_image():
+    assert face_crop_box((0, 100, 80, 10), (90, 100, 3), margin=0.5) == (0, 90, 0, 100)
+
+
+def test_batch_reuses_the_buffer():
+    images = [fixture('live_1.jpg'), fixture('spoof_2.jpg'), fixture('spoof_1.jpg')]
+    locations = [LIVE_FACE, LIVE_FACE, None]
+    buffer = np.empty((8, 224, 224, 3), dtype=np.float32)
+
+    batch = preprocess_faces(images, locations, out=buffer)
+
+    assert batch.shape == (3, 224, 224, 3) and np.shares_memory(batch, buffer)
+    for row, img, location in zip(batch, images, locations):
+        np.testing.assert_array_equal(row, preprocess_face(img, location))
+
+
+@pytest.mark.parametrize('mode, location', [('frame', None), ('face', LIVE_FACE)])
+def test_verification_feeds_the_configured_input_to_liveness(mode, location):
+    img = fixture('live_1.jpg')
+
+    with patch.object(biometric_tasks, 'LIVENESS_CROP', mode), \
+            patch.object(biometric_tasks, 'decode_image', return_value=img), \
+            patch.object(biometric_tasks, 'detect_faces', return_value=[LIVE_FACE]), \
+            patch.object(biometric_tasks, 'compare_face_to_encoding', return_value={'error': None}):
+        result = biometric_tasks.verify_biometric(b'image bytes', np.zeros(128))
+
+    np.testing.assert_array_equal(result['liveness_input'], preprocess_face(img, location))
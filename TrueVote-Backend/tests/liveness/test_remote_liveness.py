@@ -0,0 +1,51 @@
+import asyncio
+import io
+import os
+import sys
+import numpy as np
+from PIL import Image
+from unittest.mock import patch
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils import liveness
+from app.utils.image_preprocess import preprocess_image_from_array
+
+
+def test_png_round_trip_is_exact():
+    pixels = np.random.default_rng(0).integers(0, 256, size=(300, 200, 3), dtype=np.uint8)
+    img_array = preprocess_image_from_array(pixels)[0]
+
+    with Image.open(io.BytesIO(liveness._encode_png(img_array))) as decoded:
+        restored = np.asarray(decoded, dtype=np.float32) / 255.0
+
+    np.testing.assert_array_equal(restored, img_array)
+
+
+def test_remote_batch_posts_every_frame():
+    received = []
+
+    def handler(request):
+        received.append(request)
+        return httpx.Response(200, json=[{"prediction": 0.9, "label": "Live"}, {"prediction": 0.1, "label": "Spoof"}])
+
+    batch = np.zeros((2, 224, 224, 3), dtype=np.float32)
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(liveness, '_client', client), patch.object(liveness, 'LIVENESS_API_URL', 'http://liveness:8000'):
+            first = await liveness._run_batch(batch)
+            second = await liveness._run_batch(batch)
+            # Both batches went through the one shared client
+            assert liveness._client is client
+            await liveness.aclose_liveness_client()
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first == second == [(0.9, "Live"), (0.1, "Spoof")]
+    assert len(received) == 2
+    assert str(received[0].url) == 'http://liveness:8000/predict/batch'
+    assert received[0].content.count(b'filename="frame') == 2
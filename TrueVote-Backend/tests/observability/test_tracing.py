@@ -0,0 +1,168 @@
+import pytest
+import asyncio
+import json
+import logging
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.utils import log
+from app.utils.metrics import MetricsRegistry, metrics
+from app.utils.tracing import RequestMetricsMiddleware, capture, record_all, span
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(log.JsonFormatter().format(record)))
+
+
+@pytest.fixture
+def records():
+    handler = Records()
+    root = logging.getLogger(log.ROOT_LOGGER)
+    root.addHandler(handler)
+    yield handler.lines
+    root.removeHandler(handler)
+
+
+def stage(name, **labels):
+    return metrics.histogram('stage_seconds', labels={'stage': name, **labels})
+
+
+def request(app, method, url):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            return await client.request(method, url)
+    return asyncio.run(main())
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter('jobs_total', 'Jobs\ndone', {'queue': 'a "b"'}).inc(3)
+    registry.gauge('depth', 'Queue depth').set(2.5)
+    histogram = registry.histogram('job_seconds', 'Job time', {'queue': 'a'}, buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    lines = registry.prometheus_text().splitlines()
+
+    assert lines == [
+        '# HELP depth Queue depth',
+        '# TYPE depth gauge',
+        'depth 2.5',
+        '# HELP job_seconds Job time',
+        '# TYPE job_seconds histogram',
+        'job_seconds_bucket{queue="a",le="0.1"} 1',
+        'job_seconds_bucket{queue="a",le="1"} 2',
+        'job_seconds_bucket{queue="a",le="+Inf"} 2',
+        'job_seconds_sum{queue="a"} 0.55',
+        'job_seconds_count{queue="a"} 2',
+        '# HELP jobs_total Jobs\\ndone',
+        '# TYPE jobs_total counter',
+        'jobs_total{queue="a \\"b\\""} 3',
+    ]
+
+
+def test_span_records_duration_and_errors():
+    with span('test_span_ok', model='a'):
+        pass
+    with pytest.raises(ValueError):
+        with span('test_span_failing'):
+            raise ValueError('boom')
+
+    assert stage('test_span_ok', model='a').count == 1
+    assert stage('test_span_failing').count == 1
+    assert metrics.counter('stage_errors_total', labels={'stage': 'test_span_failing'}).value == 1
+    assert metrics.counter('stage_errors_total', labels={'stage': 'test_span_ok', 'model': 'a'}).value == 0
+
+
+def test_captured_spans_are_recorded_by_the_caller():
+    # As in a CPU pool worker: nothing is recorded until the caller gets the stages back
+    with capture() as stages:
+        with span('test_capture_decode'):
+            pass
+    assert stage('test_capture_decode').count == 0
+    assert [(name, error) for name, _, error, _ in stages] == [('test_capture_decode', False)]
+
+    record_all(stages)
+
+    assert stage('test_capture_decode').count == 1
+
+
+def test_middleware_counts_requests_by_route_template(records):
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get('/test-items/{item_id}')
+    async def item(item_id: int):
+        with span('test_middleware_lookup'):
+            if item_id == 0:
+                raise HTTPException(status_code=404)
+        return {'id': item_id}
+
+    with patch.object(log, 'LOG_SAMPLE_RATE', 1.0):
+        for url in ('/test-items/1', '/test-items/2', '/test-items/0', '/test-missing'):
+            request(app, 'GET', url)
+
+    route = {'method': 'GET', 'route': '/test-items/{item_id}'}
+    assert metrics.counter('http_requests_total', labels={**route, 'status': 200}).value == 2
+    assert metrics.counter('http_requests_total', labels={**route, 'status': 404}).value == 1
+    assert metrics.histogram('http_request_seconds', labels=route).count == 3
+    unmatched = {'method': 'GET', 'route': 'unmatched', 'status': 404}
+    assert metrics.counter('http_requests_total', labels=unmatched).value >= 1
+
+    logged = [line for line in records if line['event'] == 'request']
+    assert len(logged) == 4
+    assert logged[0]['route'] == '/test-items/{item_id}' and logged[0]['status'] == 200
+    assert set(logged[0]['stages']) == {'test_middleware_lookup'}
+
+
+def test_metrics_endpoint_exports_prometheus_text():
+    from app.main import app
+
+    request(app, 'GET', '/health')
+    response = request(app, 'GET', '/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert '# TYPE http_request_seconds histogram' in response.text
+
+
+def test_sampled_events_are_dropped_but_warnings_are_kept(records):
+    logger = log.get_logger('test_sampling')
+
+    with patch.object(log, 'LOG_SAMPLE_RATE', 0.0):
+        log.log_event(logger, 'hot_path', sample=True, n=1)
+        log.log_event(logger, 'degraded', logging.WARNING, sample=True, n=2)
+        log.log_event(logger, 'unsampled', n=3)
+
+    assert [(line['event'], line['level'], line['n']) for line in records] == [
+        ('degraded', 'warning', 2), ('unsampled', 'info', 3),
+    ]
+
+
+def test_fraud_debug_events_go_through_the_fraud_logger(records):
+    from app.utils import address_hash
+
+    address = '0x' + 'ab' * 20
+    address_hash.hash_address(address)
+    address_hash.logger.setLevel(logging.DEBUG)
+    try:
+        address_hash.hash_address(address)
+    finally:
+        address_hash.logger.setLevel(logging.NOTSET)
+
+    # Written once, by the call made at FRAUD_DEBUG's level
+    assert [(line['logger'], line['event'], line['address']) for line in records] == [
+        ('truevote.fraud', 'hash_address', address),
+    ]
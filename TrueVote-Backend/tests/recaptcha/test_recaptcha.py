@@ -0,0 +1,204 @@
+import pytest
+import asyncio
+import os
+import sys
+from urllib.parse import parse_qs
+
+import httpx
+from datetime import datetime
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.fraud import VoterSignals
+from app.routes import verify_captcha
+from app.utils.database import get_user_db
+from app.utils.recaptcha import RecaptchaVerifier, RecaptchaUnavailableError
+
+
+class StubEndpoint:
+    """Local stand-in for siteverify that can fail its first `failures` calls."""
+
+    def __init__(self, failures=0, status=503, latency=0.0):
+        self.failures = failures
+        self.status = status
+        self.latency = latency
+        self.calls = []
+
+    async def __call__(self, request):
+        self.calls.append(parse_qs(request.content.decode()))
+        await asyncio.sleep(self.latency)
+        if len(self.calls) <= self.failures:
+            if self.status is None:
+                raise httpx.ConnectError('connection refused', request=request)
+            return httpx.Response(self.status)
+        return httpx.Response(200, json={'success': True, 'hostname': 'localhost'})
+
+
+def make_verifier(endpoint, name, **kwargs):
+    kwargs.setdefault('retry_backoff', 0)
+    return RecaptchaVerifier(url='http://recaptcha.stub/siteverify', secret='secret',
+                             transport=httpx.MockTransport(endpoint), name=name, **kwargs)
+
+
+def run(verifier, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await verifier.aclose()
+    return asyncio.run(main())
+
+
+def test_posts_secret_and_token_to_configured_endpoint():
+    endpoint = StubEndpoint()
+    verifier = make_verifier(endpoint, 'test-post')
+
+    result = run(verifier, verifier.verify('token-1'))
+
+    assert result['success'] is True
+    assert endpoint.calls == [{'secret': ['secret'], 'response': ['token-1']}]
+
+
+def test_retries_only_requests_that_were_never_sent():
+    endpoint = StubEndpoint(failures=2, status=None)
+    verifier = make_verifier(endpoint, 'test-retry-connect', retries=2)
+
+    assert run(verifier, verifier.verify('token'))['success'] is True
+    assert len(endpoint.calls) == 3
+    assert verifier.stats()['retries'] == 2
+
+    # A 5xx or a read timeout may have consumed the single-use token: fail instead of resending it
+    async def read_timeout(request):
+        raise httpx.ReadTimeout('no response', request=request)
+
+    for name, handler in (('test-no-retry-5xx', StubEndpoint(failures=1)), ('test-no-retry-read', read_timeout)):
+        verifier = make_verifier(handler, name, retries=2)
+        with pytest.raises(RecaptchaUnavailableError):
+            run(verifier, verifier.verify('token'))
+        assert verifier.stats()['retries'] == 0
+
+
+def test_duplicate_after_a_retry_is_not_a_failed_captcha():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            # Reported as a connect failure, yet siteverify saw the token
+            raise httpx.ConnectTimeout('connect timeout', request=request)
+        return httpx.Response(200, json={'success': False, 'error-codes': ['timeout-or-duplicate']})
+
+    verifier = make_verifier(handler, 'test-retry-duplicate', retries=1)
+
+    with pytest.raises(RecaptchaUnavailableError):
+        run(verifier, verifier.verify('token'))
+    assert len(attempts) == 2
+
+
+def test_gives_up_after_retries():
+    endpoint = StubEndpoint(failures=10, status=None)
+    verifier = make_verifier(endpoint, 'test-give-up', retries=1)
+
+    with pytest.raises(RecaptchaUnavailableError):
+        run(verifier, verifier.verify('token'))
+    assert len(endpoint.calls) == 2
+    assert verifier.stats()['failures'] == 1
+
+
+def test_identical_tokens_are_deduplicated():
+    endpoint = StubEndpoint(latency=0.05)
+    verifier = make_verifier(endpoint, 'test-dedup')
+
+    async def main():
+        concurrent = await asyncio.gather(*[verifier.verify('same', 'client-a') for _ in range(5)])
+        later = await verifier.verify('same', 'client-a')
+        other = await verifier.verify('other', 'client-a')
+        return concurrent, later, other
+
+    concurrent, later, other = run(verifier, main())
+
+    assert len(endpoint.calls) == 2
+    assert all(result['success'] for result in concurrent + [later, other])
+    stats = verifier.stats()
+    assert stats['coalesced'] == 4
+    assert stats['cache_hits'] == 1
+    assert stats['verify_seconds']['count'] == 2
+
+
+def test_verdict_is_never_shared_with_another_requester():
+    endpoint = StubEndpoint()
+    verifier = make_verifier(endpoint, 'test-dedup-requester')
+
+    async def main():
+        await verifier.verify('solved', 'client-a')
+        await verifier.verify('solved', 'client-b')
+        await verifier.verify('solved')
+        await verifier.verify('solved')
+
+    run(verifier, main())
+
+    # siteverify sees every replay and rejects it as a duplicate
+    assert len(endpoint.calls) == 4
+    assert verifier.stats()['cache_hits'] == 0
+
+
+def test_failures_are_not_cached():
+    endpoint = StubEndpoint(failures=1)
+    verifier = make_verifier(endpoint, 'test-no-cache-failure', retries=0)
+
+    async def main():
+        with pytest.raises(RecaptchaUnavailableError):
+            await verifier.verify('token', 'client-a')
+        return await verifier.verify('token', 'client-a')
+
+    assert run(verifier, main())['success'] is True
+    assert len(endpoint.calls) == 2
+
+
+def test_route_returns_verdict_and_502_when_unavailable(monkeypatch):
+    app = FastAPI()
+    app.include_router(verify_captcha.router)
+
+    monkeypatch.setattr(verify_captcha, 'recaptcha_verifier', make_verifier(StubEndpoint(), 'test-route-ok'))
+    with TestClient(app) as client:
+        assert client.post('/verify-captcha', json={'token': 't'}).json()['success'] is True
+
+    broken = make_verifier(StubEndpoint(failures=10), 'test-route-down', retries=0)
+    monkeypatch.setattr(verify_captcha, 'recaptcha_verifier', broken)
+    with TestClient(app) as client:
+        assert client.post('/verify-captcha', json={'token': 't'}).status_code == 502
+
+
+def test_forged_session_cookie_does_not_touch_another_wallets_signals(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'signals.db'}")
+    Base.metadata.create_all(engine, tables=[VoterSignals.__table__])
+    Session = sessionmaker(bind=engine)
+    now = datetime(2026, 1, 1)
+    with Session() as db:
+        db.add(VoterSignals(wallet_address='0xvictim', first_seen_at=now, last_seen_at=now))
+        db.commit()
+
+    def session():
+        with Session() as db:
+            yield db
+
+    async def rejecting(request):
+        return httpx.Response(200, json={'success': False})
+
+    app = FastAPI()
+    app.include_router(verify_captcha.router)
+    app.dependency_overrides[get_user_db] = session
+    monkeypatch.setattr(verify_captcha, 'recaptcha_verifier', make_verifier(rejecting, 'test-route-forged'))
+    with TestClient(app) as client:
+        # The cookie is unsigned: anyone can claim to be any wallet
+        client.cookies.set('wallet_address', '0xvictim')
+        assert client.post('/verify-captcha', json={'token': 'bad'}).json()['success'] is False
+
+    with Session() as db:
+        signals = db.get(VoterSignals, '0xvictim')
+        assert signals.robot_detections == 0 and signals.last_seen_at == now
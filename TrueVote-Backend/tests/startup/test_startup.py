@@ -0,0 +1,62 @@
+import pytest
+import asyncio
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.warmup import Warmup
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+HEAVY_MODULES = ['tensorflow', 'face_recognition', 'dlib', 'boto3', 'sklearn', 'xgboost', 'joblib']
+
+
+def test_importing_app_does_not_load_heavy_subsystems():
+    env = dict(os.environ, DB_USER='user', DB_PASSWORD='password', DB_HOST='localhost', DB_PORT='3306', DB_NAME='truevote')
+    code = f"import sys, app.main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0 and 'ModuleNotFoundError' in result.stderr:
+        pytest.skip(result.stderr.strip().splitlines()[-1])
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_warmup_reports_ready_after_all_steps():
+    warmup = Warmup()
+    loaded = []
+
+    async def step():
+        await asyncio.sleep(0.01)
+        loaded.append(True)
+
+    warmup.add('models', step)
+    warmup.add('libraries', step)
+    assert not warmup.ready
+
+    asyncio.run(warmup.run())
+
+    assert warmup.ready
+    assert len(loaded) == 2
+    assert warmup.status()['steps']['models']['status'] == 'ready'
+
+
+def test_warmup_failure_keeps_service_not_ready():
+    warmup = Warmup()
+
+    async def ok():
+        pass
+
+    async def broken():
+        raise ModuleNotFoundError("No module named 'tensorflow'")
+
+    warmup.add('fraud_models', ok)
+    warmup.add('biometrics', broken)
+    asyncio.run(warmup.run())
+
+    status = warmup.status()
+    assert not status['ready']
+    assert status['steps']['fraud_models']['status'] == 'ready'
+    assert status['steps']['biometrics']['status'] == 'failed'
+    assert 'tensorflow' in status['steps']['biometrics']['error']
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+import io
+import os
+import sys
+import threading
+import numpy as np
+from unittest.mock import patch
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.user import User
+from app.controllers import user_controller
+from app.utils import database
+from app.utils.metrics import metrics
+
+
+class InlinePool:
+    """Runs CPU pool work inline so the face encoder can be patched."""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'users.db'
+    Base.metadata.create_all(create_engine(f'sqlite:///{path}'))
+    return path
+
+
+@pytest.fixture
+def sync_session(db_path):
+    session = sessionmaker(bind=create_engine(f'sqlite:///{db_path}'))()
+    yield session
+    session.close()
+
+
+def async_session_factory(db_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{db_path}')
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def register(db, wallet, email):
+    upload = UploadFile(file=io.BytesIO(b'image bytes'), filename='face.png')
+    with patch.object(user_controller, 'upload_s3_object'), \
+            patch.object(user_controller, 'cpu_pool', InlinePool()), \
+            patch.object(user_controller, 'enrollment_encoding', return_value=np.zeros(128)):
+        return await user_controller.register_user(db, wallet, 'Ada', 'Lovelace', email, upload)
+
+
+def test_register_and_lookup_with_sync_session(sync_session):
+    async def main():
+        await register(sync_session, '0xabc', 'ada@example.com')
+        return await user_controller.get_user_by_wallet(sync_session, '0xabc')
+
+    user = asyncio.run(main())
+
+    assert user.email == 'ada@example.com'
+    assert user.face_encoding is not None
+
+
+def test_register_and_lookup_with_async_session(db_path):
+    async def main():
+        engine, factory = async_session_factory(db_path)
+        async with factory() as db:
+            await register(db, '0xdef', 'grace@example.com')
+        async with factory() as db:
+            user = await user_controller.get_user_by_wallet(db, '0xdef')
+            missing = await user_controller.get_user_by_wallet(db, '0x000')
+        await engine.dispose()
+        return user, missing
+
+    user, missing = asyncio.run(main())
+
+    assert user.first_name == 'Ada'
+    assert missing is None
+
+
+def test_async_session_sees_rows_written_by_sync_session(db_path, sync_session):
+    sync_session.add(User(wallet_address='0x123', first_name='A', last_name='B', email='ab@example.com'))
+    sync_session.commit()
+
+    async def main():
+        engine, factory = async_session_factory(db_path)
+        async with factory() as db:
+            user = await database.find_first(db, User, User.email == 'ab@example.com')
+        await engine.dispose()
+        return user
+
+    assert asyncio.run(main()).wallet_address == '0x123'
+
+
+def test_sync_rollback_runs_on_the_io_pool(sync_session):
+    threads = []
+    with patch.object(sync_session, 'rollback', side_effect=lambda: threads.append(threading.get_ident())):
+        asyncio.run(database.rollback(sync_session))
+
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_pool_metrics_track_checkouts(db_path):
+    engine = create_engine(f'sqlite:///{db_path}')
+    database.instrument_pool(engine, 'test')
+    checkouts = metrics.counter('db_pool_checkouts_total', labels={'engine': 'test'})
+    checked_out = metrics.gauge('db_pool_checked_out', labels={'engine': 'test'})
+
+    with engine.connect() as connection:
+        assert checked_out.value == 1
+        connection.exec_driver_sql('SELECT 1')
+
+    assert checked_out.value == 0
+    assert checkouts.value == 1
+
+
+def test_engine_options_and_async_url():
+    mysql = 'mysql+mysqlconnector://user:secret@db:3306/truevote'
+
+    options = database.engine_options(mysql)
+    assert options['pool_size'] == database.DB_POOL_SIZE
+    assert options['pool_pre_ping'] is database.DB_POOL_PRE_PING
+    assert 'pool_size' not in database.engine_options('sqlite:///users.db')
+
+    assert database.async_url(mysql) == 'mysql+asyncmy://user:secret@db:3306/truevote'
+    assert database.async_url('sqlite:///users.db') == 'sqlite+aiosqlite:///users.db'
@@ -0,0 +1,108 @@
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils import face_matching, biometric_tasks
+from app.utils.face_matching import detect_faces, known_face_encodings, compare_faces
+
+
+class FakeFaceRecognition:
+    """Records calls; finds one face covering the middle of the image it is given."""
+
+    def __init__(self):
+        self.detections = []
+        self.encoded = []
+
+    def face_locations(self, img, number_of_times_to_upsample=1, model='hog'):
+        self.detections.append((img.shape, number_of_times_to_upsample, model))
+        height, width = img.shape[:2]
+        return [(height // 4, 3 * width // 4, 3 * height // 4, width // 4)]
+
+    @staticmethod
+    def encode(img, location):
+        return np.full(128, img.mean() / 255 + location[0] / 1e4)
+
+    def face_encodings(self, img, known_face_locations=None):
+        self.encoded.append(known_face_locations)
+        return [self.encode(img, location) for location in known_face_locations]
+
+    @staticmethod
+    def face_distance(known, encoding):
+        return np.linalg.norm(np.asarray(known) - encoding, axis=1)
+
+
+def image(height, width, value=100):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def fake():
+    fake = FakeFaceRecognition()
+    with patch.object(face_matching, 'load_face_recognition', return_value=fake):
+        yield fake
+
+
+def test_detection_runs_on_a_downscaled_copy(fake):
+    locations = detect_faces(image(3000, 4000), max_side=640, model='cnn', upsample=0)
+
+    assert fake.detections == [((480, 640, 3), 0, 'cnn')]
+    # The box is in full-resolution coordinates
+    assert locations == [(750, 3000, 2250, 1000)]
+
+
+def test_small_images_and_max_side_zero_keep_full_resolution(fake):
+    detect_faces(image(300, 400), max_side=640)
+    detect_faces(image(3000, 4000), max_side=0)
+
+    assert [shape for shape, _, _ in fake.detections] == [(300, 400, 3), (3000, 4000, 3)]
+
+
+def test_verification_detects_once_and_reuses_the_box(fake):
+    upload = image(2000, 1500)
+    enrolled = fake.encode(upload, (500, 0, 0, 0))
+
+    with patch.object(biometric_tasks, 'decode_image', return_value=upload):
+        result = biometric_tasks.verify_biometric(b'image bytes', enrolled)
+
+    assert len(fake.detections) == 1
+    assert fake.encoded == [[result['face_location']]]
+    assert result['face_location'] == (500, 1125, 1500, 375)
+    assert result['comparison']['is_match'] and result['liveness_input'].shape == (224, 224, 3)
+    # Timed in the worker, recorded by the caller
+    assert [stage for stage, _, _, _ in result['stages']] == [
+        'image_decode', 'face_detection', 'face_encoding', 'liveness_preprocess',
+    ]
+
+
+def test_no_face_skips_encoding(fake):
+    fake.face_locations = lambda img, **kwargs: []
+
+    with patch.object(biometric_tasks, 'decode_image', return_value=image(100, 100)):
+        result = biometric_tasks.verify_biometric(b'image bytes', np.zeros(128))
+
+    assert fake.encoded == []
+    assert result['comparison']['error'] == 'Face not found in one or both images'
+    assert result['liveness_input'] is None and result['face_location'] is None
+
+
+def test_compare_faces_encodes_each_image_at_its_detected_box(fake):
+    result = compare_faces(image(1000, 800, 100), image(1000, 800, 110))
+
+    assert fake.encoded == [[(250, 600, 750, 200)], [(250, 600, 750, 200)]]
+    assert result['error'] is None and result['is_match']
+
+
+def test_images_without_a_face_are_not_encoded(fake):
+    images = [image(100, 100), image(100, 100), image(100, 100)]
+    locations = [(10, 90, 90, 10), None, (20, 90, 90, 10)]
+
+    encodings = known_face_encodings(images, locations)
+
+    assert fake.encoded == [[locations[0]], [locations[2]]]
+    assert encodings[1] is None
+    assert encodings[0][0] != encodings[2][0]
+
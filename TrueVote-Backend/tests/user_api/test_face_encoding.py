@@ -0,0 +1,37 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.face_encoding import encoding_to_bytes, encoding_from_bytes, FACE_ENCODING_SIZE
+from app.models.user import User
+
+
+def test_round_trip_is_compact_and_close():
+    encoding = np.random.default_rng(0).normal(scale=0.1, size=FACE_ENCODING_SIZE)
+
+    data = encoding_to_bytes(encoding)
+    restored = encoding_from_bytes(data)
+
+    assert len(data) == FACE_ENCODING_SIZE * 4
+    assert restored.dtype == np.float64
+    # float32 storage keeps face distances accurate far below the 0.6 match threshold
+    assert np.linalg.norm(restored - encoding) < 1e-6
+
+
+@pytest.mark.parametrize("data", [None, b""])
+def test_missing_encoding(data):
+    assert encoding_from_bytes(data) is None
+
+
+def test_wrong_shape_rejected():
+    with pytest.raises(ValueError):
+        encoding_to_bytes(np.zeros(64))
+    with pytest.raises(ValueError):
+        encoding_from_bytes(np.zeros(64, dtype=np.float32).tobytes())
+
+
+def test_user_model_has_encoding_column():
+    assert "face_encoding" in User.__table__.columns
@@ -0,0 +1,202 @@
+import pytest
+import asyncio
+import io
+import os
+import sys
+import numpy as np
+from unittest.mock import patch
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.fraud import FaceDuplicate
+from app.models.user import User
+from app.controllers import user_controller
+from app.utils import face_index as face_index_module
+from app.utils.face_index import FaceIndex, exact_search
+
+
+class InlinePool:
+    """Runs CPU pool work inline so the face encoder can be patched."""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def faces(count, seed=0):
+    # Spread like real encodings: different people are ~0.8 apart
+    return np.random.default_rng(seed).normal(0, 0.07, (count, 128)).astype(np.float32)
+
+
+def brute_force(vectors, queries, k):
+    distances = np.linalg.norm(queries[:, None, :] - vectors[None, :, :], axis=2)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+def test_exact_search_matches_brute_force_across_blocks():
+    vectors, queries = faces(1000), faces(20, seed=1)
+    norms = np.einsum('ij,ij->i', vectors, vectors)
+
+    d2, rows = exact_search(vectors, norms, queries, k=5, block_rows=64)
+
+    assert (rows == brute_force(vectors, queries, 5)).all()
+    expected = np.linalg.norm(vectors[rows[:, 0]] - queries, axis=1)
+    assert np.allclose(np.sqrt(d2[:, 0]), expected, atol=1e-4)
+
+
+def test_ivf_recall_after_training(tmp_path):
+    vectors = faces(5000)
+    index = FaceIndex(str(tmp_path), mode='auto', ivf_min=10 ** 9, nprobe=8, name='test-ivf')
+    index.add([f'0x{i:040x}' for i in range(len(vectors))], vectors)
+    queries = vectors[:200] + np.random.default_rng(2).normal(0, 0.01, (200, 128)).astype(np.float32)
+
+    index.train(lists=64)
+    _, rows = index.search(queries)
+    _, exact_rows = index.search(queries, exact=True)
+
+    assert index.stats()['mode'] == 'ivf' and index.stats()['lists'] == 64
+    assert (exact_rows[:, 0] == np.arange(200)).all()
+    assert (rows[:, 0] == exact_rows[:, 0]).mean() >= 0.95
+
+
+def test_workers_sharing_a_directory_see_each_others_inserts(tmp_path):
+    vectors = faces(3000)
+    writer = FaceIndex(str(tmp_path), mode='auto', ivf_min=2000, name='test-writer')
+    writer.add([f'0x{i:040x}' for i in range(2500)], vectors[:2500])
+    # Inserts never train; the build script does once ivf_min is reached
+    assert writer.stats()['mode'] == 'exact' and writer.needs_training()
+    writer.train()
+    assert writer.stats()['mode'] == 'ivf' and not writer.needs_training()
+
+    reader = FaceIndex(str(tmp_path), mode='auto', ivf_min=2000, name='test-reader')
+    assert len(reader) == 2500
+    writer.add([f'0x{i:040x}' for i in range(2500, 3000)], vectors[2500:])
+
+    match = reader.nearest(vectors[2999])
+    assert match.wallet_address == f'0x{2999:040x}' and match.distance < 1e-3
+    assert len(reader) == 3000 and reader.stats()['mode'] == 'ivf'
+
+
+def test_rows_inserted_during_training_join_the_new_lists(tmp_path):
+    vectors = faces(3000)
+    index = FaceIndex(str(tmp_path), mode='exact', name='test-train-concurrent')
+    index.add([f'0x{i:040x}' for i in range(2000)], vectors[:2000])
+    other_worker = FaceIndex(str(tmp_path), mode='exact', name='test-train-concurrent-writer')
+    fit = face_index_module.kmeans
+
+    def kmeans_while_inserting(*args, **kwargs):
+        # Another worker registers while k-means runs; it must not wait on the trainer
+        other_worker.add([f'0x{i:040x}' for i in range(2000, 3000)], vectors[2000:])
+        return fit(*args, **kwargs)
+
+    with patch.object(face_index_module, 'kmeans', kmeans_while_inserting):
+        index.train(lists=32)
+
+    sizes = sum(len(rows) for rows in index._lists)
+    assert len(index) == 3000 and sizes == 3000
+    index.mode = 'auto'
+    match = index.nearest(vectors[2999])
+    assert match.wallet_address == f'0x{2999:040x}'
+
+
+def test_uncommitted_rows_of_a_crashed_writer_are_dropped(tmp_path):
+    index = FaceIndex(str(tmp_path), name='test-crash')
+    index.add(['0xaaa'], faces(1))
+    # A writer died after appending its wallet but before committing meta.json
+    with open(tmp_path / 'ids.txt', 'a') as f:
+        f.write('0xdead\n')
+
+    reopened = FaceIndex(str(tmp_path), name='test-crash-reopened')
+    reopened.add(['0xbbb'], faces(1, seed=3))
+
+    assert (tmp_path / 'ids.txt').read_text().split() == ['0xaaa', '0xbbb']
+    assert reopened.nearest(faces(1, seed=3)).wallet_address == '0xbbb'
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+async def register(db, wallet, email, encoding):
+    upload = UploadFile(file=io.BytesIO(b'image bytes'), filename='face.png')
+    with patch.object(user_controller, 'cpu_pool', InlinePool()), \
+            patch.object(user_controller, 'enrollment_encoding', return_value=encoding):
+        await user_controller.register_user(db, wallet, 'Ada', 'Lovelace', email, upload)
+
+
+def test_registration_flags_a_face_enrolled_with_another_wallet(tmp_path, db):
+    face = faces(1)[0]
+    index = FaceIndex(str(tmp_path / 'index'), name='test-flag')
+
+    async def main():
+        with patch.object(face_index_module, 'face_index', index), \
+                patch.object(user_controller, 'upload_s3_object'):
+            await register(db, '0xfirst', 'first@example.com', face)
+            await register(db, '0xother', 'other@example.com', faces(1, seed=4)[0])
+            await register(db, '0xsecond', 'second@example.com', face + 0.01)
+
+    asyncio.run(main())
+
+    rows = db.scalars(select(FaceDuplicate)).all()
+    assert [(row.wallet_address, row.duplicate_of) for row in rows] == [('0xsecond', '0xfirst')]
+    assert rows[0].distance < 0.2
+    assert len(index) == 3
+
+
+def test_reject_mode_refuses_the_registration_before_upload(tmp_path, db):
+    face = faces(1)[0]
+    index = FaceIndex(str(tmp_path / 'index'), name='test-reject')
+
+    async def main():
+        with patch.object(face_index_module, 'face_index', index), \
+                patch.object(user_controller, 'FACE_DUPLICATE_ACTION', 'reject'), \
+                patch.object(user_controller, 'upload_s3_object') as upload_s3:
+            await register(db, '0xfirst', 'first@example.com', face)
+            with pytest.raises(HTTPException) as exc:
+                await register(db, '0xsecond', 'second@example.com', face)
+            second = await user_controller.get_user_by_wallet(db, '0xsecond')
+            return exc.value, upload_s3.call_count, second
+
+    error, uploads, second = asyncio.run(main())
+
+    assert error.status_code == 400
+    assert uploads == 1 and second is None
+    assert len(index) == 1
+
+
+def test_first_login_of_an_imported_voter_flags_a_duplicate_face(tmp_path, db):
+    face = faces(1)[0]
+    index = FaceIndex(str(tmp_path / 'index'), name='test-import-flag')
+    # Imported without an encoding (app/utils/user_import.py); it is computed on first login
+    db.add(User(wallet_address='0ximported', first_name='Ada', last_name='Lovelace', email='imported@example.com',
+                biometric_image_url='https://bucket.s3.region.amazonaws.com/biometrics/imported.png'))
+    db.commit()
+    upload = UploadFile(file=io.BytesIO(b'login image'), filename='face.png')
+    verification = {'comparison': {'distance': 0.01, 'is_match': True, 'error': None},
+                    'liveness_input': None, 'stages': []}
+
+    async def main():
+        with patch.object(face_index_module, 'face_index', index), \
+                patch.object(user_controller, 'upload_s3_object'), \
+                patch.object(user_controller, 'download_s3_object', return_value=b'stored image'), \
+                patch.object(user_controller, 'verify_biometric', return_value=verification), \
+                patch.object(user_controller, 'check_liveness', return_value={'prediction': 0.9, 'label': 'Live'}):
+            await register(db, '0xfirst', 'first@example.com', face)
+            with patch.object(user_controller, 'cpu_pool', InlinePool()), \
+                    patch.object(user_controller, 'enrollment_encoding', return_value=face + 0.01):
+                return await user_controller.biometric_image_verify(db, '0ximported', upload)
+
+    result = asyncio.run(main())
+
+    assert result['is_match']
+    rows = db.scalars(select(FaceDuplicate)).all()
+    assert [(row.wallet_address, row.duplicate_of) for row in rows] == [('0ximported', '0xfirst')]
+    assert index.wallet_addresses() == {'0xfirst', '0ximported'}
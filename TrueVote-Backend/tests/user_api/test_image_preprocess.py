@@ -0,0 +1,57 @@
+import pytest
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.utils.image_preprocess import decode_image, preprocess_image_from_array
+
+TEST_IMAGES = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'FaceRecognition', 'liveness_api', 'test_images')
+IMAGE_NAMES = ["fake.jpg", "fake2.jpg", "mahinda_mattaya_live.jpg"]
+
+
+def read_bytes(name):
+    with open(os.path.join(TEST_IMAGES, name), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", IMAGE_NAMES)
+def test_decode_matches_file_loading(name):
+    # face_recognition.load_image_file is PIL open + convert('RGB') + np.array
+    with Image.open(os.path.join(TEST_IMAGES, name)) as img:
+        expected = np.array(img.convert('RGB'))
+
+    decoded = decode_image(read_bytes(name))
+
+    assert decoded.dtype == np.uint8
+    np.testing.assert_array_equal(decoded, expected)
+
+
+@pytest.mark.parametrize("name", IMAGE_NAMES)
+def test_liveness_input_matches_keras_loader(name):
+    # keras image.load_img(target_size=(224, 224)) resizes with nearest-neighbour by default
+    with Image.open(os.path.join(TEST_IMAGES, name)) as img:
+        expected = np.asarray(img.convert('RGB').resize((224, 224), Image.NEAREST), dtype=np.float32) / 255.0
+
+    img_array = preprocess_image_from_array(decode_image(read_bytes(name)))
+
+    assert img_array.shape == (1, 224, 224, 3)
+    assert img_array.dtype == np.float32
+    np.testing.assert_array_equal(img_array[0], expected)
+
+
+@pytest.mark.parametrize("name", IMAGE_NAMES)
+def test_liveness_input_matches_path_loader(name):
+    pytest.importorskip("tensorflow")
+    from app.utils.image_preprocess import preprocess_image_from_path
+
+    expected = preprocess_image_from_path(os.path.join(TEST_IMAGES, name))
+
+    np.testing.assert_array_equal(preprocess_image_from_array(decode_image(read_bytes(name))), expected)
+
+
+def test_decode_invalid_bytes():
+    with pytest.raises(Exception):
+        decode_image(b"not an image")
@@ -0,0 +1,192 @@
+import pytest
+import asyncio
+import io
+import os
+import sys
+from unittest.mock import patch
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.user import User
+from app.controllers import user_controller
+from app.utils.user_cache import UserCache, MemoryBackend, RedisBackend, create_backend
+
+
+class FakeRedis:
+    """The slice of redis.asyncio.Redis used by RedisBackend, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.expiry[key] = ex
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError('redis down')
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError('redis down')
+
+    async def delete(self, key):
+        raise ConnectionError('redis down')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_user(wallet='0xabc', encoding=b'\x01\x02\x03'):
+    return User(wallet_address=wallet, first_name='Ada', last_name='Lovelace', email=f'{wallet}@example.com',
+                biometric_image_url='https://bucket/face.png', face_encoding=encoding)
+
+
+class Loader:
+    def __init__(self, user):
+        self.user = user
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.user
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_memory_backend_expires_and_evicts_least_recently_used():
+    clock = Clock()
+    backend = MemoryBackend(max_entries=2, clock=clock)
+
+    async def main():
+        await backend.set('a', {'v': 1}, ttl=10)
+        await backend.set('b', {'v': 2}, ttl=10)
+        await backend.get('a')                  # 'b' is now least recently used
+        await backend.set('c', {'v': 3}, ttl=10)
+        evicted = await backend.get('b')
+        clock.now = 11
+        expired = await backend.get('a')
+        return evicted, expired
+
+    evicted, expired = asyncio.run(main())
+
+    assert evicted is None
+    assert expired is None
+    assert backend.size() == 1
+
+
+def test_read_through_counts_hits_and_misses():
+    cache = UserCache(MemoryBackend(), ttl=60)
+    loader = Loader(make_user())
+
+    async def main():
+        first = await cache.get_or_load('0xabc', loader)
+        second = await cache.get_or_load('0xabc', loader)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert loader.calls == 1
+    assert second is not first
+    assert second.email == first.email and second.face_encoding == b'\x01\x02\x03'
+    stats = cache.stats()
+    assert stats['hits'] >= 1 and stats['misses'] >= 1
+    assert 0 < stats['hit_rate'] < 1
+
+
+def test_missing_users_are_not_cached():
+    cache = UserCache(MemoryBackend(), ttl=60)
+    loader = Loader(None)
+
+    async def main():
+        await cache.get_or_load('0xnone', loader)
+        await cache.get_or_load('0xnone', loader)
+
+    asyncio.run(main())
+
+    assert loader.calls == 2
+
+
+def test_redis_backend_round_trips_binary_encoding():
+    client = FakeRedis()
+    cache = UserCache(RedisBackend(client=client, prefix='test:'), ttl=30)
+    loader = Loader(make_user(encoding=bytes(range(256))))
+
+    async def main():
+        await cache.get_or_load('0xabc', loader)
+        hit = await cache.get_or_load('0xabc', loader)
+        await cache.invalidate('0xabc')
+        return hit
+
+    hit = asyncio.run(main())
+
+    assert loader.calls == 1
+    assert hit.face_encoding == bytes(range(256))
+    assert client.expiry['test:0xabc'] == 30
+    assert 'test:0xabc' not in client.data
+
+
+def test_backend_failures_fall_back_to_the_loader():
+    cache = UserCache(RedisBackend(client=BrokenRedis()), ttl=30)
+    loader = Loader(make_user())
+
+    async def main():
+        user = await cache.get_or_load('0xabc', loader)
+        await cache.invalidate('0xabc')
+        return user
+
+    assert asyncio.run(main()).wallet_address == '0xabc'
+    assert cache.stats()['errors'] >= 3
+
+
+def test_registration_invalidates_and_lookups_hit_the_cache(session):
+    cache = UserCache(MemoryBackend(), ttl=60)
+    upload = UploadFile(file=io.BytesIO(b'image bytes'), filename='face.png')
+
+    async def main():
+        # A stale entry for the wallet (e.g. left by another worker) must not survive registration
+        await cache.backend.set('0xabc', {'wallet_address': '0xabc', 'email': 'stale@example.com'}, 60)
+        with patch.object(user_controller, 'user_cache', cache), \
+                patch.object(user_controller, 'upload_s3_object'), \
+                patch.object(user_controller, 'cpu_pool', user_controller.io_pool), \
+                patch.object(user_controller, 'enrollment_encoding', return_value=None):
+            await user_controller.register_user(session, '0xabc', 'Ada', 'Lovelace', 'ada@example.com', upload)
+            first = await user_controller.get_user_by_wallet(session, '0xabc')
+            second = await user_controller.get_user_by_wallet(session, '0xabc')
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first.email == second.email == 'ada@example.com'
+    stats = cache.stats()
+    assert stats['invalidations'] >= 1
+    assert stats['size'] == 1
+
+
+def test_create_backend_rejects_unknown_kind():
+    assert create_backend('none') is None
+    with pytest.raises(ValueError):
+        create_backend('memcached')
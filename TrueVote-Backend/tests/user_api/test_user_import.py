@@ -0,0 +1,161 @@
+import pytest
+import asyncio
+import io
+import json
+import os
+import sys
+import numpy as np
+from unittest.mock import patch
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.base import Base
+from app.models.user import User
+from app.controllers import user_controller
+from app.utils.user_import import UserImporter, import_users, DUPLICATE_WALLET, DUPLICATE_EMAIL
+
+IMAGE_URL = 'https://truevote.s3.amazonaws.com/biometrics/face.png'
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def user_row(n, **overrides):
+    row = {'row': n, 'wallet_address': f'0x{n:040x}', 'first_name': 'Voter', 'last_name': str(n),
+           'email': f'voter{n}@example.com', 'image': IMAGE_URL}
+    row.update(overrides)
+    return row
+
+
+def test_bulk_import_reports_each_failure(db):
+    db.add(User(wallet_address='0x' + 'f' * 40, first_name='A', last_name='B', email='taken@example.com'))
+    db.commit()
+    rows = [
+        user_row(1),
+        user_row(2, wallet_address='0x' + 'f' * 40),          # already registered wallet
+        user_row(3, email='taken@example.com'),                # already registered email
+        user_row(4, wallet_address=user_row(1)['wallet_address']),  # duplicate within the file
+        user_row(5, email='not-an-email'),
+        user_row(6, first_name=''),
+        user_row(7, image='faces/7.png'),                      # local file without an uploader
+        user_row(8),
+    ]
+
+    report = UserImporter(db, chunk_size=3).import_rows(rows)
+
+    errors = {failure['row']: failure['error'] for failure in report['failures']}
+    assert report['rows'] == 8
+    assert report['inserted'] == 2
+    assert errors[2] == DUPLICATE_WALLET
+    assert errors[3] == DUPLICATE_EMAIL
+    assert errors[4] == 'duplicate wallet_address in file'
+    assert errors[5].startswith('invalid email')
+    assert errors[6] == 'missing first_name'
+    assert 'uploader' in errors[7]
+    assert db.query(User).count() == 3
+
+
+def test_bulk_import_uses_one_select_and_one_insert_per_chunk(engine, db):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+
+    UserImporter(db, chunk_size=50).import_rows([user_row(n) for n in range(100)])
+
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+    assert len(selects) == 2
+    # SQLite may split an executemany into several statements; never one per row
+    assert 2 <= len(inserts) < 10
+    assert db.query(User).count() == 100
+
+
+def test_chunk_conflict_falls_back_to_row_inserts(db):
+    importer = UserImporter(db)
+    rows = [user_row(1), user_row(2)]
+    # Simulate a concurrent registration between the uniqueness check and the insert
+    original = importer._filter_existing
+
+    def racing_filter(chunk):
+        result = original(chunk)
+        db.add(User(wallet_address=rows[1]['wallet_address'], first_name='X', last_name='Y', email='race@example.com'))
+        db.commit()
+        return result
+
+    importer._filter_existing = racing_filter
+    report = importer.import_rows(rows)
+
+    assert report['inserted'] == 1
+    assert report['failures'][0]['row'] == 2
+
+
+def test_import_reads_csv_and_jsonl(tmp_path, db):
+    csv_path = tmp_path / 'voters.csv'
+    csv_path.write_text('wallet_address,first_name,last_name,email,image\n'
+                        f'0xaaa,Ada,Lovelace,ada@example.com,{IMAGE_URL}\n')
+    jsonl_path = tmp_path / 'voters.jsonl'
+    jsonl_path.write_text(json.dumps({'wallet_address': '0xbbb', 'first_name': 'Grace', 'last_name': 'Hopper',
+                                      'email': 'grace@example.com', 'image': str(tmp_path / 'grace.png')}) + '\n')
+    (tmp_path / 'grace.png').write_bytes(b'png bytes')
+    uploaded = {}
+
+    def uploader(content, wallet_address):
+        uploaded[wallet_address] = content
+        return IMAGE_URL
+
+    assert import_users(db, str(csv_path))['inserted'] == 1
+    assert import_users(db, str(jsonl_path), uploader=uploader)['inserted'] == 1
+    assert uploaded == {'0xbbb': b'png bytes'}
+
+
+def register(db, wallet, email):
+    upload = UploadFile(file=io.BytesIO(b'image bytes'), filename='face.png')
+
+    class InlinePool:
+        async def run(self, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+    with patch.object(user_controller, 'upload_s3_object'), \
+            patch.object(user_controller, 'cpu_pool', InlinePool()), \
+            patch.object(user_controller, 'enrollment_encoding', return_value=np.zeros(128)):
+        asyncio.run(user_controller.register_user(db, wallet, 'Ada', 'Lovelace', email, upload))
+
+
+def test_register_rejects_duplicates_with_400_before_upload(engine, db):
+    register(db, '0xabc', 'ada@example.com')
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+
+    with pytest.raises(HTTPException) as wallet_error:
+        register(db, '0xabc', 'other@example.com')
+    with pytest.raises(HTTPException) as email_error:
+        register(db, '0xdef', 'ada@example.com')
+
+    assert (wallet_error.value.status_code, wallet_error.value.detail) == (400, DUPLICATE_WALLET)
+    assert (email_error.value.status_code, email_error.value.detail) == (400, DUPLICATE_EMAIL)
+    # One uniqueness query per attempt, and nothing written
+    assert len(statements) == 2
+    assert all(s.lstrip().upper().startswith('SELECT') for s in statements)
+
+
+def test_register_maps_unique_violation_to_400(db):
+    register(db, '0xabc', 'ada@example.com')
+    with patch.object(user_controller, 'find_registration_conflict', side_effect=[None, DUPLICATE_WALLET]):
+        with pytest.raises(HTTPException) as error:
+            register(db, '0xabc', 'ada@example.com')
+
+    assert error.value.status_code == 400
+    assert error.value.detail == DUPLICATE_WALLET